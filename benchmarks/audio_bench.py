@@ -0,0 +1,200 @@
+# benchmarks/audio_bench.py
+"""
+Benchmarks for the recorder's hot loop.
+
+Buffering: pre-roll upkeep, utterance capture and the hand-off of a
+finished utterance to Whisper, comparing the original deque/list buffering
+("list") with the preallocated RingBuffer/UtteranceBuffer ("ring"). VAD is
+not run; speech start and end are fixed frame indices.
+
+VAD: VADManager's per-frame process_audio() (lock, clock read and state dict
+per frame) against process_block() on single frames and on catch-up batches.
+A stand-in engine replaces Cobra, so only the manager's own overhead is
+measured.
+
+Usage:
+    python -m benchmarks.audio_bench [--quick] [--output FILE] [--compare BASELINE]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict
+import numpy as np
+from src.audio.buffers import RingBuffer, UtteranceBuffer
+from src.core.metrics import LatencyHistogram
+from src.wake_word.vad import VADManager
+from benchmarks.common import write_results, print_comparison
+
+SAMPLE_RATE = 16000
+FRAME = 512
+PRE_ROLL_S = 2
+LEAD_S = 3  # Silence before speech starts, long enough to fill the pre-roll
+UTTERANCE_S = (5, 30)
+
+class _ListRecorder:
+    """The recorder's buffering before the ring buffer: deque pre-roll, list utterance."""
+    def __init__(self):
+        self.pre_roll = deque(maxlen=PRE_ROLL_S * SAMPLE_RATE)
+        self.current = []
+
+    def frame(self, chunk: np.ndarray) -> None:
+        self.pre_roll.extend(chunk)
+        self.current.extend(chunk)
+
+    def speech_started(self, chunk: np.ndarray) -> None:
+        self.pre_roll.extend(chunk)
+        self.current = list(self.pre_roll)
+        self.current.extend(chunk)
+
+    def speech_ended(self) -> np.ndarray:
+        audio = np.array(self.current, dtype=np.int16)
+        self.current = []
+        return audio
+
+class _RingRecorder:
+    def __init__(self):
+        self.pre_roll = RingBuffer(PRE_ROLL_S * SAMPLE_RATE)
+        self.current = UtteranceBuffer(PRE_ROLL_S * SAMPLE_RATE * 4)
+        self.in_utterance = False
+
+    def frame(self, chunk: np.ndarray) -> None:
+        self.pre_roll.write(chunk)
+        if self.in_utterance:
+            self.current.extend(chunk)
+
+    def speech_started(self, chunk: np.ndarray) -> None:
+        self.pre_roll.write(chunk)
+        self.current.clear()
+        self.current.extend(*self.pre_roll.segments())
+        self.in_utterance = True
+
+    def speech_ended(self) -> np.ndarray:
+        self.in_utterance = False
+        return self.current.take()
+
+RECORDERS: Dict[str, Callable] = {'list': _ListRecorder, 'ring': _RingRecorder}
+
+def _frames(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    count = int(seconds * SAMPLE_RATE) // FRAME
+    return rng.integers(-2000, 2000, size=(count, FRAME), dtype=np.int16)
+
+def _capture(recorder, frames: np.ndarray, start: int, histogram: LatencyHistogram = None) -> None:
+    for index, chunk in enumerate(frames):
+        began = time.perf_counter()
+        if index == start:
+            recorder.speech_started(chunk)
+        else:
+            recorder.frame(chunk)
+        if histogram is not None:
+            histogram.record(time.perf_counter() - began)
+
+def bench_hot_loop(name: str, utterance_s: float, repeats: int) -> Dict[str, float]:
+    """Per-frame cost and the cost of handing the utterance over, without tracemalloc running."""
+    frames = _frames(LEAD_S + utterance_s)
+    start = int(LEAD_S * SAMPLE_RATE) // FRAME
+    per_frame = LatencyHistogram()
+    handoff = LatencyHistogram()
+    recorder = RECORDERS[name]()
+    for _ in range(repeats):
+        _capture(recorder, frames, start, per_frame)
+        began = time.perf_counter()
+        recorder.speech_ended()
+        handoff.record(time.perf_counter() - began)
+    return {
+        'frame_us': per_frame.total / per_frame.count * 1e6,
+        'frame_p99_us': per_frame.percentile(0.99) * 1e6,
+        'handoff_ms': handoff.total / handoff.count * 1000,
+    }
+
+def bench_memory(name: str, utterance_s: float) -> Dict[str, float]:
+    """Peak traced allocation while capturing one utterance, including the array handed on."""
+    frames = _frames(LEAD_S + utterance_s)
+    start = int(LEAD_S * SAMPLE_RATE) // FRAME
+    tracemalloc.start()
+    recorder = RECORDERS[name]()
+    _capture(recorder, frames, start)
+    audio = recorder.speech_ended()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'peak_mb': peak / 2**20, 'audio_mb': audio.nbytes / 2**20}
+
+class _Engine:
+    """Stands in for Cobra: speech while the frame is loud."""
+    frame_length = FRAME
+
+    def process(self, frame: np.ndarray) -> float:
+        return 1.0 if frame[0] > 1000 else 0.0
+
+def _vad_frames(seconds: float) -> np.ndarray:
+    frames = _frames(seconds)
+    frames = frames[:len(frames) // 16 * 16]
+    frames[:, 0] = np.where(np.arange(len(frames)) % 200 < 60, 2000, 0)  # 2 s of speech every 6.4 s
+    return frames
+
+async def _per_frame(vad: VADManager, frames: np.ndarray) -> int:
+    ended = 0
+    for frame in frames:
+        state = await vad.process_audio(frame)
+        ended += state['speech_ended']
+    return ended
+
+def bench_vad(seconds: float, repeats: int) -> Dict[str, Dict[str, float]]:
+    frames = _vad_frames(seconds)
+    results = {}
+    for name, batch in (('per_frame', None), ('block_1', 1), ('block_16', 16)):
+        best = float('inf')
+        for _ in range(repeats):
+            vad = VADManager(sample_clock=True, cobra=_Engine())
+            began = time.perf_counter()
+            if batch is None:
+                ended = asyncio.run(_per_frame(vad, frames))
+            else:
+                ended = 0
+                blocks = frames.reshape(-1, batch * FRAME)
+                for block in blocks:
+                    ended += sum(1 for event in vad.process_block(block).events if event[1] == 2)
+            best = min(best, time.perf_counter() - began)
+        results[name] = {'frame_us': best / len(frames) * 1e6, 'utterances': ended}
+    return results
+
+def run(quick: bool) -> Dict:
+    repeats = 3 if quick else 20
+    results: Dict = {'buffering': {}}
+    for seconds in UTTERANCE_S:
+        for name in RECORDERS:
+            key = f'{name}_{seconds}s'
+            results['buffering'][key] = bench_hot_loop(name, seconds, repeats)
+            results['buffering'][key].update(bench_memory(name, seconds))
+    results['vad'] = bench_vad(20 if quick else 60, repeats)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recorder's audio buffering")
+    parser.add_argument("--quick", action="store_true", help="Run fewer repeats")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    path = write_results("audio", results, args.output)
+
+    print("== Recorder buffering ==")
+    for name, values in results['buffering'].items():
+        print(
+            f"{name:>10}: {values['frame_us']:>7.2f} us/frame  p99 {values['frame_p99_us']:>7.2f} us  "
+            f"hand-off {values['handoff_ms']:>7.3f} ms  peak {values['peak_mb']:>6.2f} MB "
+            f"(utterance {values['audio_mb']:.2f} MB)"
+        )
+    print("\n== VAD call overhead ==")
+    for name, values in results['vad'].items():
+        print(f"{name:>10}: {values['frame_us']:>7.2f} us/frame  ({values['utterances']} utterances)")
+    print(f"Results written to {path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
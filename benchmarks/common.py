@@ -0,0 +1,77 @@
+# benchmarks/common.py
+import json
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from src.utils.config import BENCHMARKS_DIR, PROJECT_ROOT
+from src.utils.logger import setup_logging
+
+def silence_console(*module_names: Optional[str]) -> None:
+    """
+    Keep app loggers off the terminal so benchmarks measure the code, not the tty.
+
+    Pass the module names of loggers that may not exist yet (None for the
+    app-wide logger) so they are created before being silenced.
+    """
+    for module_name in module_names:
+        setup_logging(module_name=module_name)
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if not name.startswith("AppLogger") or not isinstance(logger, logging.Logger):
+            continue
+        for handler in logger.handlers:
+            if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+                handler.setLevel(logging.CRITICAL)
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def write_results(suite: str, results: Dict, output: Optional[str] = None) -> Path:
+    """Write results plus run metadata as JSON and return the file path."""
+    timestamp = datetime.now()
+    path = Path(output) if output else BENCHMARKS_DIR / f"{suite}-{timestamp.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'suite': suite,
+        'meta': {
+            'timestamp': timestamp.isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def print_comparison(results: Dict, baseline_path: str) -> None:
+    """Print every numeric metric next to the same metric from an earlier run."""
+    with open(baseline_path) as f:
+        baseline = _flatten(json.load(f)['results'])
+    current = _flatten(results)
+    print(f"\n== Compared with {baseline_path} ==")
+    for name, value in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        print(f"{name:<60} {before:>14.3f} -> {value:>14.3f} ({value / before:6.2f}x)")
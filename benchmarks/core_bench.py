@@ -0,0 +1,159 @@
+# benchmarks/core_bench.py
+"""
+Microbenchmarks for the EventBus and StateManager dispatch paths.
+
+Usage:
+    python -m benchmarks.core_bench [--quick] [--output FILE] [--compare BASELINE]
+
+Results are written as JSON (by default under data/benchmarks/) so runs from
+different revisions can be compared with --compare.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+from src.core.event_bus import EventBus
+from src.core.metrics import LatencyHistogram
+from src.core.state import StateManager, AssistantState
+from benchmarks.common import silence_console, write_results, print_comparison
+
+SUBSCRIBER_COUNTS = (1, 10, 100)
+
+def _make_async_handlers(count: int) -> List:
+    handlers = []
+    for _ in range(count):
+        async def handler(*args, **kwargs):
+            pass
+        handlers.append(handler)
+    return handlers
+
+def _make_sync_handlers(count: int) -> List:
+    handlers = []
+    for _ in range(count):
+        def handler(*args, **kwargs):
+            pass
+        handlers.append(handler)
+    return handlers
+
+def bench_subscribe(iterations: int) -> Dict[str, float]:
+    bus = EventBus()
+    handlers = _make_async_handlers(iterations)
+
+    start = time.perf_counter()
+    for index, handler in enumerate(handlers):
+        bus.subscribe(f"bench.topic{index % 50}", handler, async_handler=True)
+    subscribe_cost = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for index, handler in enumerate(handlers):
+        bus.unsubscribe(f"bench.topic{index % 50}", handler)
+    unsubscribe_cost = (time.perf_counter() - start) / iterations
+
+    return {'subscribe_us': subscribe_cost * 1e6, 'unsubscribe_us': unsubscribe_cost * 1e6}
+
+async def bench_publish(subscribers: int, async_handlers: bool, events: int, executor: str = "io") -> Dict[str, float]:
+    bus = EventBus()
+    handlers = _make_async_handlers(subscribers) if async_handlers else _make_sync_handlers(subscribers)
+    for handler in handlers:
+        bus.subscribe("bench.publish", handler, async_handler=async_handlers, executor=executor)
+
+    for _ in range(min(events, 100)):  # warm up the route cache and executor threads
+        await bus.publish("bench.publish", 1)
+
+    start = time.perf_counter()
+    for _ in range(events):
+        await bus.publish("bench.publish", 1)
+    elapsed = time.perf_counter() - start
+    await bus.shutdown()
+    return {
+        'events_per_sec': events / elapsed,
+        'deliveries_per_sec': events * subscribers / elapsed,
+        'publish_us': elapsed / events * 1e6,
+    }
+
+async def bench_fanout_latency(subscribers: int, events: int) -> Dict[str, float]:
+    """Time from publish() being called to each subscriber starting to run."""
+    bus = EventBus()
+    histogram = LatencyHistogram()
+
+    def make_handler():
+        async def handler(published_at: float):
+            histogram.record(time.perf_counter() - published_at)
+        return handler
+
+    for _ in range(subscribers):
+        bus.subscribe("bench.fanout", make_handler(), async_handler=True)
+    for _ in range(events):
+        await bus.publish("bench.fanout", time.perf_counter())
+    await bus.shutdown()
+    return histogram.summary()
+
+class _CountingObserver:
+    def __init__(self):
+        self.changes = 0
+
+    async def on_state_change(self, old_state: AssistantState, new_state: AssistantState) -> None:
+        self.changes += 1
+
+async def bench_state(observers: int, transitions: int) -> Dict[str, float]:
+    manager = StateManager()
+    for _ in range(observers):
+        manager.add_observer(_CountingObserver())
+
+    cycle = (AssistantState.LISTENING, AssistantState.PROCESSING, AssistantState.SPEAKING, AssistantState.IDLE)
+    start = time.perf_counter()
+    for index in range(transitions):
+        await manager.set_state(cycle[index % len(cycle)])
+    elapsed = time.perf_counter() - start
+    return {'transitions_per_sec': transitions / elapsed, 'set_state_us': elapsed / transitions * 1e6}
+
+async def run(quick: bool) -> Dict:
+    scale = 10 if quick else 1
+    results: Dict = {'subscribe': bench_subscribe(2_000 // scale)}
+
+    results['publish'] = {}
+    for count in SUBSCRIBER_COUNTS:
+        events = max(200, 20_000 // count // scale)
+        results['publish'][f'async_{count}'] = await bench_publish(count, True, events)
+        results['publish'][f'sync_{count}'] = await bench_publish(count, False, max(100, events // 10))
+        results['publish'][f'sync_inline_{count}'] = await bench_publish(count, False, events, executor=EventBus.INLINE_EXECUTOR)
+
+    results['fanout_latency'] = {
+        f'async_{count}': await bench_fanout_latency(count, max(200, 5_000 // count // scale))
+        for count in SUBSCRIBER_COUNTS
+    }
+
+    results['state'] = {
+        f'observers_{count}': await bench_state(count, 5_000 // scale)
+        for count in (0, 1, 10)
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EventBus and StateManager")
+    parser.add_argument("--quick", action="store_true", help="Run a tenth of the iterations")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    silence_console("Event_Bus", None)
+    results = asyncio.run(run(args.quick))
+    path = write_results("core", results, args.output)
+
+    print("== Publish ==")
+    for name, values in results['publish'].items():
+        print(f"{name:>16}: {values['events_per_sec']:>12,.0f} events/s  {values['publish_us']:>10.2f} us/publish")
+    print("\n== Fan-out latency (ms) ==")
+    for name, summary in results['fanout_latency'].items():
+        print(f"{name:>16}: p50 {summary['p50_ms']:.3f}  p95 {summary['p95_ms']:.3f}  p99 {summary['p99_ms']:.3f}")
+    print("\n== StateManager.set_state ==")
+    for name, values in results['state'].items():
+        print(f"{name:>16}: {values['transitions_per_sec']:>12,.0f} transitions/s")
+    print(f"\nSubscribe {results['subscribe']['subscribe_us']:.2f} us, unsubscribe {results['subscribe']['unsubscribe_us']:.2f} us")
+    print(f"Results written to {path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
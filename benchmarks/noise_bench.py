@@ -0,0 +1,206 @@
+# benchmarks/noise_bench.py
+"""
+Benchmark for the recorder's noise suppression + AGC stage: how many junk
+utterances background noise causes with and without it, how many seconds
+of non-speech audio those send to Whisper, and what the stage costs per frame.
+
+The corpus is synthetic and seeded: voiced, syllable-modulated speech-like
+segments at known positions over white, pink, mains hum and slowly swelling
+background noise, plus a quiet control. Utterances are endpointed the way
+VADManager does it on its sample clock. Frame speech probabilities come from
+an energy detector by default; --cobra uses Picovoice Cobra instead
+(needs pvcobra and PICOV_ACCESS_KEY).
+
+Usage:
+    python -m benchmarks.noise_bench [--quick] [--cobra] [--output FILE] [--compare BASELINE]
+"""
+import argparse
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from src.audio.preprocess import AudioPreprocessor
+from benchmarks.common import silence_console, write_results, print_comparison
+
+SAMPLE_RATE = 16000
+FRAME = 512
+CLIP_S = 20
+PRE_ROLL_S = 2.0      # AudioRecorder's pre-roll, prepended to every utterance
+SPEECH_TIMEOUT = 1.2  # VADManager defaults
+MIN_SPEECH = 0.1
+VAD_THRESHOLD = 0.64
+ENERGY_THRESHOLD_DBFS = -38.0
+
+Segment = Tuple[float, float]
+
+def _pink(rng: np.random.Generator, count: int) -> np.ndarray:
+    spectrum = np.fft.rfft(rng.normal(size=count))
+    spectrum /= np.sqrt(np.maximum(np.arange(len(spectrum)), 1))
+    noise = np.fft.irfft(spectrum, n=count)
+    return noise / np.sqrt(np.mean(noise ** 2))
+
+def _noise(kind: str, rng: np.random.Generator, count: int) -> np.ndarray:
+    """Unit-RMS background noise."""
+    t = np.arange(count) / SAMPLE_RATE
+    if kind == "white":
+        return rng.normal(size=count)
+    if kind == "pink":
+        return _pink(rng, count)
+    if kind == "hum":
+        hum = sum(np.sin(2 * np.pi * 50 * harmonic * t) / harmonic for harmonic in range(1, 8))
+        noise = hum / np.sqrt(np.mean(hum ** 2)) + 0.5 * _pink(rng, count)
+    elif kind == "swell":
+        # Traffic or an air conditioner cycling: +-6 dB over ten seconds
+        noise = _pink(rng, count) * 10 ** (6 * np.sin(2 * np.pi * 0.1 * t) / 20)
+    else:
+        raise ValueError(f"Unknown noise kind: {kind}")
+    return noise / np.sqrt(np.mean(noise ** 2))
+
+def _speech(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    """Unit-RMS voiced sound with a wandering pitch, formant-like spectrum and 4-5 Hz syllables."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    formants = rng.uniform((500, 1200, 2500), (800, 1800, 3000))
+    voice = np.zeros_like(t)
+    for harmonic in range(1, 30):
+        frequency = harmonic * f0.mean()
+        if frequency > 4000:
+            break
+        weight = sum(1 / (1 + ((frequency - formant) / 150) ** 2) for formant in formants) + 0.05
+        voice += weight * np.sin(harmonic * phase)
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(4, 5) * t), 0, None) ** 0.5
+    voice *= syllables
+    return voice / np.sqrt(np.mean(voice ** 2))
+
+def make_clip(kind: str, seed: int, noise_dbfs: float = -40.0, speech_dbfs: float = -24.0) -> Tuple[np.ndarray, List[Segment]]:
+    """A CLIP_S second int16 clip and the (start, end) seconds of its speech."""
+    rng = np.random.default_rng(seed)
+    count = CLIP_S * SAMPLE_RATE
+    audio = _noise(kind, rng, count) * 10 ** (noise_dbfs / 20) if kind != "quiet" else rng.normal(size=count) * 10 ** (-65 / 20)
+    segments = []
+    for start in (3.0, 9.0, 15.0):
+        start += rng.uniform(-0.5, 0.5)
+        seconds = rng.uniform(1.0, 2.5)
+        level = 10 ** ((speech_dbfs + rng.uniform(-4, 4)) / 20)
+        first = int(start * SAMPLE_RATE)
+        speech = _speech(rng, seconds) * level
+        audio[first:first + len(speech)] += speech
+        segments.append((start, start + seconds))
+    audio = np.clip(audio, -1, 1) * 32767
+    return audio.astype(np.int16), segments
+
+def energy_probability(frame: np.ndarray) -> float:
+    dbfs = 20 * np.log10(np.sqrt(np.mean((frame.astype(np.float32) / 32768) ** 2)) + 1e-12)
+    return float(1 / (1 + np.exp(np.clip(ENERGY_THRESHOLD_DBFS - dbfs, -50, 50) / 1.5)))
+
+def endpoint(probabilities: List[float]) -> List[Segment]:
+    """Utterances VADManager would end, as (speech start, speech end) seconds."""
+    utterances = []
+    speaking, start, last = False, 0.0, 0.0
+    for index, probability in enumerate(probabilities):
+        now = (index + 1) * FRAME / SAMPLE_RATE
+        if probability >= VAD_THRESHOLD:
+            if not speaking:
+                speaking, start = True, now
+            last = now
+        elif speaking and now - last >= SPEECH_TIMEOUT:
+            if now - start >= MIN_SPEECH:
+                utterances.append((start, now))
+            speaking = False
+    if speaking:
+        utterances.append((start, len(probabilities) * FRAME / SAMPLE_RATE))  # Cut off by the end of the clip
+    return utterances
+
+def _overlap(a: Segment, b: Segment) -> float:
+    return max(0.0, min(a[1], b[1]) - max(a[0], b[0]))
+
+def score(utterances: List[Segment], speech: List[Segment]) -> Dict[str, float]:
+    """
+    False utterances, missed speech and wasted STT seconds: audio sent to
+    Whisper beyond what clean endpointing of the heard speech would send
+    (pre-roll + speech + speech timeout).
+    """
+    stt_s = sum(end - max(0.0, start - PRE_ROLL_S) for start, end in utterances)
+    heard = [segment for segment in speech if any(_overlap(u, segment) for u in utterances)]
+    needed = sum(min(PRE_ROLL_S, start) + (end - start) + SPEECH_TIMEOUT for start, end in heard)
+    return {
+        'utterances': len(utterances),
+        'false_utterances': sum(1 for utterance in utterances if not any(_overlap(utterance, s) for s in speech)),
+        'missed': len(speech) - len(heard),
+        'stt_s': stt_s,
+        'wasted_stt_s': max(0.0, stt_s - needed),
+    }
+
+def run_clip(audio: np.ndarray, speech: List[Segment], probability: Callable, preprocessor: AudioPreprocessor = None) -> Dict[str, float]:
+    frames = audio[:len(audio) // FRAME * FRAME].reshape(-1, FRAME)
+    if preprocessor is not None:
+        frames = [preprocessor.process(frame) for frame in frames]
+    return score(endpoint([probability(frame) for frame in frames]), speech)
+
+def _cobra_probability() -> Callable:
+    import os
+    import pvcobra
+    from src.utils.config import VAD_LINUX_DIR
+    cobra = pvcobra.Cobra(access_key=os.getenv("PICOV_ACCESS_KEY"), library_path=VAD_LINUX_DIR)
+    return cobra.process
+
+def run(quick: bool, cobra: bool = False) -> Dict:
+    probability = _cobra_probability() if cobra else energy_probability
+    seeds = range(2 if quick else 8)
+    results: Dict = {}
+    for kind in ("quiet", "white", "pink", "hum", "swell"):
+        totals = {'raw': {}, 'preprocessed': {}}
+        for seed in seeds:
+            audio, speech = make_clip(kind, seed)
+            # One preprocessor per clip, like one recorder per pipeline
+            for name, preprocessor in (('raw', None), ('preprocessed', AudioPreprocessor())):
+                for key, value in run_clip(audio, speech, probability, preprocessor).items():
+                    totals[name][key] = totals[name].get(key, 0) + value
+        results[kind] = totals
+
+    preprocessor = AudioPreprocessor()
+    audio, _ = make_clip("pink", 0)
+    for frame in audio.reshape(-1, FRAME):
+        preprocessor.process(frame)
+    stats = preprocessor.get_stats()
+    results['cost'] = {
+        'frame_us': stats['frame']['mean_ms'] * 1000,
+        'frame_p99_us': stats['frame']['p99_ms'] * 1000,
+        'budget_us': stats['budget_ms'] * 1000,
+        'realtime_share': stats['frame']['mean_ms'] / (FRAME / SAMPLE_RATE * 1000),
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark noise suppression + AGC ahead of VAD")
+    parser.add_argument("--quick", action="store_true", help="Use two clips per noise type instead of eight")
+    parser.add_argument("--cobra", action="store_true", help="Score frames with Picovoice Cobra instead of the energy detector")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    silence_console("AudioPreprocessor")
+    results = run(args.quick, args.cobra)
+    path = write_results("noise", results, args.output)
+
+    print(f"== Utterances per noise type ({'Cobra' if args.cobra else 'energy'} VAD) ==")
+    print(f"{'':>8}{'':>14}{'utterances':>12}{'false':>8}{'missed':>8}{'STT s':>9}{'wasted s':>10}")
+    for kind, totals in results.items():
+        if kind == 'cost':
+            continue
+        for name, values in totals.items():
+            print(
+                f"{kind:>8}{name:>14}{values['utterances']:>12}{values['false_utterances']:>8}"
+                f"{values['missed']:>8}{values['stt_s']:>9.1f}{values['wasted_stt_s']:>10.1f}"
+            )
+    cost = results['cost']
+    print(
+        f"\nPreprocessing: {cost['frame_us']:.0f} us/frame (p99 {cost['frame_p99_us']:.0f} us, "
+        f"budget {cost['budget_us']:.0f} us), {cost['realtime_share']:.1%} of real time"
+    )
+    print(f"Results written to {path}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
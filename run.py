@@ -5,17 +5,35 @@ from dotenv import load_dotenv
 load_dotenv()
 from src.assistant.main import Assistant
 
-async def run_assistant_only():
+async def run_assistant_only(audio_source=None):
     """Run the assistant without the web server"""
-    assistant = await Assistant.create()
+    assistant = await Assistant.create(audio_source=audio_source)
     # Make sure the assistant keeps running
     try:
         # Get the processing task and await it to keep the assistant running
         processing_task = await assistant.start_processing()
         await processing_task
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("Shutting down assistant...")
 
+async def run_dictation(audio_source=None):
+    """Transcribe long-form dictation, printing each segment as it is transcribed"""
+    from src.audio.dictation import Dictation
+    from src.audio.sources import DeviceSource, open_audio_source
+    from src.speech.stt.whisper_engine import WhisperEngine
+    from src.utils.shared_resources import EVENT_BUS
+
+    whisper_engine = WhisperEngine()
+    await whisper_engine.initialize()
+    source = open_audio_source(audio_source, sample_rate=16000) or DeviceSource(sample_rate=16000, latency='low')
+    EVENT_BUS.subscribe("dictation.segment", lambda text, **_: print(text, flush=True), executor="inline")
+    try:
+        print("Dictating... (stops after a few seconds of silence)")
+        await Dictation(source, whisper_engine).run()
+    finally:
+        source.close()
+        await whisper_engine.shutdown()
+
 def run_server(host="0.0.0.0", port=8000):
     """Start the uvicorn server directly in the current shell"""
     cmd = f"uvicorn src.api.server:app --host {host} --port {port}"
@@ -36,13 +54,17 @@ def main():
     parser.add_argument("--no-server", action="store_true", help="Run the assistant without starting the server")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind the server to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind the server to")
+    parser.add_argument("--audio-source", help="Audio input for --no-server runs: a WAV/FLAC file, - for raw 16 kHz PCM on stdin, or device:<index>")
+    parser.add_argument("--dictate", action="store_true", help="Transcribe long-form dictation from --audio-source and exit")
     
     args = parser.parse_args()
     
-    if args.no_server:
+    if args.dictate:
+        asyncio.run(run_dictation(args.audio_source))
+    elif args.no_server:
         # Run only the assistant
         print("Running assistant without server...")
-        asyncio.run(run_assistant_only())
+        asyncio.run(run_assistant_only(args.audio_source))
     else:
         # Run the server with the assistant
         print("Starting server with assistant...")
@@ -3,7 +3,7 @@ import re
 import urllib.parse
 import json
 from typing import Dict, Any, Tuple, Optional
-import groq
+from groq import AsyncGroq
 from src.utils.config import URL_PATH, QUERY_PATH, URL_LLM_MODEL
 from src.utils.logger import setup_logging
 
@@ -15,7 +15,7 @@ class SearchQueryFinder:
     def __init__(self, queries_file: str = QUERY_PATH, urls_file: str = URL_PATH, groq_api_key: str = GROQ_API):
         self.queries = self._load_json(queries_file)
         self.urls = self._load_json(urls_file)
-        self.groq_client = groq.Client(api_key=groq_api_key)
+        self.groq_client = AsyncGroq(api_key=groq_api_key)
         self.PLATFORM_PATTERN = re.compile(r'Platform\s*:\s*(\w+)', re.IGNORECASE)
         self.QUERY_PATTERN = re.compile(r'Query\s*:\s*(.+)', re.IGNORECASE)
 
@@ -29,20 +29,35 @@ class SearchQueryFinder:
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2)
 
-    def find_query(self, prompt: str) -> Optional[str]:
+    def _cached_action(self, prompt: str) -> Optional[Dict[str, Any]]:
+        return next((query['action'] for query in self.queries if str(query['prompt']).lower() == prompt.lower()), None)
+
+    async def extract(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the platform and query for a prompt without writing the cache file.
+        Safe to run speculatively: cancelling it aborts the LLM request. Pass the
+        result to find_query() if it is needed.
+        """
+        cached_result = self._cached_action(prompt)
+        if cached_result:
+            return cached_result['platform'], cached_result['query']
+        return await self._llm_search(prompt)
+
+    async def find_query(self, prompt: str, extraction: Optional[Tuple[Optional[str], Optional[str]]] = None) -> Optional[str]:
         """
         Finds the platform, query, and constructs the URL based on the prompt.
-        If not found in cached queries, it uses LLM for query extraction.
+        If not found in cached queries, it uses LLM for query extraction, unless
+        an earlier extract() result is passed in.
         """
         # Check cached queries first
-        cached_result = next((query['action'] for query in self.queries if str(query['prompt']).lower() == prompt.lower()), None)
+        cached_result = self._cached_action(prompt)
 
         if cached_result:
             logger.info(f"Found cached result: {cached_result}")
             return self._construct_url(cached_result['platform'], cached_result['query'])
 
         # Call LLM if query not found in cache
-        platform, query = self._llm_search(prompt)
+        platform, query = extraction if extraction is not None else await self._llm_search(prompt)
         
         # Cache the new result and return the constructed URL
         if platform:
@@ -54,7 +69,7 @@ class SearchQueryFinder:
 
         return None
 
-    def _llm_search(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+    async def _llm_search(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Use LLM to extract the action. Returns platform and query.
         """
@@ -93,7 +108,7 @@ class SearchQueryFinder:
         ]
 
         try:
-            chat_completion = self.groq_client.chat.completions.create(
+            chat_completion = await self.groq_client.chat.completions.create(
                 model=URL_LLM_MODEL,
                 messages=conversation,
                 max_tokens=100,
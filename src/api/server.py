@@ -1,13 +1,17 @@
 # server.py
 import asyncio
 import signal
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from typing import Optional
+import numpy as np
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from contextlib import asynccontextmanager
 
-from src.utils.shared_resources import EVENT_BUS
+from src.utils.shared_resources import EVENT_BUS, STATE_MANAGER, TRACER
 from src.utils.logger import setup_logging
 from src.api.websocket_conn import AssistantBackend
 from src.assistant.main import Assistant
+from src.assistant.session import SessionManager, SharedModels
+from src.core.error import SessionError
 
 # Set up logging
 logger = setup_logging(module_name="API_Handler")
@@ -18,13 +22,21 @@ assistant_backend = AssistantBackend(event_bus=EVENT_BUS)
 # Track background tasks
 background_tasks = set()
 assistant_instance = None
+shared_models: Optional[SharedModels] = None
+session_manager: Optional[SessionManager] = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global assistant_instance
+    global assistant_instance, shared_models, session_manager
+
+    # Whisper and the TTS engines are loaded once; the local assistant and every
+    # client session on /sessions/ws share them
+    shared_models = SharedModels()
+    await shared_models.initialize()
+    session_manager = SessionManager(models=shared_models)
     
     # Create the assistant but modify to run user_input_loop as a background task
-    assistant_instance = await Assistant.create(sever_connected=True)
+    assistant_instance = await Assistant.create(sever_connected=True, **shared_models.components())
     
     processing_task = await assistant_instance.start_processing()
     background_tasks.add(processing_task)
@@ -45,15 +57,71 @@ async def shutdown():
     for task in background_tasks:
         task.cancel()
     
+    if session_manager is not None:
+        await session_manager.shutdown()
+
     # If assistant has a shutdown method
-    if assistant_instance and hasattr(assistant_instance, "central_manager"):
-        await assistant_instance.central_manager.shutdown()
+    if assistant_instance and hasattr(assistant_instance, "shutdown"):
+        await assistant_instance.shutdown()
+
+    if shared_models is not None:
+        await shared_models.shutdown()
     
     logger.info("Shutdown complete")
 
 # Create the FastAPI app with lifespan handler
 app = FastAPI(lifespan=lifespan)
 
+@app.get("/stats/state")
+async def state_stats(reset: bool = False, session: Optional[str] = None):
+    """Time-in-state histograms, rejected transitions by caller and recent transitions."""
+    state_manager = STATE_MANAGER
+    if session is not None:
+        try:
+            state_manager = session_manager.get(session).state_manager
+        except SessionError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    stats = state_manager.get_stats()
+    if reset:
+        state_manager.reset_stats()
+    return stats
+
+@app.get("/stats/cancellation")
+async def cancellation_stats(session: Optional[str] = None):
+    """Barge-in counts by reason, tasks torn down, stragglers and wake-frame-to-teardown latency."""
+    assistant = assistant_instance
+    if session is not None:
+        try:
+            assistant = session_manager.get(session).assistant
+        except SessionError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    return assistant.central_manager.turns.get_stats()
+
+@app.get("/stats/audio")
+async def audio_stats(session: Optional[str] = None):
+    """Capture health: input overruns, dropped frames, tap lag, utterance queue depth, pre-roll fill and loop lag."""
+    assistant = assistant_instance
+    if session is not None:
+        try:
+            assistant = session_manager.get(session).assistant
+        except SessionError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    return assistant.central_manager.get_audio_stats()
+
+@app.get("/stats/sessions")
+async def session_stats():
+    """Open sessions and the queues in front of the shared models."""
+    return session_manager.get_stats()
+
+@app.get("/stats/traces")
+async def trace_stats(limit: int = 50):
+    """Per-stage latency percentiles across recent turns, plus the latest turn traces."""
+    return {
+        'stages': TRACER.get_stage_stats(),
+        'dropped': TRACER.dropped,
+        'traces': TRACER.get_traces(limit),
+    }
+
 # Add WebSocket endpoint
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -73,5 +141,43 @@ async def websocket_endpoint(websocket: WebSocket):
         if websocket in assistant_backend.active_connections:
             assistant_backend.active_connections.remove(websocket)
         await websocket.close()
+
+@app.websocket("/sessions/ws")
+async def session_endpoint(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    A private assistant for one client.
+
+    The client streams 16 kHz mono int16 PCM as binary messages and receives
+    {"transcript"} / {"response"} JSON messages. Speech comes back as a JSON
+    {"audio": {"samplerate", "samples"}} header followed by a binary message
+    of int16 PCM. Pass ?session_id= (letters, digits, '_' or '-') to keep the
+    conversation history across reconnects.
+    """
+    await websocket.accept()
+
+    async def send_audio(audio: np.ndarray, samplerate: int) -> None:
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+        await websocket.send_json({"audio": {"samplerate": samplerate, "samples": len(pcm)}})
+        await websocket.send_bytes(pcm.tobytes())
+
+    try:
+        session = await session_manager.open(session_id=session_id, audio_output=send_audio, server_connected=True)
+    except SessionError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+
+    # Transcripts and replies are published on the session's own bus
+    backend = AssistantBackend(event_bus=session.event_bus)
+    backend.active_connections.append(websocket)
+    try:
+        while True:
+            session.feed(await websocket.receive_bytes())
+    except WebSocketDisconnect:
+        logger.info(f"Session {session.id} disconnected")
+    except Exception as e:
+        logger.error(f"Unexpected error in session {session.id}: {e}")
+    finally:
+        backend.active_connections.clear()
+        await session_manager.close(session.id)
         
 # This file can be run with: uvicorn src.api.server:app --host 0.0.0.0 --port 8000
\ No newline at end of file
@@ -3,6 +3,7 @@ from fastapi import WebSocket
 from typing import List
 from src.utils.logger import setup_logging
 from src.core.event_bus import EventBus
+from src.core.mailbox import OverflowPolicy
 
 class AssistantBackend:
     def __init__(self, event_bus: EventBus):
@@ -40,7 +41,9 @@ class AssistantBackend:
         self.event_bus.subscribe(
             topic_name="send.api",
             callback=self._get_result,
-            async_handler=True
+            async_handler=True,
+            mailbox_size=64,
+            overflow=OverflowPolicy.DROP_OLDEST
         )
 
     async def disconnect(self, websocket: WebSocket):
@@ -1,40 +1,88 @@
 # main.py
 import asyncio
-from src.llm.model import groq_prompt
-from src.utils.shared_resources import EVENT_BUS, STATE_MANAGER
-from src.core.state import  AssistantState
+import time
+from typing import Hashable, Optional
+from src.llm.model import ConversationHistory, groq_prompt, groq_stream, remember_exchange
+from src.utils.shared_resources import EVENT_BUS, STATE_MANAGER, TRACER
+from src.core.event_bus import EventBus
+from src.core.state import  AssistantState, StateManager
+from src.core.mailbox import PublishMode
+from src.core.journal import EventJournal
 from src.actions.function_registry import FunctionRegistry
 from src.audio.central_manager import CentralAudioManager
 from src.actions.url.url_parser import SearchQueryFinder
 from src.actions.cmdpharser import process_command
 from src.utils.logger import setup_logging
+from src.speech.tts.sentences import SentenceBuffer
+from src.utils.config import AUDIO_SOURCE, EVENT_JOURNAL_PATH, LLM_STREAMING
 
 class Assistant:
-    def __init__(self):
-        self.event_bus = EVENT_BUS
-        self.state_manager = STATE_MANAGER
+    def __init__(
+        self,
+        event_bus: Optional[EventBus] = None,
+        state_manager: Optional[StateManager] = None,
+        history: Optional[ConversationHistory] = None,
+        session_id: Hashable = "default"
+    ):
+        # Without a bus of its own this is the process's only assistant, which
+        # also owns the event journal and the tracer
+        self._standalone = event_bus is None
+        self.event_bus = event_bus or EVENT_BUS
+        self.state_manager = state_manager or STATE_MANAGER
+        self.history = history
+        self.session_id = session_id
         self.logger = None
         self.transcription = None
         self.classification = None
         self.central_manager: CentralAudioManager = None
         self.search_query: SearchQueryFinder = None
         self.function_caller: FunctionRegistry = None
+        self.journal: EventJournal = None
         self.ServerConnected = False
+        self._processing_task: Optional[asyncio.Task] = None
+        self._audio_exhausted = False
+        self._shut_down = False
 
     @classmethod
-    async def create(cls, sever_connected: bool = False):
-        """Factory method to initialize the class asynchronously."""
-        self = cls()  # Create instance
+    async def create(
+        cls,
+        sever_connected: bool = False,
+        audio_source: Optional[str] = AUDIO_SOURCE,
+        event_bus: Optional[EventBus] = None,
+        state_manager: Optional[StateManager] = None,
+        history: Optional[ConversationHistory] = None,
+        session_id: Hashable = "default",
+        **components
+    ):
+        """
+        Factory method to initialize the class asynchronously.
+
+        audio_source selects the microphone input (see src.audio.sources.open_audio_source).
+        With a file or stdin the assistant shuts down once the audio runs out.
+
+        A session (see src.assistant.session) passes its own bus, state manager
+        and history, plus the shared models in **components, which go to
+        CentralAudioManager.
+        """
+        self = cls(event_bus=event_bus, state_manager=state_manager, history=history, session_id=session_id)
         
         # Initialize synchronous components
         self.logger = setup_logging(module_name="Assistant")
         self.ServerConnected = sever_connected
         # Initialize async components
-        self.event_bus = EVENT_BUS
-        self.state_manager = STATE_MANAGER
         self.function_caller = FunctionRegistry()
+        if EVENT_JOURNAL_PATH and self._standalone:
+            self.journal = EventJournal(self.event_bus, EVENT_JOURNAL_PATH)
+            self.journal.start()
         # Create background tasks
-        self.central_manager = await CentralAudioManager.create(server_connected=sever_connected)
+        self.central_manager = await CentralAudioManager.create(
+            server_connected=sever_connected,
+            audio_source=audio_source,
+            event_bus=self.event_bus,
+            state_manager=self.state_manager,
+            session_id=session_id,
+            **components
+        )
         self.search_query = SearchQueryFinder()
         await self.event_subscriber()
 
@@ -43,7 +91,8 @@ class Assistant:
     # Add a method to start processing
     async def start_processing(self):
         """Start the user input loop as a separate task."""
-        return asyncio.create_task(self.user_input_loop())
+        self._processing_task = asyncio.create_task(self.user_input_loop())
+        return self._processing_task
 
     async def _get_result(self, transcript:str = None, classification:str = None) -> None:
 
@@ -55,6 +104,28 @@ class Assistant:
             self.logger.info("Got the classification")
             self.classification = classification
 
+    async def shutdown(self) -> None:
+        """Stop the event journal (if recording) and shut down the audio pipeline."""
+        if self._shut_down:
+            return
+        self._shut_down = True
+        if self.journal is not None:
+            self.journal.stop()
+        if self._standalone:
+            TRACER.close()
+        await self.central_manager.shutdown()
+
+    async def _on_audio_exhausted(self) -> None:
+        """A recorded audio source has been played through; end the run."""
+        if self._audio_exhausted:
+            return
+        self._audio_exhausted = True
+        self.logger.info("Audio input finished, shutting down.")
+        # Cancel first: this handler runs on the bus, which shutdown() tears down
+        if self._processing_task is not None:
+            self._processing_task.cancel()
+        await self.shutdown()
+
     async def event_subscriber(self) -> None:
 
         self.event_bus.subscribe(
@@ -62,57 +133,210 @@ class Assistant:
         callback=self._get_result, 
         async_handler=True
         )
+        self.event_bus.subscribe(
+            topic_name="audio.source.exhausted",
+            callback=self._on_audio_exhausted,
+            async_handler=True
+        )
+
+    async def _stream_reply(
+        self,
+        prompt: str,
+        img_context: Optional[str],
+        function_execution: Optional[str],
+        started_at: float,
+        remember: bool = True,
+        release: Optional[asyncio.Event] = None
+    ) -> str:
+        """
+        Stream a reply from the LLM and speak it sentence by sentence.
+
+        Each completed sentence is published on 'tts.stream.sentence' while the
+        rest of the reply is still generating. Until `release` is set, sentences
+        are held back so a speculative reply can be cancelled without having
+        said anything.
+
+        Returns:
+            str: The full reply text
+        """
+        splitter = SentenceBuffer()
+        parts, pending = [], []
+        speaking = False
+
+        turn = TRACER.root_span()
+
+        async def speak(sentences) -> None:
+            nonlocal speaking
+            pending.extend(sentences)
+            if not pending or (release is not None and not release.is_set()):
+                return
+            if not speaking:
+                # Playback belongs to the turn, not to this LLM call
+                with TRACER.activate(turn):
+                    await self.event_bus.publish("tts.stream.start", started_at=started_at)
+                speaking = True
+            for sentence in pending:
+                await self.event_bus.publish("tts.stream.sentence", sentence)
+            pending.clear()
+
+        try:
+            async for chunk in groq_stream(prompt, img_context, function_execution, remember=remember, history=self.history):
+                parts.append(chunk)
+                await speak(splitter.feed(chunk))
+            await speak(splitter.flush())
+            if release is not None and pending:
+                # The reply finished before routing did
+                await release.wait()
+                await speak([])
+        finally:
+            if speaking:
+                await self.event_bus.publish("tts.stream.end")
+        return "".join(parts)
+
+    async def _reply(
+        self,
+        prompt: str,
+        img_context: Optional[str],
+        function_execution: Optional[str],
+        started_at: float,
+        remember: bool = True,
+        release: Optional[asyncio.Event] = None
+    ) -> str:
+        with TRACER.span("llm", speculative=release is not None, streaming=LLM_STREAMING):
+            if LLM_STREAMING:
+                return await self._stream_reply(prompt, img_context, function_execution, started_at, remember, release)
+            return await groq_prompt(
+                prompt=prompt, img_context=img_context, function_execution=function_execution,
+                remember=remember, history=self.history
+            )
+
+    async def _respond(self, user_prompt: str, started_at: float) -> str:
+        """
+        Route a prompt and answer it.
+
+        Function routing, URL extraction and a plain conversational reply all
+        start as soon as the transcript arrives. Once routing decides, the
+        speculative results it doesn't need are cancelled, so a conversation
+        turn costs one LLM round trip instead of two.
+        """
+        routing = asyncio.create_task(TRACER.wrap("route", self.function_caller.call(user_prompt)))
+        # Cancelling the extraction aborts its LLM request
+        url_extraction = asyncio.create_task(TRACER.wrap("url_extract", self.search_query.extract(user_prompt)))
+        release = asyncio.Event()
+        reply = asyncio.create_task(
+            self._reply(user_prompt, None, None, started_at, remember=False, release=release)
+        )
+        try:
+            action = str(await routing).lower()
+
+            if not action or "none" in action:
+                url_extraction.cancel()
+                release.set()
+                response = await reply
+                remember_exchange(user_prompt, response, self.history)
+                self.logger.info("Used the speculative reply")
+                return response
+
+            reply.cancel()
+            if 'open_browser' in action:
+                self.logger.info("OPENING BROWSER")
+                url_parser = await self.search_query.find_query(prompt=user_prompt, extraction=await url_extraction)
+                with TRACER.span("tool", action=action):
+                    f_exe, visual_context = await asyncio.to_thread(process_command, command=action, url=url_parser)
+            else:
+                url_extraction.cancel()
+                self.logger.info("EXECUTING FUNCTION")
+                # Off the loop, so barge-in can abandon a slow tool (the thread finishes on its own)
+                with TRACER.span("tool", action=action):
+                    f_exe, visual_context = await asyncio.to_thread(process_command, command=action, user_prompt=user_prompt)
+            self.logger.info(f"f_exe: {f_exe} || visual_context: {visual_context}")
+
+            print("== Reached groq promt ==")
+            return await self._reply(user_prompt, visual_context, f_exe, started_at)
+        finally:
+            for task in (routing, url_extraction, reply):
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark a discarded failure as retrieved so asyncio doesn't warn
 
     async def user_input_loop(self):
         while True:
             try:
 
-                await self.event_bus.publish("start.wakeword.detection")
+                self.transcription = None
+                TRACER.detach()
+                # Detection runs in the background (it is a no-op if already running);
+                # sleep until "Hey Arlo" moves the assistant to LISTENING. A "Hey Arlo"
+                # that barged in has already stopped detection and moved to LISTENING.
+                if await self.state_manager.get_state() != AssistantState.LISTENING:
+                    await self.event_bus.publish("start.wakeword.detection", mode=PublishMode.FIRE_AND_FORGET)
+                await self.state_manager.wait_for(AssistantState.LISTENING)
+
+                # One trace per turn, starting at the wake word frame. Its trace id travels
+                # with every event published from here; TTS finishes it after playback.
+                detected_at = self.central_manager.wake_manager.wake_detected_at or time.perf_counter()
+                root = TRACER.start_trace("turn", start=detected_at, session=str(self.session_id))
+                TRACER.record_span("wake", detected_at)
+                # LLM, tool, synthesis and playback work all join this scope
+                scope = self.central_manager.turns.open(trace=root)
+
                 await self.event_bus.publish("start.audio.recording")
                 user_prompt: str = self.transcription
 
                 if user_prompt is not None and user_prompt.strip().lower() in ["exit", "exit.", "exit!"]:
                     self.logger.info("Exit command received. Shutting down.")
-                    await self.central_manager.shutdown()
+                    TRACER.finish(outcome="exit")
+                    await self.shutdown()
                     break
 
                 if await self.state_manager.get_state() == AssistantState.IDLE:
+                    TRACER.finish(outcome="no_speech")
                     continue
 
                 await self.state_manager.set_state(AssistantState.PROCESSING)    
 
-                action = await self.function_caller.call(user_prompt)
-                action = str(action).lower()
-                f_exe = None
-                visual_context = None
-
-                if action and "none" not in action.lower():
-                    if 'open_browser' in action:
-                        self.logger.info("OPENING BROWSER")
-                        url_parser = self.search_query.find_query(prompt=user_prompt)
-                        f_exe, visual_context = process_command(command=action, url=url_parser)
-                    else:
-                        self.logger.info("EXECUTING FUNCTION")
-                        f_exe, visual_context = process_command(command=action, user_prompt=user_prompt)
-                    self.logger.info(f"f_exe: {f_exe} || visual_context: {visual_context}")
-
-                print("== Reached groq promt ==")
+                source = self.central_manager.audio_source
+                if source.live:
+                    # Listen again while thinking, so "Stop Arlo" or a new "Hey Arlo" can interrupt.
+                    # Recorded audio would be read far ahead of the turn, so it waits as before.
+                    await self.event_bus.publish("start.wakeword.detection", mode=PublishMode.FIRE_AND_FORGET)
 
-                response = await groq_prompt(prompt=user_prompt, img_context=visual_context, function_execution=f_exe)
+                started_at = time.perf_counter()
+                turn = scope.create_task(self._respond(user_prompt, started_at), name="respond")
+                await asyncio.wait({turn})
+                if turn.cancelled():
+                    self.logger.info(f"Turn cancelled by '{scope.cancelled}'")
+                    TRACER.finish(outcome="cancelled")
+                    # The wake word manager moves on to IDLE, LISTENING or PAUSED once the turn is torn down
+                    await self.state_manager.wait_for(
+                        lambda state: state not in (AssistantState.PROCESSING, AssistantState.SPEAKING)
+                    )
+                    continue
+                response = turn.result()
                 if self.ServerConnected:
-                    await self.event_bus.publish("send.api",response=response)
+                    await self.event_bus.publish("send.api", mode=PublishMode.FIRE_AND_FORGET, response=response)
                 print("\n" + "="*50)
                 print(f"ASSISTANT: {response}")
                 print("="*50)
                 
+                if LLM_STREAMING:
+                    # Already spoken sentence by sentence while it was generated
+                    continue
+
                 try:
-                    await self.event_bus.publish("start.tts.playback", response)
+                    # Don't wait for playback, so wake word detection can catch "Stop Arlo"
+                    await self.event_bus.publish(
+                        "start.tts.playback", response, started_at=started_at, mode=PublishMode.FIRE_AND_FORGET
+                    )
                 except Exception as e:
                     self.logger.error(f"Failed to play audio: {e}")            
             
             except (EOFError, KeyboardInterrupt):
+                TRACER.finish(outcome="exit")
                 self.logger.info("User triggered exit.")
-                await self.central_manager.shutdown()
+                await self.shutdown()
             except Exception as e:
+                TRACER.finish(outcome="error")
                 self.logger.error(f"An unexpected error occurred: {e}")
-                await self.central_manager.shutdown()
\ No newline at end of file
+                await self.shutdown()
\ No newline at end of file
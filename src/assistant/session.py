@@ -0,0 +1,207 @@
+# session.py
+import re
+import time
+import uuid
+import asyncio
+from typing import Any, Dict, Optional
+from src.assistant.main import Assistant
+from src.audio.sources import AudioSource, PushSource
+from src.core.error import SessionError
+from src.core.event_bus import EventBus
+from src.core.scheduler import FairScheduler
+from src.core.state import StateManager
+from src.llm.model import ConversationHistory
+from src.speech.stt.whisper_engine import WhisperEngine
+from src.speech.tts.tts_manager import AudioOutput, create_engines
+from src.utils.config import MAX_SESSIONS, SESSIONS_DIR, STT_CONCURRENCY, TTS_CONCURRENCY
+from src.utils.logger import setup_logging
+
+# Session ids name the history file, so they are limited to characters that need no escaping
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+class SharedModels:
+    """
+    The heavy models, loaded once per process and shared by every session.
+
+    Whisper and the TTS engines are stateless between calls, so sessions take
+    turns on them through FairSchedulers. Porcupine and Cobra keep per-stream
+    state and stay per session; they are small native instances.
+    """
+    def __init__(self, stt_concurrency: int = STT_CONCURRENCY, tts_concurrency: int = TTS_CONCURRENCY):
+        self.whisper_engine = WhisperEngine(concurrency=stt_concurrency)
+        self.tts_engines = create_engines()
+        self.tts_scheduler = FairScheduler("tts", concurrency=tts_concurrency)
+
+    async def initialize(self) -> None:
+        await self.whisper_engine.initialize()
+
+    async def shutdown(self) -> None:
+        await self.whisper_engine.shutdown()
+
+    def components(self) -> Dict[str, Any]:
+        """Keyword arguments for Assistant.create() / CentralAudioManager."""
+        return {
+            'whisper_engine': self.whisper_engine,
+            'tts_engines': self.tts_engines,
+            'tts_scheduler': self.tts_scheduler,
+        }
+
+    def forget(self, session_id: str) -> None:
+        self.whisper_engine.scheduler.forget(session_id)
+        self.tts_scheduler.forget(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'stt': self.whisper_engine.scheduler.get_stats(),
+            'tts': self.tts_scheduler.get_stats(),
+        }
+
+class Session:
+    """One client's assistant: its own event bus, state machine, history and turn loop."""
+    def __init__(self, session_id: str, audio_source: AudioSource):
+        self.id = session_id
+        self.audio_source = audio_source
+        self.event_bus = EventBus()
+        self.state_manager = StateManager()
+        self.history = ConversationHistory(SESSIONS_DIR / f"{session_id}.json")
+        self.assistant: Optional[Assistant] = None
+        self.task: Optional[asyncio.Task] = None
+        self.created_at = time.time()
+
+    def feed(self, pcm: bytes) -> None:
+        """Pass microphone audio from the client to a PushSource session."""
+        if not isinstance(self.audio_source, PushSource):
+            raise SessionError(f"Session {self.id} does not take pushed audio")
+        self.audio_source.feed(pcm)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state_manager.current_state.value,
+            'age_s': round(time.time() - self.created_at, 3),
+            'audio_s': round(self.audio_source.clock, 3),
+            'cancellation': self.assistant.central_manager.turns.get_stats() if self.assistant else None,
+            'audio': self.assistant.central_manager.get_audio_stats() if self.assistant else None,
+        }
+
+class SessionManager:
+    """
+    Serves many users from one process.
+
+    Each open() builds a complete turn pipeline (wake word, VAD, recorder,
+    assistant loop) around a fresh EventBus and StateManager, wired to the
+    shared models. Sessions never see each other's events, states or history.
+
+    Example:
+        manager = SessionManager()
+        await manager.initialize()
+        session = await manager.open(audio_output=send_to_client)
+        session.feed(pcm_bytes)
+        ...
+        await manager.close(session.id)
+    """
+    def __init__(self, models: Optional[SharedModels] = None, max_sessions: int = MAX_SESSIONS):
+        self.logger = setup_logging(module_name="SessionManager")
+        self._owns_models = models is None
+        self.models = models or SharedModels()
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Session] = {}
+        self._opened = 0
+
+    async def initialize(self) -> None:
+        if self._owns_models:
+            await self.models.initialize()
+
+    async def open(
+        self,
+        session_id: Optional[str] = None,
+        audio_source: Optional[AudioSource] = None,
+        audio_output: Optional[AudioOutput] = None,
+        server_connected: bool = False
+    ) -> Session:
+        """
+        Start a session and its turn loop.
+
+        Args:
+            session_id (str): Reuse an id to keep a client's history across connections; random if omitted.
+                Up to 64 letters, digits, '_' or '-'
+            audio_source (AudioSource): Microphone input; a PushSource fed through Session.feed() if omitted
+            audio_output: Coroutine taking (audio, samplerate) that delivers speech to the client
+            server_connected (bool): Publish transcripts and replies on the session's 'send.api' topic
+
+        Returns:
+            Session: The running session
+
+        Raises:
+            SessionError: If the session limit is reached, or the id is invalid or already open
+        """
+        if len(self.sessions) >= self.max_sessions:
+            raise SessionError(f"Session limit of {self.max_sessions} reached")
+        session_id = session_id or uuid.uuid4().hex
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
+            # Rewriting the id instead would let distinct clients share one history file
+            raise SessionError(f"Invalid session id {session_id!r}: use up to 64 letters, digits, '_' or '-'")
+        if session_id in self.sessions:
+            raise SessionError(f"Session {session_id} is already open")
+
+        session = Session(session_id, audio_source or PushSource())
+        self.sessions[session_id] = session
+        try:
+            session.assistant = await Assistant.create(
+                sever_connected=server_connected,
+                audio_source=session.audio_source,
+                event_bus=session.event_bus,
+                state_manager=session.state_manager,
+                history=session.history,
+                session_id=session_id,
+                audio_output=audio_output,
+                **self.models.components()
+            )
+        except Exception:
+            self.sessions.pop(session_id, None)
+            raise
+        session.task = await session.assistant.start_processing()
+        # The loop also ends on its own, e.g. when the client's audio stream ends
+        session.task.add_done_callback(lambda _: self._discard(session))
+        self._opened += 1
+        self.logger.info(f"Opened session {session_id} ({len(self.sessions)} active)")
+        return session
+
+    def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise SessionError(f"Unknown session {session_id}")
+        return session
+
+    def _discard(self, session: Session) -> None:
+        if self.sessions.get(session.id) is session:
+            del self.sessions[session.id]
+            self.models.forget(session.id)
+            self.logger.info(f"Closed session {session.id} ({len(self.sessions)} active)")
+
+    async def close(self, session_id: str) -> None:
+        """Stop a session's loop and release its pipeline. Unknown ids are ignored."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        if isinstance(session.audio_source, PushSource):
+            session.audio_source.end()
+        if session.task is not None and not session.task.done():
+            session.task.cancel()
+        try:
+            await session.assistant.shutdown()
+        finally:
+            self._discard(session)
+
+    async def shutdown(self) -> None:
+        await asyncio.gather(*(self.close(session_id) for session_id in list(self.sessions)), return_exceptions=True)
+        if self._owns_models:
+            await self.models.shutdown()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'active': len(self.sessions),
+            'max_sessions': self.max_sessions,
+            'opened': self._opened,
+            'sessions': {session_id: session.get_stats() for session_id, session in self.sessions.items()},
+            'models': self.models.get_stats(),
+        }
@@ -0,0 +1,227 @@
+# buffers.py
+import struct
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of audio samples, e.g. the recorder's pre-roll.
+
+    The storage is allocated once; write() copies into it and never allocates.
+    segments() returns the contents oldest first as two views into the ring,
+    so reading does not copy either.
+    """
+    def __init__(self, capacity: int, dtype: np.dtype = np.int16):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(capacity, dtype=self.dtype)
+        self._size = 0
+        # Samples written since construction. Sample i always lives at i % capacity,
+        # so `written` doubles as a sample clock for indexing into the ring.
+        self.written = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def oldest(self) -> int:
+        """Index of the oldest sample still buffered."""
+        return self.written - self._size
+
+    def write(self, samples: np.ndarray) -> None:
+        count = len(samples)
+        if count > self.capacity:
+            # Only the newest `capacity` samples survive
+            self.written += count - self.capacity
+            samples = samples[count - self.capacity:]
+            count = self.capacity
+        position = self.written % self.capacity
+        first = min(count, self.capacity - position)
+        self._data[position:position + first] = samples[:first]
+        if count > first:
+            self._data[:count - first] = samples[first:]
+        self.written += count
+        self._size = min(self._size + count, self.capacity)
+
+    def segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The buffered samples, oldest first, as two views. The second is empty
+        unless the data wraps around the end of the ring. The views are only
+        valid until the next write().
+        """
+        return self.segments_at(self.oldest, self._size)
+
+    def segments_at(self, start: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Like segments(), for `count` samples from sample index `start`.
+
+        Raises:
+            IndexError: If part of the range was overwritten or not written yet
+        """
+        if start < self.oldest or start + count > self.written:
+            raise IndexError(f"Samples {start}-{start + count} not in ring ({self.oldest}-{self.written})")
+        position = start % self.capacity
+        if position + count <= self.capacity:
+            return self._data[position:position + count], self._data[:0]
+        return self._data[position:], self._data[:position + count - self.capacity]
+
+    def read(self) -> np.ndarray:
+        """A contiguous copy of the buffered samples, oldest first."""
+        return np.concatenate(self.segments())
+
+    def clear(self) -> None:
+        self._size = 0
+
+class UtteranceBuffer:
+    """
+    Growable contiguous sample buffer for one utterance.
+
+    Capacity doubles when full, so appending a frame is amortised O(frame).
+    take() hands the filled part over as a view without copying and starts
+    the next utterance on fresh storage, so the array given to Whisper is
+    never overwritten.
+    """
+    def __init__(self, initial_capacity: int, dtype: np.dtype = np.int16):
+        self.initial_capacity = max(1, initial_capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.empty(self.initial_capacity, dtype=self.dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._data):
+            return
+        capacity = max(len(self._data), self.initial_capacity)
+        while capacity < size:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=self.dtype)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def extend(self, *chunks: np.ndarray) -> None:
+        if len(chunks) == 1:
+            # The per-frame case
+            chunk = chunks[0]
+            end = self._size + len(chunk)
+            if end > len(self._data):
+                self._reserve(end)
+            self._data[self._size:end] = chunk
+            self._size = end
+            return
+        self._reserve(self._size + sum(len(chunk) for chunk in chunks))
+        for chunk in chunks:
+            self._data[self._size:self._size + len(chunk)] = chunk
+            self._size += len(chunk)
+
+    def view(self) -> np.ndarray:
+        """The samples so far. Only valid until the next extend() or take()."""
+        return self._data[:self._size]
+
+    def take(self) -> np.ndarray:
+        """Return the utterance and start an empty one on new storage."""
+        utterance = self._data[:self._size]
+        self._data = np.empty(self.initial_capacity, dtype=self.dtype)
+        self._size = 0
+        return utterance
+
+    def clear(self) -> None:
+        self._size = 0
+
+class WavSpill:
+    """
+    Mono int16 audio appended to a memory-mapped WAV file.
+
+    Samples go straight into the page cache through the mapping, so a long
+    recording costs disk space rather than process memory, and segment()
+    returns views of the file without reading it in. The file is mapped in
+    chunks of `grow_duration` seconds, each by its own mapping, and grows by
+    adding a chunk; a mapping is never resized, which Windows does not allow
+    while views of it exist. Until close() the header sizes are
+    placeholders; after it the file is a normal WAV.
+    """
+    HEADER_BYTES = 44
+
+    def __init__(self, path: str | Path, sample_rate: int = 16000, grow_duration: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self._chunk = max(1, int(grow_duration * sample_rate))
+        self._chunks: List[np.memmap] = []
+        self._unflushed = 0  # First chunk written to since the last flush()
+        self._file = open(self.path, 'w+b')
+        self._file.write(self._header(0))
+        self._file.flush()
+        self._add_chunk()
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def _header(self, frames: int) -> bytes:
+        data_bytes = frames * 2
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_bytes, b'WAVE',
+            b'fmt ', 16, 1, 1, self.sample_rate, self.sample_rate * 2, 2, 16,
+            b'data', data_bytes
+        )
+
+    def _add_chunk(self) -> None:
+        offset = self.HEADER_BYTES + 2 * self._chunk * len(self._chunks)
+        # Mapping past the end of the file extends it without touching the existing mappings
+        self._chunks.append(np.memmap(self._file, dtype='<i2', mode='r+', offset=offset, shape=(self._chunk,)))
+
+    def append(self, samples: np.ndarray) -> None:
+        written = 0
+        while written < len(samples):
+            index, position = divmod(self.frames, self._chunk)
+            if index == len(self._chunks):
+                self._add_chunk()
+            count = min(len(samples) - written, self._chunk - position)
+            self._chunks[index][position:position + count] = samples[written:written + count]
+            written += count
+            self.frames += count
+
+    def segment(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples [start, end) as a view of the file. A segment that crosses a
+        chunk boundary comes back as a copy instead.
+        """
+        end = min(end, self.frames)
+        if start >= end:
+            return np.empty(0, dtype='<i2')
+        first, last = start // self._chunk, (end - 1) // self._chunk
+        if first == last:
+            offset = first * self._chunk
+            return self._chunks[first][start - offset:end - offset]
+        return np.concatenate([
+            self._chunks[index][max(start - index * self._chunk, 0):min(end - index * self._chunk, self._chunk)]
+            for index in range(first, last + 1)
+        ])
+
+    def flush(self) -> None:
+        """Write dirty pages back so the kernel can drop them from memory."""
+        for chunk in self._chunks[self._unflushed:]:
+            chunk.flush()
+        self._unflushed = max(len(self._chunks) - 1, 0)
+
+    def close(self) -> None:
+        """Fill in the header and trim the file to the samples written."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._chunks = []
+        self._file.seek(0)
+        self._file.write(self._header(self.frames))
+        self._file.flush()
+        try:
+            self._file.truncate(self.HEADER_BYTES + 2 * self.frames)
+        except OSError:
+            # Windows refuses while segment() views are still mapped; the header already ends the data
+            pass
+        self._file.close()
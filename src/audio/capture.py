@@ -0,0 +1,262 @@
+# capture.py
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import numpy as np
+from src.audio.buffers import RingBuffer
+from src.audio.sources import AudioSource, EndOfAudio
+from src.core.error import AudioError
+from src.core.metrics import LatencyHistogram
+from src.utils.logger import setup_logging
+
+class CaptureService:
+    """
+    One always-open input shared by every audio consumer of a pipeline.
+
+    Captured frames go into a ring indexed by frame number (frames since
+    capture began), and each consumer reads through its own Tap, a cursor
+    into that ring. The device is opened once and never reopened per turn.
+
+    When a tap stops, its cursor is left as the hand-off point and the next
+    tap to start resumes from there. So when the wake word detector stops
+    on "Hey Arlo", the recorder picks up at the frame right after the wake
+    word, even if it starts a few hundred milliseconds later: "Hey Arlo, open
+    YouTube" said in one breath is recorded in full.
+
+    Live sources are captured continuously by a pump task. Recorded sources
+    can be read faster than real time, so they are pulled on demand instead
+    and never overrun a slow reader.
+
+    While a live source is captured, a watchdog task times how late the
+    event loop wakes it. That loop lag is what delays every reader of the
+    ring, and once it exceeds the source's buffer the device overruns.
+
+    Example:
+        capture = CaptureService(DeviceSource(latency='low'))
+        wake_tap, record_tap = capture.tap("wake"), capture.tap("record")
+        ...
+        capture.close()
+    """
+    def __init__(
+        self,
+        source: AudioSource,
+        buffer_duration: float = 30.0,
+        block_frames: int = 512,
+        lag_interval: float = 0.1
+    ):
+        """
+        Args:
+            source (AudioSource): The input to capture
+            buffer_duration (float): Seconds of audio kept for taps that fall behind or start late
+            block_frames (int): Frames read from the source at a time
+            lag_interval (float): Seconds between event loop lag samples while capturing live audio
+        """
+        self.source = source
+        self.block_frames = block_frames
+        self.channels = source.channels
+        self.ring = RingBuffer(int(buffer_duration * source.sample_rate) * source.channels, dtype=source.dtype)
+        self.logger = setup_logging(module_name="CaptureService")
+        self.handoff: Optional[int] = None  # Frame index the last stopped tap had reached
+        self.overflows = 0  # Blocks the source reported as overflowed
+        self._overruns: Deque[int] = deque()  # Frame index of each such block still in the ring
+        self.dropped_frames = 0  # Frames taps lost by falling out of the ring
+        self.lag_interval = lag_interval
+        self.loop_lag = LatencyHistogram()
+        self.taps: Dict[str, "Tap"] = {}
+        self._started = False
+        self._ended = False
+        self._pump: Optional[asyncio.Task] = None
+        self._watchdog: Optional[asyncio.Task] = None
+        self._available = asyncio.Event()
+        self._pull_lock = asyncio.Lock()
+
+    @property
+    def position(self) -> int:
+        """Frames captured so far; the index the next captured frame gets."""
+        return self.ring.written // self.channels
+
+    @property
+    def oldest(self) -> int:
+        """Index of the oldest frame still in the ring."""
+        return self.ring.oldest // self.channels
+
+    def tap(self, name: str) -> "Tap":
+        """A new reader, usable wherever an AudioSource is expected."""
+        tap = self.taps[name] = Tap(self, name)
+        return tap
+
+    def start(self) -> None:
+        """Open the source. Taps call this on start(); later calls do nothing."""
+        if self._started:
+            return
+        self._started = True
+        self.source.start()
+        if self.source.live:
+            loop = asyncio.get_running_loop()
+            self._pump = loop.create_task(self._run_pump(), name="audio_capture")
+            self._watchdog = loop.create_task(self._watch_loop(), name="audio_capture_watchdog")
+
+    def close(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+            self._pump = None
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        self._ended = True
+        self._available.set()
+        self.source.close()
+
+    def _store(self, data: np.ndarray, overflowed: bool) -> None:
+        if overflowed:
+            # Audio was lost just before this block; every tap reading it is told
+            self.overflows += 1
+            self._overruns.append(self.position)
+        self.ring.write(data.reshape(-1))
+        while self._overruns and self._overruns[0] < self.oldest:
+            self._overruns.popleft()
+        self._available.set()
+
+    async def _run_pump(self) -> None:
+        try:
+            while True:
+                data, overflowed = await self.source.read_async(self.block_frames)
+                self._store(data, overflowed)
+        except EndOfAudio:
+            self.logger.info("Audio source exhausted, capture finished")
+        except Exception as e:
+            self.logger.error(f"Audio capture failed: {e}")
+        finally:
+            self._ended = True
+            self._available.set()
+
+    async def _watch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag.record(loop.time() - expected)
+
+    async def _pull(self, until: int) -> None:
+        """Read a recorded source up to frame `until`."""
+        async with self._pull_lock:
+            while self.position < until and not self._ended:
+                try:
+                    data, overflowed = await self.source.read_async(self.block_frames)
+                except EndOfAudio:
+                    self._ended = True
+                    break
+                self._store(data, overflowed)
+
+    def resume_position(self) -> int:
+        """Where a starting tap begins: the hand-off point if it is still buffered, else now."""
+        if self.handoff is None:
+            return self.position
+        return max(self.handoff, self.oldest)
+
+    async def read(self, start: int, frames: int) -> Tuple[np.ndarray, bool, int]:
+        """
+        Read `frames` frames from frame index `start`, waiting for them if needed.
+
+        A reader that fell out of the ring skips to the oldest frame still
+        there and gets overflowed=True. So does a read that covers a block
+        the source reported as overflowed.
+
+        Returns:
+            Tuple[np.ndarray, bool, int]: (frames, channels) audio, overflowed, index after the last frame
+
+        Raises:
+            EndOfAudio: If the source ended and everything from `start` on was read
+        """
+        while self.position < start + frames and not self._ended:
+            if self._pump is None:
+                await self._pull(start + frames)
+            else:
+                self._available.clear()
+                if self.position < start + frames and not self._ended:
+                    await self._available.wait()
+
+        overflowed = start < self.oldest
+        if overflowed:
+            self.dropped_frames += self.oldest - start
+            start = self.oldest
+        available = max(0, min(frames, self.position - start))
+        if not overflowed:
+            overflowed = any(start <= block < start + available for block in self._overruns)
+        if available == 0 and self._ended:
+            raise EndOfAudio()
+
+        # A short read only happens at the very end; pad it like the sources do
+        data = np.zeros((frames, self.channels), dtype=self.ring.dtype)
+        flat = data.reshape(-1)
+        first, second = self.ring.segments_at(start * self.channels, available * self.channels)
+        flat[:len(first)] = first
+        flat[len(first):len(first) + len(second)] = second
+        return data, overflowed, start + frames
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Capture health: overruns and drops at the source and in the ring, how
+        far each tap is behind and the event loop lag seen while capturing.
+        """
+        return {
+            'position': self.position,
+            'buffered': self.position - self.oldest,
+            'overflows': self.overflows,
+            'dropped_frames': self.dropped_frames,
+            'source': self.source.get_stats(),
+            'loop_lag': self.loop_lag.summary(),
+            'taps': {name: tap.get_stats() for name, tap in self.taps.items()},
+        }
+
+class Tap(AudioSource):
+    """
+    One consumer's cursor into a CaptureService. It behaves like an
+    AudioSource, but start() and stop() only move the cursor; the device
+    stays open. Only read_async() is supported.
+    """
+    def __init__(self, service: CaptureService, name: str):
+        source = service.source
+        super().__init__(source.sample_rate, source.channels, source.dtype)
+        self.service = service
+        self.name = name
+        self.realtime = source.realtime
+        self.live = source.live
+        self.position = 0  # Frame index of the next read
+
+    @property
+    def lag(self) -> int:
+        """Frames captured but not yet read by this tap."""
+        return self.service.position - self.position
+
+    @property
+    def available(self) -> int:
+        return min(self.lag, self.service.position - self.service.oldest)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), 'active': self.active, 'lag': self.lag if self.active else 0}
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self.service.start()
+        self.position = self.service.resume_position()
+        super().start()
+
+    def stop(self) -> None:
+        if self.active:
+            self.service.handoff = self.position
+        super().stop()
+
+    def _read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        raise AudioError("A capture Tap is read from the event loop; use read_async()")
+
+    async def read_async(self, frames: int) -> Tuple[np.ndarray, bool]:
+        start = self.position
+        data, overflowed, self.position = await self.service.read(start, frames)
+        if overflowed:
+            # Counts source overruns too; dropped_frames only what this tap skipped
+            self.overflows += 1
+            self.dropped_frames += self.position - frames - start
+        self.frames_read += frames
+        return data, overflowed
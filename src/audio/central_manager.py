@@ -1,46 +1,115 @@
+import time
 import asyncio
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Hashable
 from src.audio.record import AudioRecorder
+from src.audio.capture import CaptureService
+from src.audio.dictation import Dictation
+from src.audio.sources import AudioSource, DeviceSource, open_audio_source
 from src.speech.stt.whisper_engine import WhisperEngine
 from src.wake_word.porcupine_detector import WakeWordDetector
 from src.wake_word.wake_manager import WakeWordManager
-from src.utils.shared_resources import EVENT_BUS, STATE_MANAGER
+from src.utils.shared_resources import EVENT_BUS, STATE_MANAGER, TRACER
 from src.core.state import StateManager, AssistantState
-from src.speech.tts.tts_manager import TTSManager
+from src.core.event_bus import EventBus
+from src.core.cancellation import TurnScopes
+from src.core.mailbox import PublishMode
+from src.core.scheduler import FairScheduler
+from src.speech.tts.tts_manager import AudioOutput, TTSManager
+from src.speech.tts.engines.base_tts import TTSEngine
 from src.utils.logger import setup_logging
+from src.utils.config import AUDIO_SOURCE
 
 class CentralAudioManager():
-    def __init__(self):
+    def __init__(
+        self,
+        audio_source: Optional[str | AudioSource] = AUDIO_SOURCE,
+        event_bus: Optional[EventBus] = None,
+        state_manager: Optional[StateManager] = None,
+        session_id: Hashable = "default",
+        whisper_engine: Optional[WhisperEngine] = None,
+        tts_engines: Optional[Dict[str, TTSEngine]] = None,
+        tts_scheduler: Optional[FairScheduler] = None,
+        audio_output: Optional[AudioOutput] = None
+    ):
         """
         Initialize the central audio manager
         
         Args:
-            event_bus (EventBus): Event bus for system-wide communication
-            state_manager (StateManager): State manager for tracking assistant state
+            audio_source (str | AudioSource): Input spec for open_audio_source(): None
+                for the default device, a WAV/FLAC path, or "-" for raw PCM on stdin.
+                An AudioSource instance is used as is. It is opened once and
+                stays open until shutdown.
+            event_bus (EventBus): Bus for this pipeline; the shared one if omitted
+            state_manager (StateManager): State machine for this pipeline; the shared one if omitted
+            session_id: Key this pipeline uses in the shared model schedulers
+            whisper_engine (WhisperEngine): An initialized engine shared with other
+                sessions. The manager loads (and later frees) its own if omitted.
+            tts_engines (dict): TTS engines shared with other sessions
+            tts_scheduler (FairScheduler): Admission to the shared TTS engines
+            audio_output: Coroutine taking (audio, samplerate) to play speech
+                through instead of the local speakers
         """
-        self.event_bus = EVENT_BUS
-        self.state_manager = STATE_MANAGER
+        self.event_bus = event_bus or EVENT_BUS
+        self.state_manager = state_manager or STATE_MANAGER
+        self.session_id = session_id
         self.logger = setup_logging(module_name="CentralAudioManager")
+        # Every turn's stage work runs in a scope that barge-in can cancel
+        self.turns = TurnScopes()
+
+        if isinstance(audio_source, AudioSource):
+            self.audio_source = audio_source
+        else:
+            self.audio_source = open_audio_source(audio_source, sample_rate=16000)
+            if self.audio_source is not None:
+                self.logger.info(f"Reading audio from {audio_source}")
+            else:
+                self.audio_source = DeviceSource(sample_rate=16000, blocksize=512, latency='low')
+
+        # One always-open capture feeds wake word detection and recording. Each reads
+        # through its own tap, and the recorder resumes where the detector stopped, so
+        # speech right after the wake word is kept.
+        self.capture = CaptureService(self.audio_source)
 
         # Initialize components
-        self.wake_detector = WakeWordDetector(event_bus=self.event_bus, state_manager=self.state_manager)
-        self.audio_recorder = AudioRecorder(sample_rate=16000, channels=1, pre_roll_duration=2, max_queue_size=10)
-        self.whisper_engine = WhisperEngine()
-        self.wake_manager = WakeWordManager(event_bus=self.event_bus, state_manager=self.state_manager)
+        self.wake_detector = WakeWordDetector(
+            event_bus=self.event_bus, state_manager=self.state_manager, audio_source=self.capture.tap("wake")
+        )
+        self.audio_recorder = AudioRecorder(
+            sample_rate=16000, channels=1, pre_roll_duration=2, max_queue_size=10,
+            audio_source=self.capture.tap("record"), event_bus=self.event_bus
+        )
+        self._owns_whisper = whisper_engine is None
+        self.whisper_engine = whisper_engine or WhisperEngine()
+        self.wake_manager = WakeWordManager(event_bus=self.event_bus, state_manager=self.state_manager, turns=self.turns)
 
         # Create TTS components
-        self.tts_manager = TTSManager(event_bus=self.event_bus, state_manager=self.state_manager)
+        self.tts_manager = TTSManager(
+            event_bus=self.event_bus,
+            state_manager=self.state_manager,
+            engines=tts_engines,
+            scheduler=tts_scheduler,
+            session_id=session_id,
+            output=audio_output,
+            turns=self.turns
+        )
         self.ServerConnected = False
         self.transcription = None
+        self.dictation: Optional[Dictation] = None  # The dictation in progress, if any
 
     @classmethod
-    async def create(cls, server_connected: bool = False) -> 'CentralAudioManager':
+    async def create(
+        cls,
+        server_connected: bool = False,
+        audio_source: Optional[str | AudioSource] = AUDIO_SOURCE,
+        **components
+    ) -> 'CentralAudioManager':
         """
         Create and initialize a new CentralAudioManager instance.
         
         Args:
-            event_bus (EventBus): Event bus for system-wide communication
-            state_manager (StateManager): State manager for tracking assistant state
+            server_connected (bool): Forward transcriptions to the API clients
+            audio_source (str | AudioSource): Input spec, see __init__
+            **components: Per-session bus, state manager and shared models, see __init__
             
         Returns:
             CentralAudioManager: An initialized instance of CentralAudioManager
@@ -48,7 +117,7 @@ class CentralAudioManager():
         Raises:
             Exception: If initialization fails
         """
-        instance = cls()
+        instance = cls(audio_source=audio_source, **components)
         instance.ServerConnected = server_connected
         await instance._initialize()
         return instance
@@ -65,10 +134,11 @@ class CentralAudioManager():
                     self.audio_recorder.initialize(),
                     name="init_audio_recorder"
                 )
-                tg.create_task(
-                    self.whisper_engine.initialize(),
-                    name="init_whisper_engine"
-                )
+                if self._owns_whisper:
+                    tg.create_task(
+                        self.whisper_engine.initialize(),
+                        name="init_whisper_engine"
+                    )
                 
             # Set up event handlers after components are initialized
             self._setup_event_handlers()
@@ -85,7 +155,8 @@ class CentralAudioManager():
         components = [
             self.wake_detector,
             self.audio_recorder,
-            self.whisper_engine,
+            # A shared engine outlives any one session
+            self.whisper_engine if self._owns_whisper else None,
             self.wake_manager,
             self.event_bus,
             self.state_manager
@@ -106,6 +177,16 @@ class CentralAudioManager():
             except Exception as e:
                 self.logger.error(f"Error during component cleanup: {e}")
 
+        self.capture.close()
+
+    def get_audio_stats(self) -> Dict[str, Any]:
+        """Capture health plus what the wake word detector and recorder saw of it."""
+        return {
+            'capture': self.capture.get_stats(),
+            'wake_word': self.wake_detector.get_stats(),
+            'recorder': self.audio_recorder.get_stats(),
+        }
+
     def _setup_event_handlers(self):
         """Set up event handlers for coordinating audio processing flow"""
 
@@ -119,15 +200,24 @@ class CentralAudioManager():
             self._handle_audio_recorded, 
             async_handler=True)
         
+        # A dictation can run for an hour, so it gets a mailbox rather than holding up the publisher
+        self.event_bus.subscribe(
+            "dictation.request",
+            self._handle_dictation,
+            async_handler=True,
+            mailbox_size=1)
+
         self.event_bus.subscribe(
             "utterance_ready", 
             self._handle_transcription_complete, 
             async_handler=True)
 
+        # Playback runs from its own mailbox so a long response never blocks the caller
         self.event_bus.subscribe(
             "start.tts.playback",
             self._handle_tts_playback,       
-            async_handler=True
+            async_handler=True,
+            mailbox_size=4
         )
 
     async def _handle_wake_word_detected(self):
@@ -146,39 +236,65 @@ class CentralAudioManager():
 
             try:
                 timeout = 10
-                start_time = asyncio.get_event_loop().time()
-                
-                utterance = None
-                while utterance is None:
-                    utterance = await self.audio_recorder.get_audio_data()
-                    
-                    # Check if we've exceeded the timeout
-                    if asyncio.get_event_loop().time() - start_time > timeout:
-                        self.logger.warning(f"Timeout waiting for audio data after {timeout} seconds")
-                        # Force stop recording if we time out
-                        await self.audio_recorder.stop_recording()
-                        await self.state_manager.set_state(AssistantState.IDLE)
-                        break
-                    await asyncio.sleep(0.2)
+                # Resolves the moment VAD queues the utterance
+                utterance = await self.audio_recorder.next_utterance(timeout)
 
                 if utterance is not None:
                     self.logger.info("Audio data received, stopping recording")
-                    # Ensure recording is stopped before processing
-                    await self.event_bus.publish("utterance_ready", utterance)
+                    await self.event_bus.publish(
+                        "utterance_ready", utterance, speech_ended_at=self.audio_recorder.last_speech_end
+                    )
                 else:
-                    self.logger.warning("No audio data received")
+                    self.logger.warning(f"No audio data received within {timeout} seconds")
+                    # Force stop recording if we time out
+                    await self.audio_recorder.stop_recording()
+                    if await self.state_manager.get_state() == AssistantState.LISTENING:
+                        await self.state_manager.set_state(AssistantState.IDLE)
                     
             except Exception as e:
                 self.logger.error(f"Error while handling audio recording: {e}")
                 await self.audio_recorder.stop_recording()
 
-    async def _handle_transcription_complete(self, utterance: Optional[Any] = None):
+    async def dictate(self, **options) -> str:
+        """
+        Take long-form dictation from the shared capture and return the transcript.
+
+        Segments are transcribed while the user speaks and published on
+        'dictation.segment'; see Dictation for the options.
+        """
+        self.dictation = Dictation(
+            self.capture.tap("dictation"),
+            self.whisper_engine,
+            event_bus=self.event_bus,
+            session_id=self.session_id,
+            **options
+        )
+        try:
+            return await self.dictation.run()
+        finally:
+            self.dictation = None
+
+    async def _handle_dictation(self, **options):
+        """Run a dictation and forward the transcript like a normal one"""
+        transcript = await self.dictate(**options)
+        if self.ServerConnected:
+            await self.event_bus.publish("send.api", mode=PublishMode.FIRE_AND_FORGET, transcription=transcript)
+
+    async def _handle_transcription_complete(self, utterance: Optional[Any] = None, speech_ended_at: Optional[float] = None):
         """Handle completed transcription"""
+        if speech_ended_at is not None:
+            # Hand-off from VAD's end of speech to the start of transcription
+            stt_start = time.perf_counter()
+            TRACER.record_span("stt_handoff", speech_ended_at, stt_start)
+            turn = TRACER.root_span()
+            if turn is not None:
+                turn.set('speech_end_to_stt_ms', (stt_start - speech_ended_at) * 1000)
         self.logger.state("State: PROCESSING – Transcribing audio...")
-        transcription = await self.whisper_engine.transcribe_audio(utterance)
+        with TRACER.span("transcribe", audio_s=len(utterance) / self.audio_recorder.sample_rate if utterance is not None else 0.0):
+            transcription = await self.whisper_engine.transcribe_audio(utterance, session=self.session_id)
         await self.event_bus.publish("get.result", transcript=transcription)
         if self.ServerConnected:
-            await self.event_bus.publish("send.api",transcription=transcription)
+            await self.event_bus.publish("send.api", mode=PublishMode.FIRE_AND_FORGET, transcription=transcription)
         self.logger.debug(f"Transcription completed: {transcription}")
 
 
@@ -188,6 +304,6 @@ class CentralAudioManager():
     #######                                                                 #######
     ###############################################################################
 
-    async def _handle_tts_playback(self, text: str, voice_name: str = "Ava_Edge") -> None:
+    async def _handle_tts_playback(self, text: str, voice_name: str = "Ava_Edge", started_at: Optional[float] = None) -> None:
         self.logger.debug(f"Publishing 'generate.and.play.audio' event with text: {text[:20]}...")
-        await self.event_bus.publish("generate.and.play.audio", text, voice_name)
+        await self.event_bus.publish("generate.and.play.audio", text, voice_name, started_at)
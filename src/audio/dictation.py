@@ -0,0 +1,211 @@
+# dictation.py
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from src.audio.buffers import WavSpill
+from src.audio.sources import AudioSource, EndOfAudio
+from src.core.event_bus import EventBus
+from src.core.metrics import LatencyHistogram
+from src.speech.stt.whisper_engine import WhisperEngine
+from src.utils.config import DICTATION_DIR
+from src.utils.logger import setup_logging
+from src.utils.shared_resources import EVENT_BUS
+from src.wake_word.vad import SPEECH_STARTED, VADManager
+
+class Dictation:
+    """
+    Long-form dictation: minutes to hours of speech, transcribed as it is spoken.
+
+    Audio is spilled to a memory-mapped WAV file instead of being held in
+    RAM. VAD cuts it into segments at pauses of `pause` seconds, and each
+    segment goes to Whisper as soon as it closes, while the speaker carries
+    on. A segment that runs past `max_segment` seconds without a pause is
+    cut there. Memory use does not grow with the length of the session, and
+    once the speaker stops only the last segment is left to transcribe.
+
+    Each transcribed segment is published on 'dictation.segment' with the
+    transcript so far, and the full transcript on 'dictation.done'.
+
+    Example:
+        dictation = Dictation(capture.tap("dictation"), whisper_engine)
+        transcript = await dictation.run()  # Returns after `end_silence` seconds of silence
+    """
+    def __init__(
+        self,
+        audio_source: AudioSource,
+        whisper_engine: WhisperEngine,
+        event_bus: Optional[EventBus] = None,
+        session_id: Hashable = "default",
+        spill_path: Optional[str | Path] = None,
+        pause: float = 0.6,
+        end_silence: float = 3.0,
+        start_timeout: float = 10.0,
+        max_segment: float = 25.0,
+        padding: float = 0.2,
+        blocksize: int = 512,
+        vad: Optional[VADManager] = None
+    ):
+        """
+        Args:
+            audio_source (AudioSource): Where the dictated audio comes from, e.g. a capture tap
+            whisper_engine (WhisperEngine): An initialized engine
+            event_bus (EventBus): Bus for the segment and done events; the shared one if omitted
+            session_id: Key this dictation uses in the Whisper scheduler
+            spill_path: WAV file the audio is written to; a timestamped file in DICTATION_DIR if omitted
+            pause (float): Silence in seconds that closes a segment
+            end_silence (float): Silence in seconds after speech that ends the dictation
+            start_timeout (float): Seconds to wait for the first speech before giving up
+            max_segment (float): Longest segment sent to Whisper, which works on 30 second windows
+            padding (float): Seconds of audio kept before each segment's first speech frame
+            blocksize (int): Frames read from the source at a time
+            vad (VADManager): Voice activity detector; one with speech_timeout=pause if omitted
+        """
+        self.audio_source = audio_source
+        self.whisper_engine = whisper_engine
+        self.event_bus = event_bus or EVENT_BUS
+        self.session_id = session_id
+        self.sample_rate = audio_source.sample_rate
+        self.blocksize = blocksize
+        self.vad = vad or VADManager(
+            speech_timeout=pause,
+            sample_clock=not audio_source.realtime,
+            sample_rate=self.sample_rate
+        )
+        self.end_silence = int(end_silence * self.sample_rate)
+        self.start_timeout = int(start_timeout * self.sample_rate)
+        self.max_segment = int(max_segment * self.sample_rate)
+        self.padding = int(padding * self.sample_rate)
+        if spill_path is None:
+            spill_path = DICTATION_DIR / f"dictation_{datetime.now():%Y%m%d_%H%M%S}.wav"
+        self.spill = WavSpill(spill_path, sample_rate=self.sample_rate)
+        self.logger = setup_logging(module_name="Dictation")
+
+        self.texts: List[str] = []
+        self.segments = 0  # Segments closed so far
+        self.transcribe_time = LatencyHistogram()
+        self.final_latency: Optional[float] = None  # Seconds from the end of input to the full transcript
+        self._pending: asyncio.Queue[Optional[Tuple[int, int]]] = asyncio.Queue()
+        self._segment_start: Optional[int] = None  # Spill index of the open segment's first sample
+        self._cut = 0  # End of the last closed segment; segments never overlap
+        self._last_speech: Optional[int] = None  # Spill index just after the last speech frame
+        self._stopping = False
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.texts)
+
+    def stop(self) -> None:
+        """End the dictation after the block being read; the open segment is still transcribed."""
+        self._stopping = True
+
+    async def run(self) -> str:
+        """
+        Dictate until the speaker falls silent, stop() is called or the source ends.
+
+        Returns:
+            str: The full transcript
+        """
+        worker = asyncio.create_task(self._transcribe_segments(), name="dictation_transcribe")
+        source = self.audio_source
+        source.start()
+        self.logger.info(f"Dictation started, spilling audio to {self.spill.path}")
+        try:
+            while not self._stopping:
+                try:
+                    block, _ = await source.read_async(self.blocksize)
+                except EndOfAudio:
+                    break
+                self._process(block.reshape(-1))
+                if self._finished():
+                    break
+                # Live sources already yield while waiting for audio; recorded ones need a turn break
+                await asyncio.sleep(0)
+        finally:
+            source.stop()
+            if self._segment_start is not None:
+                self._close_segment(self.spill.frames)
+            ended = time.perf_counter()
+            await self._pending.put(None)
+            try:
+                await worker
+            finally:
+                self.spill.close()
+        if self.segments:
+            self.final_latency = time.perf_counter() - ended
+        self.logger.info(
+            f"Dictation finished: {self.segments} segment(s), {self.spill.frames / self.sample_rate:.1f}s of audio, "
+            f"transcript ready {self.final_latency or 0.0:.2f}s after the input ended"
+        )
+        await self.event_bus.publish("dictation.done", self.transcript, audio_path=str(self.spill.path))
+        return self.transcript
+
+    def _process(self, samples: np.ndarray) -> None:
+        offset = self.spill.frames
+        self.spill.append(samples)
+        frame_length = self.vad.frame_length
+        batch = self.vad.process_block(samples)
+
+        speech = np.flatnonzero(batch.probabilities >= self.vad.vad_threshold)
+        if len(speech):
+            self._last_speech = offset + (int(speech[-1]) + 1) * frame_length
+        for index, kind, _, _ in batch.events:
+            if kind == SPEECH_STARTED:
+                if self._segment_start is None:
+                    self._segment_start = max(self._cut, offset + index * frame_length - self.padding)
+            elif self._segment_start is not None:
+                # The segment runs to the end of the pause that closed it
+                self._close_segment(offset + (index + 1) * frame_length)
+
+        if self._segment_start is not None and self.spill.frames - self._segment_start >= self.max_segment:
+            end = self.spill.frames
+            self._close_segment(end)
+            if self.vad.speech_detected:
+                self._segment_start = end
+
+    def _close_segment(self, end: int) -> None:
+        if end > self._segment_start:
+            self._pending.put_nowait((self._segment_start, end))
+            self.segments += 1
+            # Let the kernel write the spilled pages back instead of keeping them dirty
+            self.spill.flush()
+        self._cut = end
+        self._segment_start = None
+
+    def _finished(self) -> bool:
+        if self._last_speech is None:
+            if self.spill.frames >= self.start_timeout:
+                self.logger.warning(f"No speech within {self.start_timeout / self.sample_rate:.0f}s, ending dictation")
+                return True
+            return False
+        return self.spill.frames - self._last_speech >= self.end_silence
+
+    async def _transcribe_segments(self) -> None:
+        """Transcribe closed segments in order, one at a time, as they arrive."""
+        while (segment := await self._pending.get()) is not None:
+            start, end = segment
+            started = time.perf_counter()
+            # A view of the spill file; only this segment is read into memory
+            text = await self.whisper_engine.transcribe_audio(self.spill.segment(start, end), session=self.session_id)
+            self.transcribe_time.record(time.perf_counter() - started)
+            if text:
+                self.texts.append(text)
+            await self.event_bus.publish(
+                "dictation.segment",
+                text,
+                transcript=self.transcript,
+                start_s=start / self.sample_rate,
+                end_s=end / self.sample_rate
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'segments': self.segments,
+            'pending': self._pending.qsize(),
+            'audio_s': round(self.spill.frames / self.sample_rate, 3),
+            'spill_path': str(self.spill.path),
+            'transcribe': self.transcribe_time.summary(),
+            'final_latency_s': round(self.final_latency, 3) if self.final_latency is not None else None,
+        }
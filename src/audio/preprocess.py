@@ -0,0 +1,210 @@
+# preprocess.py
+import time
+from typing import Any, Dict
+import numpy as np
+from src.core.metrics import LatencyHistogram
+from src.utils.logger import setup_logging
+
+class NoiseSuppressor:
+    """
+    Streaming spectral gating.
+
+    Each frame is analysed together with the previous one (50% overlap,
+    sqrt-Hann windows, overlap-add), so the output lags the input by one
+    frame. A per-bin noise power estimate follows the background quickly
+    while the input looks like noise and slowly otherwise. Bins are
+    attenuated by how little they stand above it, down to `floor_db`.
+    """
+    def __init__(
+        self,
+        frame_length: int = 512,
+        sample_rate: int = 16000,
+        floor_db: float = -20.0,
+        over_subtraction: float = 3.0,
+        noise_fast_s: float = 0.3,
+        noise_slow_s: float = 5.0
+    ):
+        """
+        Args:
+            frame_length (int): Samples per frame; every frame passed to process() must have this length
+            sample_rate (int): Sample rate of the audio
+            floor_db (float): Strongest attenuation applied to a bin
+            over_subtraction (float): Multiple of the noise estimate removed from each bin
+            noise_fast_s (float): Time constant of the noise estimate on noise-like frames
+            noise_slow_s (float): Time constant on speech-like frames, so a background
+                that gets louder is still followed
+        """
+        self.frame_length = frame_length
+        self.window = np.sqrt(np.hanning(2 * frame_length + 1)[:-1])  # Periodic, sums to one at 50% overlap
+        self.floor = 10 ** (floor_db / 20)
+        self.over_subtraction = over_subtraction
+        frame_s = frame_length / sample_rate
+        self.fast = np.exp(-frame_s / noise_fast_s)
+        self.slow = np.exp(-frame_s / noise_slow_s)
+        self.noise = None  # Per-bin noise power; kept across reset() so each turn starts calibrated
+        self.speech_like = False  # Whether the last frame stood well above the noise
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the overlap state, e.g. before audio that does not follow on from the last frame."""
+        self._previous = np.zeros(self.frame_length, dtype=np.float32)
+        self._tail = np.zeros(self.frame_length, dtype=np.float32)
+        self._gain = np.ones(self.frame_length + 1, dtype=np.float32)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """Denoise one float32 frame. Returns the previous frame's output."""
+        block = np.concatenate((self._previous, frame)) * self.window
+        self._previous = frame
+        spectrum = np.fft.rfft(block)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+
+        if self.noise is None:
+            self.noise = power.copy()
+        # Frames well above the noise floor overall are treated as speech
+        self.speech_like = bool(power.sum() > 2 * self.over_subtraction * self.noise.sum())
+        rate = self.slow if self.speech_like else self.fast
+        self.noise *= rate
+        self.noise += (1 - rate) * power
+
+        gain = np.sqrt(np.clip(1 - self.over_subtraction * self.noise / (power + 1e-9), self.floor ** 2, 1))
+        # Smoothing over time keeps isolated bins from flickering ("musical noise")
+        self._gain = 0.5 * self._gain + 0.5 * gain
+        block = np.fft.irfft(spectrum * self._gain, n=len(block)) * self.window
+
+        output = self._tail + block[:self.frame_length]
+        self._tail = block[self.frame_length:]
+        return output
+
+class AutomaticGainControl:
+    """
+    Brings speech towards `target_dbfs`. The gain only adapts on frames
+    louder than `gate_dbfs` and, behind a noise suppressor, on frames it
+    took for speech. Otherwise it drifts back to unity, so the boost given
+    to quiet speech is not left applied to the noise between utterances.
+    It ramps across each frame to avoid clicks.
+    """
+    def __init__(
+        self,
+        target_dbfs: float = -20.0,
+        gate_dbfs: float = -45.0,
+        max_gain_db: float = 20.0,
+        attack: float = 0.5,
+        release: float = 0.05
+    ):
+        """
+        Args:
+            target_dbfs (float): Frame RMS the gain aims for, relative to full scale
+            gate_dbfs (float): Frames quieter than this leave the gain alone
+            max_gain_db (float): Largest boost (the largest cut is the same amount)
+            attack (float): Fraction of the way to a lower gain covered per frame
+            release (float): Fraction of the way to a higher gain covered per frame
+        """
+        self.target = 10 ** (target_dbfs / 20)
+        self.gate = 10 ** (gate_dbfs / 20)
+        self.max_gain = 10 ** (max_gain_db / 20)
+        self.attack = attack
+        self.release = release
+        self.gain = 1.0
+
+    def process(self, frame: np.ndarray, adapt: bool = True) -> np.ndarray:
+        """Apply gain to one float32 frame in [-1, 1]. adapt=False marks a frame as not speech."""
+        rms = float(np.sqrt(np.mean(frame ** 2)))
+        previous = self.gain
+        if adapt and rms > self.gate:
+            desired = min(max(self.target / rms, 1 / self.max_gain), self.max_gain)
+        else:
+            desired = 1.0
+        step = self.attack if desired < self.gain else self.release
+        self.gain += (desired - self.gain) * step
+        return frame * np.linspace(previous, self.gain, len(frame), dtype=np.float32)
+
+class AudioPreprocessor:
+    """
+    Noise suppression then AGC on int16 capture frames, ahead of VAD and Whisper.
+
+    Frame cost is measured against `budget_ms`. If it stays over budget for
+    `patience` frames in a row, noise suppression is switched off, leaving
+    the cheap AGC, rather than letting capture fall behind real time.
+
+    Example:
+        preprocessor = AudioPreprocessor(frame_length=512)
+        clean = preprocessor.process(frame)  # int16 in, int16 out, one frame later
+    """
+    def __init__(
+        self,
+        frame_length: int = 512,
+        sample_rate: int = 16000,
+        noise_suppression: bool = True,
+        agc: bool = True,
+        budget_ms: float = 2.0,
+        patience: int = 50
+    ):
+        self.logger = setup_logging(module_name="AudioPreprocessor")
+        self.frame_length = frame_length
+        self.suppressor = NoiseSuppressor(frame_length, sample_rate) if noise_suppression else None
+        self.agc = AutomaticGainControl() if agc else None
+        self.budget = budget_ms / 1000
+        self.patience = patience
+        self.frame_time = LatencyHistogram()
+        self.over_budget = 0
+        self._over_streak = 0
+
+    def reset(self) -> None:
+        if self.suppressor is not None:
+            self.suppressor.reset()
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """Process one int16 frame of `frame_length` samples."""
+        started = time.perf_counter()
+        audio = frame.astype(np.float32)
+        audio *= 1 / 32768.0
+        adapt = True
+        if self.suppressor is not None:
+            audio = self.suppressor.process(audio)
+            adapt = self.suppressor.speech_like
+        if self.agc is not None:
+            audio = self.agc.process(audio, adapt)
+        output = (np.clip(audio, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+        self._account(time.perf_counter() - started)
+        return output
+
+    def _account(self, elapsed: float) -> None:
+        self.frame_time.record(elapsed)
+        if elapsed <= self.budget:
+            self._over_streak = 0
+            return
+        self.over_budget += 1
+        self._over_streak += 1
+        if self._over_streak >= self.patience and self.suppressor is not None:
+            self.logger.warning(
+                f"Preprocessing over its {self.budget * 1000:.1f} ms frame budget for {self.patience} frames, "
+                "turning noise suppression off"
+            )
+            # The held-back frame is dropped; one frame of audio is not worth a stall
+            self.suppressor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'noise_suppression': self.suppressor is not None,
+            'agc_gain_db': round(float(20 * np.log10(self.agc.gain)), 2) if self.agc is not None else None,
+            'budget_ms': self.budget * 1000,
+            'over_budget': self.over_budget,
+            'frame': self.frame_time.summary(),
+        }
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    seconds = 4
+    t = np.arange(seconds * 16000) / 16000
+    noise = rng.normal(0, 0.02, t.shape)
+    tone = np.where((t > 2) & (t < 3), 0.1 * np.sin(2 * np.pi * 220 * t), 0)
+    frames = ((noise + tone) * 32767).astype(np.int16).reshape(-1, 512)
+
+    preprocessor = AudioPreprocessor()
+    output = np.concatenate([preprocessor.process(frame) for frame in frames]).astype(np.float32) / 32768
+    def dbfs(x):
+        return 20 * np.log10(np.sqrt(np.mean(x ** 2)) + 1e-12)
+    # Output lags by one frame
+    print(f"noise only: {dbfs(noise[16000:32000]):.1f} dBFS in, {dbfs(output[16512:32512]):.1f} dBFS out")
+    print(f"tone + noise: {dbfs((noise + tone)[32000:48000]):.1f} dBFS in, {dbfs(output[32512:48512]):.1f} dBFS out")
+    print(preprocessor.get_stats())
@@ -1,13 +1,16 @@
 #record.py
-import sounddevice as sd
 import numpy as np
 import asyncio
 import time
-from typing import Optional, Dict, Any
-from src.wake_word.vad import VADManager
-from src.utils.shared_resources import EVENT_BUS
+from typing import Any, Dict, Optional
+from src.wake_word.vad import SPEECH_STARTED, VADManager
+from src.audio.sources import AudioSource, DeviceSource, EndOfAudio
+from src.audio.buffers import RingBuffer, UtteranceBuffer
+from src.audio.preprocess import AudioPreprocessor
+from src.core.event_bus import EventBus
+from src.utils.shared_resources import EVENT_BUS, TRACER
 from src.utils.logger import setup_logging
-from collections import deque
+from src.utils.config import AUDIO_PREPROCESS
 
 class AudioRecorder:
     """
@@ -21,33 +24,53 @@ class AudioRecorder:
         blocksize: int = 512,
         device: int = None,
         pre_roll_duration: float = 2,  # Duration in seconds to keep in pre-roll buffer
-        max_queue_size: int = 10  # Maximum number of utterances to keep in queue
+        max_queue_size: int = 10,  # Maximum number of utterances to keep in queue
+        audio_source: Optional[AudioSource] = None,  # Defaults to the input device
+        event_bus: Optional[EventBus] = None,  # Defaults to the shared bus
+        preprocess: bool = AUDIO_PREPROCESS  # Noise suppression and AGC ahead of VAD
     ):
         """Initialize the AudioRecorder with VADManager."""
-        self.event_bus = EVENT_BUS
+        self.event_bus = event_bus or EVENT_BUS
         self.sample_rate = sample_rate
         self.channels = channels
         self.dtype = dtype
         self.blocksize = blocksize
         self.device = device
         self.max_queue_size = max_queue_size
+        self.max_batch = 16 * blocksize  # Most frames read and run through VAD in one go
         
         self.logger = None
         self.audio_fetch_event = asyncio.Event()
         self.is_recording = False  # Make this a public attribute
         self.audio_queue = asyncio.Queue(maxsize=max_queue_size)
-        self.stream = None
-        self.vad_manager = VADManager(pre_roll_duration=pre_roll_duration)
+        self.audio_source = audio_source or DeviceSource(
+            sample_rate=sample_rate, channels=channels, dtype=dtype, blocksize=blocksize, device=device
+        )
+        # Recorded sources run faster than real time, so endpoint on their sample clock
+        self.vad_manager = VADManager(
+            pre_roll_duration=pre_roll_duration,
+            sample_clock=not self.audio_source.realtime,
+            sample_rate=sample_rate
+        )
+        # Cleans frames before VAD sees them, so the utterance handed to Whisper is cleaned too
+        self.preprocessor = AudioPreprocessor(
+            frame_length=self.vad_manager.frame_length, sample_rate=sample_rate
+        ) if preprocess else None
         
-        # Use deque for pre-roll buffer
+        # Preallocated ring for the pre-roll; the hot loop copies frames in and never allocates
         self.pre_roll_size = int(pre_roll_duration * sample_rate)
-        self.pre_roll_buffer = deque(maxlen=self.pre_roll_size)
+        self.pre_roll_buffer = RingBuffer(self.pre_roll_size, dtype=dtype)
         
-        # Use dynamic list for audio buffer
-        self.current_buffer = []
+        # Contiguous utterance, handed to Whisper as is when speech ends
+        self.current_buffer = UtteranceBuffer(self.pre_roll_size * 4, dtype=dtype)
+        self._in_utterance = False  # Between VAD's speech start and speech end
         
         self._lock = asyncio.Lock()
         self._processing_task = None
+        self._listen_span = None  # Trace span from start_recording() until an utterance is queued
+        self.last_speech_end: Optional[float] = None  # perf_counter() at which VAD ended the last utterance handed out
+        self.overflows = 0  # Reads the source flagged as having lost audio
+        self.dropped_utterances = 0  # Utterances pushed out of a full queue
 
 
     async def initialize(self):
@@ -68,59 +91,87 @@ class AudioRecorder:
     async def _audio_callback(self, indata: np.ndarray) -> None:
         """Process audio data asynchronously."""
         async with self._lock:
-            audio_data = indata.flatten()
-            
-            # Update pre-roll buffer using deque
-            self.pre_roll_buffer.extend(audio_data)
-            
-            frame_length = self.vad_manager.cobra.frame_length
-            for i in range(0, len(audio_data), frame_length):
-                chunk = audio_data[i:i+frame_length]
-                if len(chunk) == frame_length:
-                    vad_state = await self.vad_manager.process_audio(chunk)
-                    await self._handle_vad_state(vad_state, chunk)
-
-    async def _handle_vad_state(self, vad_state: Dict[str, Any], chunk: np.ndarray) -> None:
-        """Handle VAD state changes and audio buffering."""
-        if vad_state['speech_started']:
-            self.logger.info("VAD: Speech detected, starting recording.")
-            await self._cleanup_old_data()
-            
-            # Convert pre-roll buffer to numpy array and start new recording
-            self.current_buffer = list(self.pre_roll_buffer)
-            self.is_recording = True
-        
-        if self.is_recording:
-            self.current_buffer.extend(chunk)
+            audio_data = indata.reshape(-1)  # A view for mono input
+            frame_length = self.vad_manager.frame_length
+            usable = len(audio_data) - len(audio_data) % frame_length
+
+            if self.preprocessor is not None and usable:
+                cleaned = audio_data.copy()
+                for i in range(0, usable, frame_length):
+                    cleaned[i:i+frame_length] = self.preprocessor.process(audio_data[i:i+frame_length])
+                audio_data = cleaned
+
+            # One VAD call for the whole block; buffering then moves whole runs of
+            # frames between events instead of going frame by frame
+            batch = self.vad_manager.process_block(audio_data[:usable])
+            if not batch.events:
+                self.pre_roll_buffer.write(audio_data)
+                if self._in_utterance:
+                    self.current_buffer.extend(audio_data[:usable])
+                return
+
+            position = 0
+            for index, kind, speech_duration, silence_duration in batch.events:
+                boundary = (index + 1) * frame_length
+                run = audio_data[position:boundary]
+                self.pre_roll_buffer.write(run)
+                if kind == SPEECH_STARTED:
+                    self.logger.info("VAD: Speech detected, starting recording.")
+                    await self._cleanup_old_data()
+                    # The pre-roll already ends with the first speech frame
+                    self.current_buffer.clear()
+                    self.current_buffer.extend(*self.pre_roll_buffer.segments())
+                    self._in_utterance = True
+                else:
+                    if self._in_utterance:
+                        self.current_buffer.extend(run)
+                    await self._finish_utterance(speech_duration, silence_duration)
+                position = boundary
+
+            self.pre_roll_buffer.write(audio_data[position:])
+            if self._in_utterance:
+                self.current_buffer.extend(audio_data[position:usable])
+
+    async def _finish_utterance(self, speech_duration: float, silence_duration: float) -> None:
+        """Queue the utterance VAD just ended."""
+        self.logger.info(f"VAD: Speech ended after {speech_duration}s")
+        # Endpointing is the trailing silence VAD waited out before calling the utterance done
+        TRACER.record_span("vad_endpointing", time.perf_counter() - silence_duration)
+        # Don't set is_recording to False yet, just mark the utterance as complete
         
-        if vad_state['speech_ended']:
-            self.logger.info(f"VAD: Speech ended after {vad_state['speech_duration']}s")
-            # Don't set is_recording to False yet, just mark the utterance as complete
-            
-            if self.current_buffer:
-                final_audio = np.array(self.current_buffer, dtype=self.dtype)
-                try:
-                    await self.audio_queue.put(final_audio)
-                    self.audio_fetch_event.set()
-                    # Empty the current buffer but keep recording for next potential utterance
-                    self.current_buffer = []
-                except asyncio.QueueFull:
-                    self.logger.warning("Audio queue full, dropping oldest recording")
-                    try:
-                        await self.audio_queue.get()
-                        await self.audio_queue.put(final_audio)
-                        self.audio_fetch_event.set()
-                        self.current_buffer = []
-                    except asyncio.QueueEmpty:
-                        pass
+        self._in_utterance = False
+        if len(self.current_buffer):
+            # take() hands over the samples without copying; the next utterance gets new storage
+            final_audio = (self.current_buffer.take(), time.perf_counter())
+            # Never wait on the queue here: this runs inside the capture loop
+            try:
+                self.audio_queue.put_nowait(final_audio)
+            except asyncio.QueueFull:
+                self.logger.warning("Audio queue full, dropping oldest recording")
+                self.dropped_utterances += 1
+                self.audio_queue.get_nowait()
+                self.audio_queue.put_nowait(final_audio)
+            self.audio_fetch_event.set()
+            TRACER.end_span(self._listen_span, speech_s=speech_duration)
 
     async def _process_audio_stream(self):
         """Continuously process audio stream."""
         while self.is_recording:
             try:
-                indata, _ = self.stream.read(self.blocksize)
+                # Audio that piled up while the loop was busy is caught up on in one VAD batch
+                frames = max(self.blocksize, min(self.audio_source.available, self.max_batch) // self.blocksize * self.blocksize)
+                indata, overflowed = await self.audio_source.read_async(frames)
+                if overflowed:
+                    self.overflows += 1
+                    self.logger.warning("Input overflowed while recording; audio was lost")
                 await self._audio_callback(indata)
-                await asyncio.sleep(0.001)  # Small sleep to prevent CPU hogging
+                # Live sources already yield while waiting for audio; recorded ones need a turn break
+                await asyncio.sleep(0)
+            except EndOfAudio:
+                self.logger.info("Audio source exhausted while recording")
+                await self.event_bus.publish("audio.source.exhausted")
+                await self.stop_recording()
+                break
             except Exception as e:
                 self.logger.error(f"Error processing audio stream: {e}")
                 await self.stop_recording()
@@ -134,17 +185,15 @@ class AudioRecorder:
         self.logger.info("Waiting for speech...")
         self.is_recording = True
         self.pre_roll_buffer.clear()
+        if self.preprocessor is not None:
+            self.preprocessor.reset()
         
-        self.stream = sd.InputStream(
-            samplerate=self.sample_rate,
-            channels=self.channels,
-            dtype=self.dtype,
-            blocksize=self.blocksize,
-            device=self.device
-        )
-        self.stream.start()
+        self.audio_source.start()
         
-        self._processing_task = asyncio.create_task(self._process_audio_stream())
+        self._listen_span = TRACER.start_span("listen")
+        # The processing task inherits the listen span, so VAD stages nest under it
+        with TRACER.activate(self._listen_span):
+            self._processing_task = asyncio.create_task(self._process_audio_stream())
 
     async def stop_recording(self):
         """Stop recording asynchronously."""
@@ -159,7 +208,9 @@ class AudioRecorder:
         async with self._lock:
             await self.vad_manager.reset()
         
-        # Cancel and wait for the processing task
+        # Cancel and wait for the processing task, unless it is the one stopping
+        if self._processing_task is asyncio.current_task():
+            self._processing_task = None
         if self._processing_task:
             self._processing_task.cancel()
             try:
@@ -168,15 +219,15 @@ class AudioRecorder:
                 pass
             self._processing_task = None
         
-        # Finally close the stream
-        if self.stream:
-            self.stream.stop()
-            self.stream.close()
-            self.stream = None
+        # Finally release the input
+        self.audio_source.stop()
             
         # Clear any remaining buffers
         self.pre_roll_buffer.clear()
-        self.current_buffer = []
+        self.current_buffer.clear()
+        self._in_utterance = False
+        TRACER.end_span(self._listen_span)
+        self._listen_span = None
 
     async def _handle_recording(self):
         """Handle recording process."""   
@@ -185,17 +236,63 @@ class AudioRecorder:
     async def get_audio_data(self) -> Optional[np.ndarray]:
         """Retrieve recorded audio from the queue asynchronously."""
         if self.audio_fetch_event.is_set() and not self.audio_queue.empty():
-            self.audio_fetch_event.clear()
-            # Ensure microphone is stopped if it's still active
-            if self.is_recording:
-                await self.stop_recording()
-            return await self.audio_queue.get()
+            return await self._hand_out(self.audio_queue.get_nowait())
+        return None
+
+    async def next_utterance(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait for VAD to end the next utterance, stop recording and return it.
+
+        Resolves as soon as the utterance is queued, so there is no polling
+        delay between end of speech and transcription. The time VAD ended it
+        is left in `last_speech_end`.
+
+        Args:
+            timeout (float): Seconds to wait; None waits indefinitely
+
+        Returns:
+            np.ndarray: The utterance, or None on timeout or if recording stopped without one
+        """
+        getter = asyncio.ensure_future(self.audio_queue.get())
+        waiters = {getter}
+        if self._processing_task is not None:
+            waiters.add(self._processing_task)  # Ends if the source runs out or recording is stopped
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter.done() and not getter.cancelled():
+            return await self._hand_out(getter.result())
+        if not self.audio_queue.empty():
+            return await self._hand_out(self.audio_queue.get_nowait())
         return None
+
+    async def _hand_out(self, item) -> np.ndarray:
+        audio, self.last_speech_end = item
+        self.audio_fetch_event.clear()
+        # Ensure microphone is stopped if it's still active
+        if self.is_recording:
+            await self.stop_recording()
+        return audio
     
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'recording': self.is_recording,
+            'overflows': self.overflows,
+            'queue_depth': self.audio_queue.qsize(),
+            'queue_size': self.max_queue_size,
+            'dropped_utterances': self.dropped_utterances,
+            'pre_roll_fill': round(len(self.pre_roll_buffer) / self.pre_roll_size, 3),
+            'utterance_s': round(len(self.current_buffer) / self.sample_rate, 3),
+            'preprocess': self.preprocessor.get_stats() if self.preprocessor is not None else None,
+        }
+
     async def _cleanup_old_data(self):
         """Clean up old data to prevent memory growth."""
         while self.audio_queue.qsize() > self.max_queue_size - 1:
             try:
-                await self.audio_queue.get_nowait()
+                self.audio_queue.get_nowait()
+                self.dropped_utterances += 1
             except asyncio.QueueEmpty:
                 break
\ No newline at end of file
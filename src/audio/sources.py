@@ -0,0 +1,449 @@
+# sources.py
+import sys
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+import numpy as np
+from src.core.error import AudioError
+
+class EndOfAudio(Exception):
+    """Raised by AudioSource.read() once a finite source has nothing left, including its trailing silence."""
+
+class AudioSource(ABC):
+    """
+    Where the pipeline's microphone audio comes from.
+
+    read() mirrors sounddevice.InputStream.read(): it returns exactly `frames`
+    rows of shape (frames, channels) plus an overflow flag. Every source counts
+    the frames it has handed out, so `clock` is a sample clock in seconds that
+    runs as fast as the audio is consumed rather than at wall-clock speed.
+
+    start()/stop() bracket each component's use of the source. A file keeps its
+    position across stop()/start(), so the wake word detector and the recorder
+    can take turns reading one recording.
+
+    Sources that can lose audio count it: `overflows` is how many times the
+    input reported an overrun, `underflows` how many times it ran dry, and
+    `dropped_frames` how many frames were discarded because the reader fell
+    behind.
+    """
+    # True for sources that deliver audio at wall-clock speed (a microphone)
+    realtime = False
+    # True when audio arrives as it is spoken, so a reader can never run ahead of it
+    live = False
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, dtype: np.dtype = np.int16):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = dtype
+        self.frames_read = 0
+        self.active = False
+        self.overflows = 0
+        self.underflows = 0
+        self.dropped_frames = 0
+
+    @property
+    def clock(self) -> float:
+        """Seconds of audio read so far."""
+        return self.frames_read / self.sample_rate
+
+    @property
+    def available(self) -> int:
+        """Frames that can be read right now without waiting; 0 if the source cannot tell."""
+        return 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'frames_read': self.frames_read,
+            'overflows': self.overflows,
+            'underflows': self.underflows,
+            'dropped_frames': self.dropped_frames,
+        }
+
+    def start(self) -> None:
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+
+    def close(self) -> None:
+        self.stop()
+
+    def read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        data, overflowed = self._read(frames)
+        self.frames_read += len(data)
+        return data, overflowed
+
+    async def read_async(self, frames: int) -> Tuple[np.ndarray, bool]:
+        """read() for callers on the event loop. Sources fed by the loop itself (PushSource) override it."""
+        return self.read(frames)
+
+    @abstractmethod
+    def _read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        ...
+
+    def __enter__(self) -> "AudioSource":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+class DeviceSource(AudioSource):
+    """
+    Live input device through sounddevice. The stream is opened on start() and closed on stop().
+
+    Capture runs in callback mode: PortAudio's thread copies each block into a
+    preallocated ring and, if a reader is waiting, wakes the event loop with
+    call_soon_threadsafe(). read_async() therefore awaits audio instead of
+    blocking the loop in stream.read().
+
+    The ring has one writer (the PortAudio thread) and one reader, and each
+    side only advances its own counter, so neither takes a lock. If the reader
+    falls more than `buffer_duration` seconds behind, the oldest audio is
+    skipped and the next read reports an overflow.
+    """
+    realtime = True
+    live = True
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        dtype: np.dtype = np.int16,
+        blocksize: int = 512,
+        device: Optional[int] = None,
+        latency: Optional[str] = None,
+        buffer_duration: float = 2.0
+    ):
+        super().__init__(sample_rate, channels, dtype)
+        self.blocksize = blocksize
+        self.device = device
+        self.latency = latency
+        self._stream = None
+        self._ring = np.zeros((int(buffer_duration * sample_rate), channels), dtype=dtype)
+        self._written = 0   # Samples the callback has stored; only the PortAudio thread writes it
+        self._consumed = 0  # Samples handed to readers; only the reader writes it
+        self._overflowed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._available = asyncio.Event()
+        self._waiting = False
+
+    def start(self) -> None:
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None  # Blocking read() only
+        self._written = self._consumed = 0
+        self._overflowed = False
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype=self.dtype,
+            blocksize=self.blocksize,
+            device=self.device,
+            latency=self.latency,
+            callback=self._callback
+        )
+        self._stream.start()
+        super().start()
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        super().stop()
+        # Let a pending read_async() see that the stream is gone
+        self._available.set()
+
+    @property
+    def available(self) -> int:
+        return min(self._written - self._consumed, len(self._ring))
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        """Runs on the PortAudio thread: copy the block in and wake a waiting reader."""
+        if status.input_overflow:
+            self._overflowed = True
+            self.overflows += 1
+        if status.input_underflow:
+            self.underflows += 1
+        capacity = len(self._ring)
+        position = self._written % capacity
+        first = min(frames, capacity - position)
+        self._ring[position:position + first] = indata[:first]
+        if frames > first:
+            self._ring[:frames - first] = indata[first:]
+        self._written += frames
+        if self._waiting and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._available.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def _take(self, frames: int) -> Tuple[np.ndarray, bool]:
+        capacity = len(self._ring)
+        if self._written - self._consumed > capacity:
+            # The reader fell behind and the callback lapped it
+            self.dropped_frames += self._written - capacity - self._consumed
+            self._consumed = self._written - capacity
+            self._overflowed = True
+        position = self._consumed % capacity
+        first = min(frames, capacity - position)
+        data = np.empty((frames, self.channels), dtype=self.dtype)
+        data[:first] = self._ring[position:position + first]
+        if frames > first:
+            data[first:] = self._ring[:frames - first]
+        overwritten = self._written - self._consumed - capacity
+        if overwritten > 0:
+            # Overwritten while being copied
+            self._overflowed = True
+            self.dropped_frames += min(overwritten, frames)
+        self._consumed += frames
+        overflowed, self._overflowed = self._overflowed, False
+        return data, overflowed
+
+    def _read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        # Blocking fallback for callers outside the event loop
+        while self._written - self._consumed < frames:
+            if self._stream is None:
+                raise AudioError("DeviceSource.read() called before start()")
+            time.sleep(frames / self.sample_rate / 4)
+        return self._take(frames)
+
+    async def read_async(self, frames: int) -> Tuple[np.ndarray, bool]:
+        while self._written - self._consumed < frames:
+            if self._stream is None:
+                raise AudioError("DeviceSource.read_async() called before start()")
+            self._available.clear()
+            self._waiting = True
+            try:
+                # Re-check after raising the flag, in case a block landed in between
+                if self._written - self._consumed < frames:
+                    await self._available.wait()
+            finally:
+                self._waiting = False
+        data, overflowed = self._take(frames)
+        self.frames_read += frames
+        return data, overflowed
+
+class _FiniteSource(AudioSource):
+    """
+    Base for recorded audio. Short final blocks are zero padded, and
+    `tail_silence` seconds of silence follow the last sample so VAD can end
+    the final utterance. With pace=True reads are slowed to real time.
+    """
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        dtype: np.dtype = np.int16,
+        tail_silence: float = 2.0,
+        pace: bool = False
+    ):
+        super().__init__(sample_rate, channels, dtype)
+        self.pace = pace
+        self.realtime = pace
+        self.live = pace
+        self._tail_frames = int(tail_silence * sample_rate)
+        self._paced_from: Optional[float] = None
+
+    @abstractmethod
+    def _read_samples(self, frames: int) -> np.ndarray:
+        """Return up to `frames` rows of (frames, channels) audio; fewer only at the end."""
+
+    def _next_block(self, frames: int) -> np.ndarray:
+        data = self._read_samples(frames)
+        missing = frames - len(data)
+        if missing:
+            if len(data) == 0:
+                # Past the last sample: hand out the trailing silence, then stop
+                if self._tail_frames <= 0:
+                    raise EndOfAudio()
+                self._tail_frames -= frames
+            data = np.concatenate([data, np.zeros((missing, self.channels), dtype=self.dtype)])
+        return data
+
+    def _pace_delay(self, frames: int) -> float:
+        """Seconds until the next `frames` would have been spoken, with pace=True."""
+        if self._paced_from is None:
+            self._paced_from = time.monotonic() - self.clock
+        return self._paced_from + (self.frames_read + frames) / self.sample_rate - time.monotonic()
+
+    def _read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        data = self._next_block(frames)
+        if self.pace:
+            delay = self._pace_delay(frames)
+            if delay > 0:
+                time.sleep(delay)
+        return data, False
+
+    async def read_async(self, frames: int) -> Tuple[np.ndarray, bool]:
+        # Paced reads wait on the loop instead of sleeping in it
+        if self.pace:
+            delay = self._pace_delay(frames)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        data = self._next_block(frames)
+        self.frames_read += len(data)
+        return data, False
+
+    def _conform(self, samples: np.ndarray, source_rate: int) -> np.ndarray:
+        """Convert samples to (n, channels) in this source's dtype and sample rate."""
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        if samples.shape[1] != self.channels:
+            if self.channels != 1:
+                raise AudioError(f"Cannot map {samples.shape[1]} channels to {self.channels}")
+            samples = samples.mean(axis=1, keepdims=True)
+
+        if np.issubdtype(samples.dtype, np.floating) and np.issubdtype(np.dtype(self.dtype), np.integer):
+            samples = np.clip(samples, -1.0, 1.0) * np.iinfo(self.dtype).max
+
+        if source_rate != self.sample_rate:
+            # Linear interpolation is plenty for speech going into VAD and Whisper
+            duration = len(samples) / source_rate
+            target = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+            original = np.arange(len(samples)) / source_rate
+            samples = np.stack(
+                [np.interp(target, original, samples[:, channel]) for channel in range(samples.shape[1])],
+                axis=1
+            )
+        return samples.astype(self.dtype, copy=False)
+
+class ArraySource(_FiniteSource):
+    """Audio already in memory, e.g. a synthetic test signal or a decoded corpus."""
+    def __init__(self, samples: np.ndarray, source_rate: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._samples = self._conform(np.asarray(samples), source_rate or self.sample_rate)
+        self._position = 0
+
+    def _read_samples(self, frames: int) -> np.ndarray:
+        data = self._samples[self._position:self._position + frames]
+        self._position += len(data)
+        return data
+
+class FileSource(_FiniteSource):
+    """
+    WAV, FLAC or any other format soundfile can read. Files at the target
+    sample rate are streamed block by block; others are decoded and resampled
+    up front.
+    """
+    def __init__(self, path: str | Path, **kwargs):
+        import soundfile as sf
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        if not self.path.exists():
+            raise AudioError(f"Audio file not found: {self.path}")
+        self._file = sf.SoundFile(str(self.path))
+        self._resampled: Optional[ArraySource] = None
+        if self._file.samplerate != self.sample_rate or self._file.channels != self.channels:
+            samples = self._file.read(dtype='float32', always_2d=True)
+            self._resampled = ArraySource(samples, self._file.samplerate, sample_rate=self.sample_rate,
+                                          channels=self.channels, dtype=self.dtype, tail_silence=0)
+            self._file.close()
+
+    def _read_samples(self, frames: int) -> np.ndarray:
+        if self._resampled is not None:
+            return self._resampled._read_samples(frames)
+        return self._file.read(frames, dtype=np.dtype(self.dtype).name, always_2d=True)
+
+    def close(self) -> None:
+        super().close()
+        if self._resampled is None:
+            self._file.close()
+
+class StdinSource(_FiniteSource):
+    """Raw little-endian PCM in the source's dtype, e.g. `ffmpeg -i in.mp3 -f s16le -ar 16000 -ac 1 - | ...`."""
+    def __init__(self, stream: Optional[BinaryIO] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._stream = stream if stream is not None else sys.stdin.buffer
+        self._frame_bytes = np.dtype(self.dtype).itemsize * self.channels
+
+    def _read_samples(self, frames: int) -> np.ndarray:
+        raw = self._stream.read(frames * self._frame_bytes)
+        usable = len(raw) - len(raw) % self._frame_bytes
+        data = np.frombuffer(raw[:usable], dtype=np.dtype(self.dtype).newbyteorder('<'))
+        return data.astype(self.dtype, copy=False).reshape(-1, self.channels)
+
+class PushSource(AudioSource):
+    """
+    Audio handed over by another task, e.g. PCM frames a client streams over a
+    websocket. feed() appends raw little-endian samples and end() marks the
+    end of the stream. Only read_async() can wait for data, so read() refuses.
+
+    At most `max_buffered` seconds are kept; when a consumer falls behind the
+    oldest audio is dropped and the next read reports an overflow, like a
+    device would.
+
+    Network audio arrives in bursts, so it is timed by its samples rather
+    than by when it was received: the source does not count as realtime.
+    """
+    live = True
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, dtype: np.dtype = np.int16, max_buffered: float = 5.0):
+        super().__init__(sample_rate, channels, dtype)
+        self._frame_bytes = np.dtype(self.dtype).itemsize * self.channels
+        self._max_bytes = int(max_buffered * sample_rate) * self._frame_bytes
+        self._buffer = bytearray()
+        self._available = asyncio.Event()
+        self._ended = False
+        self._overflowed = False
+
+    def feed(self, pcm: bytes) -> None:
+        if self._ended:
+            return
+        self._buffer.extend(pcm)
+        excess = len(self._buffer) - self._max_bytes
+        if excess > 0:
+            excess += -excess % self._frame_bytes
+            del self._buffer[:excess]
+            self._overflowed = True
+            self.overflows += 1
+            self.dropped_frames += excess // self._frame_bytes
+        self._available.set()
+
+    def end(self) -> None:
+        self._ended = True
+        self._available.set()
+
+    def _read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        raise AudioError("PushSource is fed by the event loop; use read_async()")
+
+    async def read_async(self, frames: int) -> Tuple[np.ndarray, bool]:
+        wanted = frames * self._frame_bytes
+        while len(self._buffer) < wanted and not self._ended:
+            self._available.clear()
+            await self._available.wait()
+        if not self._buffer:
+            raise EndOfAudio()
+        raw = bytes(self._buffer[:wanted])
+        del self._buffer[:wanted]
+        # Only the final block of an ended stream can come up short
+        raw += bytes(wanted - len(raw))
+        data = np.frombuffer(raw, dtype=np.dtype(self.dtype).newbyteorder('<')).astype(self.dtype, copy=False)
+        overflowed, self._overflowed = self._overflowed, False
+        self.frames_read += frames
+        return data.reshape(-1, self.channels), overflowed
+
+def open_audio_source(spec: Optional[str], sample_rate: int = 16000, channels: int = 1, **kwargs) -> Optional[AudioSource]:
+    """
+    Build a source from a short spec, as used by ARLO_AUDIO_SOURCE and run.py.
+
+    None, "" or "device" return None, which leaves each component on its own
+    default input device. "device:<index>" shares that device, "-" or
+    "stdin" reads raw PCM from stdin and anything else is an audio file path.
+    Extra keyword arguments (tail_silence, pace) go to recorded sources.
+    """
+    if not spec or spec == "device":
+        return None
+    if spec.startswith("device:"):
+        return DeviceSource(sample_rate=sample_rate, channels=channels, device=int(spec.split(":", 1)[1]))
+    if spec in ("-", "stdin"):
+        return StdinSource(sample_rate=sample_rate, channels=channels, **kwargs)
+    return FileSource(spec, sample_rate=sample_rate, channels=channels, **kwargs)
@@ -0,0 +1,144 @@
+# core/cancellation.py
+import time
+import asyncio
+from collections import Counter
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set
+from src.core.metrics import LatencyHistogram
+from src.utils.logger import setup_logging
+
+CleanupCallback = Callable[[str], None]
+
+class CancelScope:
+    """
+    The tasks doing one turn's work (LLM calls, tool calls, synthesis, playback).
+
+    cancel() tears all of them down at once. Finished tasks drop out of the
+    scope by themselves, so a long-lived scope does not accumulate them.
+    """
+    def __init__(self, name: str = "turn", trace: Any = None):
+        self.name = name
+        self.trace = trace  # Root trace span of the turn, annotated when it is cancelled
+        self.tasks: Set[asyncio.Task] = set()
+        self.cancelled: Optional[str] = None  # Reason, once cancelled
+
+    def create_task(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        return self.add_task(asyncio.create_task(coro, name=name))
+
+    def add_task(self, task: asyncio.Task) -> asyncio.Task:
+        if not task.done():
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return task
+
+    def cancel(self, reason: str) -> List[asyncio.Task]:
+        """Request cancellation of every task. Returns the tasks still to finish."""
+        self.cancelled = reason
+        pending = [task for task in self.tasks if not task.done()]
+        current = asyncio.current_task()
+        for task in pending:
+            if task is not current:
+                task.cancel(msg=reason)
+        return [task for task in pending if task is not current]
+
+class TurnScopes:
+    """
+    Tracks the current turn's CancelScope for one pipeline and tears it down
+    on barge-in ("Stop Arlo", "Arlo pause" or a new "Hey Arlo").
+
+    Components spawn their turn work with spawn()/run() instead of bare
+    create_task(), and register cleanup callbacks for work that is not a task,
+    such as stopping the sound device. Cancellation latency, from the wake
+    word frame to the last task finishing, is recorded per reason.
+    """
+    def __init__(self, timeout: float = 1.0):
+        """
+        Args:
+            timeout (float): Seconds cancel() waits for torn-down tasks before
+                giving up on them and counting them as stragglers
+        """
+        self.timeout = timeout
+        self.logger = setup_logging(module_name="TurnScopes")
+        self.current = CancelScope()
+        self._cleanups: List[CleanupCallback] = []
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.cancelled_tasks = 0
+        self.stragglers = 0
+        self.cancellations: Counter = Counter()
+
+    def open(self, name: str = "turn", trace: Any = None) -> CancelScope:
+        """Start a new turn. Work still running from the previous turn is left alone."""
+        self.current = CancelScope(name, trace)
+        return self.current
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Start a task that belongs to the current turn."""
+        return self.current.create_task(coro, name=name)
+
+    async def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine as turn work and wait for it.
+
+        Meant for bus handlers: a barge-in cancels the work, not the handler,
+        so the subscriber keeps running. Returns None if the work was cancelled.
+        """
+        task = self.spawn(coro)
+        await asyncio.wait({task})
+        if task.cancelled():
+            return None
+        return task.result()
+
+    def add_cleanup(self, callback: CleanupCallback) -> None:
+        """Call callback(reason) on every cancellation, e.g. to stop audio playback."""
+        self._cleanups.append(callback)
+
+    async def cancel(self, reason: str, requested_at: Optional[float] = None) -> float:
+        """
+        Tear down the current turn and wait (up to `timeout`) for it to finish.
+
+        Args:
+            reason (str): Why, e.g. "stop", "pause" or "wake"
+            requested_at (float): time.perf_counter() of the frame that asked
+                for it; defaults to now
+
+        Returns:
+            float: Seconds from requested_at until every task was gone
+        """
+        started = requested_at if requested_at is not None else time.perf_counter()
+        scope, self.current = self.current, CancelScope()
+        if scope.trace is not None:
+            scope.trace.set('cancelled', reason)
+
+        pending = scope.cancel(reason)
+        for callback in self._cleanups:
+            try:
+                callback(reason)
+            except Exception as e:
+                self.logger.error(f"Cancellation cleanup failed: {e}")
+
+        stragglers: Set[asyncio.Task] = set()
+        if pending:
+            _, stragglers = await asyncio.wait(pending, timeout=self.timeout)
+
+        latency = time.perf_counter() - started
+        self.latency.setdefault(reason, LatencyHistogram()).record(latency)
+        self.cancellations[reason] += 1
+        self.cancelled_tasks += len(pending)
+        self.stragglers += len(stragglers)
+        if scope.trace is not None:
+            scope.trace.set('cancel_latency_ms', latency * 1000)
+        if stragglers:
+            self.logger.warning(
+                f"{len(stragglers)} task(s) still running {self.timeout}s after '{reason}': "
+                + ", ".join(task.get_name() for task in stragglers)
+            )
+        self.logger.info(f"Cancelled {len(pending)} task(s) on '{reason}' in {latency * 1000:.0f} ms")
+        return latency
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'cancellations': dict(self.cancellations),
+            'cancelled_tasks': self.cancelled_tasks,
+            'stragglers': self.stragglers,
+            'in_flight': len(self.current.tasks),
+            'latency': {reason: histogram.summary() for reason, histogram in self.latency.items()},
+        }
@@ -0,0 +1,147 @@
+# core/coalesce.py
+import asyncio
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+class CoalescePolicy(Enum):
+    LATEST = "latest"      # Events inside a window collapse to the most recent one
+    DEBOUNCE = "debounce"  # Deliver the most recent event once the topic has been quiet for a window
+    BATCH = "batch"        # Deliver every event of a window as one list of (args, kwargs)
+    FIRST = "first"        # Deliver the first event of a window and drop the rest, nothing is delivered late
+
+class _Window:
+    """Coalescing state for one key of a topic."""
+    __slots__ = ('end', 'passed', 'pending', 'batch', 'timer')
+
+    def __init__(self):
+        self.end = 0.0
+        self.passed = 0
+        self.pending: Optional[Tuple[Tuple, Dict]] = None
+        self.batch: List[Tuple[Tuple, Dict]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class Coalescer:
+    """
+    Rate limiter for a single high-frequency topic.
+
+    For LATEST and BATCH, up to max_deliveries - 1 events per window go straight
+    through and the rest are held and flushed once at the end of the window,
+    so subscribers see at most max_deliveries deliveries per window. DEBOUNCE
+    holds every event until no new one has arrived for a full window. FIRST
+    passes up to max_deliveries events per window at once and drops the rest.
+
+    With a `key` function, every key gets its own window, so events with
+    different keys never absorb each other; e.g. keyed by wake word
+    command, a burst of "Hey Arlo" cannot swallow a "Stop Arlo".
+    """
+    # Idle keys are forgotten once this many are tracked
+    MAX_IDLE_KEYS = 64
+
+    def __init__(
+        self,
+        topic_name: str,
+        policy: CoalescePolicy,
+        window: float,
+        max_deliveries: int,
+        flush: Callable[[str, Tuple, Dict], None],
+        key: Optional[Callable[[Tuple, Dict], Hashable]] = None
+    ):
+        if window <= 0:
+            raise ValueError("Coalescing window must be positive")
+        if max_deliveries < 1:
+            raise ValueError("max_deliveries must be at least 1")
+        self.topic_name = topic_name
+        self.policy = policy
+        self.window = window
+        self.max_deliveries = max_deliveries
+        self.coalesced = 0  # Events absorbed instead of delivered on their own
+        self._flush = flush
+        self._key = key
+        self._windows: Dict[Hashable, _Window] = {}
+
+    def _window_for(self, key: Hashable, now: float) -> _Window:
+        state = self._windows.get(key)
+        if state is None:
+            if len(self._windows) >= self.MAX_IDLE_KEYS:
+                self._windows = {
+                    k: w for k, w in self._windows.items() if w.timer is not None or w.end > now
+                }
+            state = self._windows[key] = _Window()
+        return state
+
+    def offer(self, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Tuple[Tuple, Dict]]:
+        """
+        Take an event. Returns the (args, kwargs) to deliver right away, or None if held back.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        key = self._key(args, kwargs) if self._key is not None else None
+        state = self._window_for(key, now)
+
+        if self.policy is CoalescePolicy.DEBOUNCE:
+            if state.pending is not None:
+                self.coalesced += 1
+            state.pending = (args, kwargs)
+            if state.timer is not None:
+                state.timer.cancel()
+            state.timer = loop.call_later(self.window, self._on_timer, key)
+            return None
+
+        if now >= state.end and state.timer is None:
+            state.end = now + self.window
+            state.passed = 0
+
+        if self.policy is CoalescePolicy.FIRST:
+            if state.passed < self.max_deliveries:
+                state.passed += 1
+                return args, kwargs
+            self.coalesced += 1
+            return None
+
+        if state.passed < self.max_deliveries - 1 and state.timer is None:
+            state.passed += 1
+            if self.policy is CoalescePolicy.BATCH:
+                return ([(args, kwargs)],), {}
+            return args, kwargs
+
+        if self.policy is CoalescePolicy.BATCH:
+            state.batch.append((args, kwargs))
+        else:
+            if state.pending is not None:
+                self.coalesced += 1
+            state.pending = (args, kwargs)
+
+        if state.timer is None:
+            state.timer = loop.call_at(state.end, self._on_timer, key)
+        return None
+
+    def _on_timer(self, key: Hashable) -> None:
+        state = self._windows.get(key)
+        if state is None:
+            return
+        state.timer = None
+        if self.policy is CoalescePolicy.BATCH:
+            batch, state.batch = state.batch, []
+            if batch:
+                self.coalesced += len(batch) - 1
+                self._flush(self.topic_name, (batch,), {})
+        elif state.pending is not None:
+            args, kwargs = state.pending
+            state.pending = None
+            self._flush(self.topic_name, args, kwargs)
+
+    def cancel(self) -> None:
+        """Drop anything held back and stop the timers."""
+        for state in self._windows.values():
+            if state.timer is not None:
+                state.timer.cancel()
+        self._windows.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'policy': self.policy.value,
+            'window': self.window,
+            'max_deliveries': self.max_deliveries,
+            'keyed': self._key is not None,
+            'coalesced': self.coalesced,
+        }
@@ -55,6 +55,10 @@ class AccessKeyError(AssistantError):
     """Raised when there are issues with access key"""
     pass
 
+class SessionError(AssistantError):
+    """Raised when a client session cannot be opened or found."""
+    pass
+
 def handle_assistant_error(func):
     """Decorator for handling assistant errors gracefully."""
     def wrapper(*args, **kwargs):
@@ -79,6 +83,7 @@ ERROR_CODES = {
     'CONFIG_ERROR': 1007,
     'STATE_ERROR': 1008,
     'EVENT_BUS_ERROR': 1009,
+    'SESSION_ERROR': 1010,
     'UNKNOWN_ERROR': 9999
 }
 
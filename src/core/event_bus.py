@@ -3,8 +3,16 @@ import time
 import asyncio
 from threading import Lock
 from collections import defaultdict
-from typing import Dict, List, Callable, Optional
-from src.utils.helpers import GenericUtils, TimeUtils
+from itertools import count
+from typing import Dict, Hashable, List, Callable, Optional, Set, Tuple
+from src.utils.helpers import GenericUtils
+from src.core.error import EventBusError
+from src.core.mailbox import Envelope, Mailbox, OverflowPolicy, PublishMode
+from src.core.metrics import LatencyHistogram
+from src.core.tracing import current_span, use_span, reset_span
+from src.core.executors import ExecutorPool, default_pools
+from src.core.coalesce import CoalescePolicy, Coalescer
+from src.utils.config import EVENT_TRACING
 from dataclasses import dataclass, field
 from src.utils.logger import setup_logging
 
@@ -14,6 +22,28 @@ class Subscriber:
     async_handler: bool = False
     last_called: float = field(default_factory=lambda: 0.0)
     call_count: int = 0
+    seq: int = 0  # Global subscription order, used to merge wildcard matches
+    mailbox: Optional[Mailbox] = None  # None means the publisher runs the handler directly
+    executor: str = "io"  # Pool for sync handlers, or "inline" to run on the event loop
+    with_topic: bool = False  # Pass the concrete topic name as the first argument
+    error_count: int = 0
+    queue_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+    execution: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def name(self) -> str:
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    def get_stats(self) -> Dict:
+        return {
+            'call_count': self.call_count,
+            'executor': None if self.async_handler else self.executor,
+            'error_count': self.error_count,
+            'queue_wait': self.queue_wait.summary(),
+            'execution': self.execution.summary(),
+            'mailbox_depth': len(self.mailbox) if self.mailbox is not None else None,
+            'dropped': self.mailbox.dropped if self.mailbox is not None else 0,
+        }
 
 @dataclass
 class Topic:
@@ -25,16 +55,70 @@ class Topic:
     def __post_init__(self):
         self._lock = Lock()  # Per-topic lock for better granularity
 
+@dataclass
+class TopicNode:
+    """One segment of the subscription trie. '*' and '#' are stored as ordinary children."""
+    children: Dict[str, "TopicNode"] = field(default_factory=dict)
+    topic: Optional[Topic] = None
+
+# A resolved route: the exact-match topic (if any) and the merged subscriber snapshot
+Route = Tuple[Optional[Topic], List[Subscriber]]
+
 class EventBus:
+    """
+    Async publish/subscribe bus with hierarchical topics.
+
+    Topic names are dot-separated. Subscriptions may use wildcards:
+    '*' matches exactly one segment and '#' matches zero or more segments,
+    so 'wakeword.*' sees 'wakeword.start_detection' and 'tts.#' sees every
+    topic under 'tts'. Patterns are compiled into a segment trie and the
+    subscribers for each concrete topic are cached until subscriptions change.
+
+    Subscribers either run directly inside publish (the default) or own a
+    bounded mailbox drained by their own worker task, so a slow handler
+    cannot hold up the publisher. Publishers pick how long to wait with a
+    PublishMode; control topics jump the queue through the priority lane.
+    """
+    SEPARATOR = "."
+    SINGLE_WILDCARD = "*"
+    MULTI_WILDCARD = "#"
+    # Control events that skip ahead of queued work in subscriber mailboxes
+    PRIORITY_TOPICS = frozenset({"wakeword.detected.manager", "wakeword.stop_detection"})
+    INLINE_EXECUTOR = "inline"
+
     def __init__(self):
         self._topics: Dict[str, Topic] = {}
+        self._trie = TopicNode()
+        self._routes: Dict[str, Route] = {}
+        self._route_cache_limit = 4096
+        self._subscription_seq = count(1)
         self._lock = Lock()
         self.logger = None
-        self._topic_stats: Dict[str, Dict] = defaultdict(lambda: {'publish_count': 0, 'last_publish': 0})
+        self._topic_stats: Dict[str, Dict] = defaultdict(
+            lambda: {'publish_count': 0, 'last_publish': 0, 'error_count': 0, 'latency': LatencyHistogram()}
+        )
         self._cleanup_threshold = 1000  # Number of empty topic checks before cleanup
         self._empty_topic_count = 0
+        self._tracing = EVENT_TRACING
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._executors: Dict[str, ExecutorPool] = default_pools()
+        self._coalescers: Dict[str, Coalescer] = {}
         self.logger = setup_logging(module_name="Event_Bus")
 
+    @property
+    def tracing(self) -> bool:
+        """Whether call-site capture and per-publish logging are enabled."""
+        return self._tracing
+
+    def set_tracing(self, enabled: bool) -> None:
+        """
+        Switch tracing mode at runtime.
+
+        With tracing off, publish skips the stack walk, the timestamp formatting
+        and the EVENT log line, and only updates the counters.
+        """
+        self._tracing = bool(enabled)
+        self.logger.debug(f"Event tracing {'enabled' if self._tracing else 'disabled'}")
     
     async def shutdown(self) -> None:
         """
@@ -42,29 +126,224 @@ class EventBus:
         This method should be called when the event bus is no longer needed.
         """
         self._cleanup_empty_topics()
-        self._topics.clear()
+        with self._lock:
+            for topic in self._topics.values():
+                for subscriber in topic.subscribers.values():
+                    if subscriber.mailbox is not None:
+                        subscriber.mailbox.close()
+            self._topics.clear()
+            self._trie = TopicNode()
+            self._routes.clear()
+        for task in list(self._background_tasks):
+            task.cancel()
+        for pool in self._executors.values():
+            pool.shutdown()
+        for coalescer in self._coalescers.values():
+            coalescer.cancel()
         if self.logger:
             self.logger.debug("Event bus shut down")
 
-    def subscribe(self, topic_name: str, callback: Callable, async_handler: bool = False) -> None:
+    def register_executor(self, name: str, max_workers: int) -> None:
+        """Create a named thread pool that sync subscribers can opt into."""
+        if name == self.INLINE_EXECUTOR:
+            raise EventBusError(f"'{name}' is reserved for handlers run on the event loop")
         with self._lock:
-            if topic_name not in self._topics:
-                self._topics[topic_name] = Topic(topic_name)
-            
-            topic = self._topics[topic_name]
-            
-        # Use topic-specific lock for better concurrency
-        with topic._lock:
-            callback_id = id(callback)
-            subscriber = Subscriber(callback, async_handler)
-            
-            # Store the subscriber
-            topic.subscribers[callback_id] = subscriber
-            
-            # Simply append to the subscriber order list
-            topic.subscriber_order.append(callback_id)
+            previous = self._executors.get(name)
+            self._executors[name] = ExecutorPool(name, max_workers)
+        if previous is not None:
+            previous.shutdown()
+        self.logger.debug(f"Registered executor '{name}' with {max_workers} workers")
+
+    def get_executor_stats(self) -> Dict[str, Dict[str, int]]:
+        """Size, queue depth and activity of every executor pool."""
+        return {name: pool.get_stats() for name, pool in list(self._executors.items())}
+
+    def set_coalescing(
+        self,
+        topic_name: str,
+        policy: CoalescePolicy,
+        window: float,
+        max_deliveries: int = 1,
+        key: Optional[Callable[[Tuple, Dict], Hashable]] = None
+    ) -> None:
+        """
+        Rate-limit deliveries for a high-frequency concrete topic.
+
+        Args:
+            topic_name (str): Concrete topic (not a pattern) to coalesce
+            policy (CoalescePolicy): LATEST, DEBOUNCE, BATCH or FIRST
+            window (float): Window length in seconds
+            max_deliveries (int): Upper bound on deliveries per window (LATEST, BATCH and FIRST)
+            key (Callable): Maps an event's (args, kwargs) to a key; each key is
+                coalesced on its own. None coalesces the whole topic together.
+        """
+        coalescer = Coalescer(topic_name, policy, window, max_deliveries, self._flush_coalesced, key)
+        with self._lock:
+            previous = self._coalescers.get(topic_name)
+            self._coalescers[topic_name] = coalescer
+        if previous is not None:
+            previous.cancel()
+        self.logger.debug(f"Coalescing '{topic_name}' with {policy.value} over {window}s")
+
+    def clear_coalescing(self, topic_name: str) -> None:
+        """Deliver a topic's events one by one again, dropping anything held back."""
+        with self._lock:
+            coalescer = self._coalescers.pop(topic_name, None)
+        if coalescer is not None:
+            coalescer.cancel()
+
+    def _flush_coalesced(self, topic_name: str, args: Tuple, kwargs: Dict) -> None:
+        self._spawn(self._dispatch(topic_name, args, kwargs, PublishMode.AWAIT_ALL, None, None))
+
+    def _split_pattern(self, topic_name: str) -> List[str]:
+        """Split a subscription pattern into segments, validating wildcard placement."""
+        segments = topic_name.split(self.SEPARATOR)
+        for segment in segments:
+            if segment in (self.SINGLE_WILDCARD, self.MULTI_WILDCARD):
+                continue
+            if not segment or self.SINGLE_WILDCARD in segment or self.MULTI_WILDCARD in segment:
+                raise EventBusError(f"Invalid topic pattern '{topic_name}'")
+        return segments
+
+    @classmethod
+    def topic_matches(cls, pattern: str, topic_name: str) -> bool:
+        """Check one concrete topic against a pattern without touching the trie."""
+        def match(pattern_segments: List[str], topic_segments: List[str]) -> bool:
+            if not pattern_segments:
+                return not topic_segments
+            head, rest = pattern_segments[0], pattern_segments[1:]
+            if head == cls.MULTI_WILDCARD:
+                return any(match(rest, topic_segments[i:]) for i in range(len(topic_segments) + 1))
+            if not topic_segments:
+                return False
+            return (head == cls.SINGLE_WILDCARD or head == topic_segments[0]) and match(rest, topic_segments[1:])
+
+        return match(pattern.split(cls.SEPARATOR), topic_name.split(cls.SEPARATOR))
+
+    def _insert_pattern(self, topic: Topic) -> None:
+        node = self._trie
+        for segment in self._split_pattern(topic.name):
+            node = node.children.setdefault(segment, TopicNode())
+        node.topic = topic
+
+    def _remove_pattern(self, topic_name: str) -> None:
+        """Detach a pattern from the trie and prune branches left empty."""
+        path = [self._trie]
+        segments = topic_name.split(self.SEPARATOR)
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].topic = None
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.topic is not None or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def _match(self, node: TopicNode, segments: List[str], index: int, found: Dict[int, Topic]) -> None:
+        """Collect every pattern topic in the trie that matches segments[index:]."""
+        multi = node.children.get(self.MULTI_WILDCARD)
+        if multi is not None:
+            # '#' swallows zero or more of the remaining segments
+            for end in range(index, len(segments) + 1):
+                self._match(multi, segments, end, found)
+
+        if index == len(segments):
+            if node.topic is not None:
+                found[id(node.topic)] = node.topic
+            return
+
+        child = node.children.get(segments[index])
+        if child is not None:
+            self._match(child, segments, index + 1, found)
+        single = node.children.get(self.SINGLE_WILDCARD)
+        if single is not None:
+            self._match(single, segments, index + 1, found)
+
+    def _resolve(self, topic_name: str) -> Route:
+        """Resolve and cache the subscribers for a concrete topic."""
+        with self._lock:
+            route = self._routes.get(topic_name)
+            if route is not None:
+                return route
+
+            found: Dict[int, Topic] = {}
+            self._match(self._trie, topic_name.split(self.SEPARATOR), 0, found)
+
+            merged: Dict[int, Subscriber] = {}
+            for topic in found.values():
+                with topic._lock:
+                    for sub_id in topic.subscriber_order:
+                        # A callback matched by several patterns is delivered once
+                        merged.setdefault(sub_id, topic.subscribers[sub_id])
+            subscribers = sorted(merged.values(), key=lambda sub: sub.seq)
+
+            if len(self._routes) >= self._route_cache_limit:
+                self._routes.clear()
+            route = (self._topics.get(topic_name), subscribers)
+            self._routes[topic_name] = route
+            return route
+
+    def subscribe(
+        self,
+        topic_name: str,
+        callback: Callable,
+        async_handler: bool = False,
+        mailbox_size: Optional[int] = None,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        executor: str = "io",
+        with_topic: bool = False
+    ) -> None:
+        """
+        Subscribe a callback to a topic or wildcard pattern such as 'wakeword.*' or 'tts.#'.
+
+        Args:
+            topic_name (str): Concrete topic or wildcard pattern
+            callback (Callable): Handler invoked with the published args
+            async_handler (bool): Whether the callback is a coroutine function
+            mailbox_size (int): If set, deliver through a bounded mailbox of this size
+                instead of running the handler inside publish
+            overflow (OverflowPolicy): What to do when the mailbox is full
+            executor (str): Where sync callbacks run: "io", "cpu", "inline" (on the
+                event loop, for trivial handlers) or a pool added with register_executor
+            with_topic (bool): Call the handler with the concrete topic name first,
+                for pattern subscribers that need to know what matched
+        """
+        if not async_handler and executor != self.INLINE_EXECUTOR and executor not in self._executors:
+            raise EventBusError(f"Unknown executor '{executor}' for topic '{topic_name}'")
+        mailbox = Mailbox(mailbox_size, overflow) if mailbox_size is not None else None
+        with self._lock:
+            topic = self._topics.get(topic_name)
+            if topic is None:
+                topic = Topic(topic_name)
+                self._insert_pattern(topic)
+                self._topics[topic_name] = topic
             
+            # Use topic-specific lock for better concurrency
+            with topic._lock:
+                callback_id = id(callback)
+                subscriber = Subscriber(
+                    callback, async_handler, seq=next(self._subscription_seq), mailbox=mailbox, executor=executor,
+                    with_topic=with_topic
+                )
+                
+                # Store the subscriber
+                previous = topic.subscribers.get(callback_id)
+                if previous is None:
+                    topic.subscriber_order.append(callback_id)
+                elif previous.mailbox is not None:
+                    previous.mailbox.close()
+                topic.subscribers[callback_id] = subscriber
+
+            # Any cached route may now be stale
+            self._routes.clear()
+
+        if self._tracing:
             self.logger.event(f"Subscribed to topic '{topic_name}' and subscribed in {GenericUtils.caller_info()}")
+        else:
+            self.logger.debug(f"Subscribed to topic '{topic_name}'")
 
     def unsubscribe(self, topic_name: str, callback: Callable) -> None:
         with self._lock:
@@ -73,22 +352,28 @@ class EventBus:
             
             topic = self._topics[topic_name]
             
-        with topic._lock:
-            callback_id = id(callback)
-            
-            if callback_id in topic.subscribers:
-                del topic.subscribers[callback_id]
+            with topic._lock:
+                callback_id = id(callback)
+                
+                subscriber = topic.subscribers.pop(callback_id, None)
+                if subscriber is None:
+                    return
+                if subscriber.mailbox is not None:
+                    subscriber.mailbox.close()
                 if callback_id in topic.subscriber_order:
                     topic.subscriber_order.remove(callback_id)
+                is_empty = not topic.subscribers
+
+            self._routes.clear()
                 
-                # Check if topic is empty and mark for potential cleanup
-                if not topic.subscribers:
-                    self._empty_topic_count += 1
-                    if self._empty_topic_count >= self._cleanup_threshold:
-                        self._cleanup_empty_topics()
-                
-                if self.logger:
-                    self.logger.debug(f"Unsubscribed from topic '{topic_name}'")
+        # Check if topic is empty and mark for potential cleanup
+        if is_empty:
+            self._empty_topic_count += 1
+            if self._empty_topic_count >= self._cleanup_threshold:
+                self._cleanup_empty_topics()
+        
+        if self.logger:
+            self.logger.debug(f"Unsubscribed from topic '{topic_name}'")
 
     def _cleanup_empty_topics(self) -> None:
         """Remove topics with no subscribers to prevent memory leaks."""
@@ -97,54 +382,124 @@ class EventBus:
                           if not topic.subscribers]
             for topic_name in empty_topics:
                 del self._topics[topic_name]
+                self._remove_pattern(topic_name)
                 if self.logger:
                     self.logger.debug(f"Cleaned up empty topic '{topic_name}'")
             self._empty_topic_count = 0
+            if empty_topics:
+                self._routes.clear()
 
-    async def publish(self, topic_name: str, *args, **kwargs) -> List[Exception]:
+    async def publish(
+        self,
+        topic_name: str,
+        *args,
+        mode: PublishMode = PublishMode.AWAIT_ALL,
+        deadline: Optional[float] = None,
+        priority: Optional[bool] = None,
+        **kwargs
+    ) -> List[Exception]:
         """
         Publish an event to a topic with optimized concurrent execution.
+
+        The keyword names mode, deadline and priority are reserved for the bus
+        and are not forwarded to subscribers. Subscribers run under the
+        publisher's current trace span (see core/tracing.py), including
+        mailbox and thread pool handlers.
+
+        Args:
+            topic_name (str): Concrete topic to publish to
+            mode (PublishMode): How long to wait for subscribers
+            deadline (float): Seconds to wait before giving up on slow subscribers
+            priority (bool): Use the mailbox priority lane; defaults to PRIORITY_TOPICS membership
+
+        Returns:
+            List[Exception]: Errors raised by subscribers that finished in time
         """
-        current_time = TimeUtils.get_timestamp()
-        caller_info = GenericUtils.caller_info(skip_one_more=True)
-        self.logger.event(f"EVENT Publish by '{caller_info}' and '{topic_name}'")
-        # Fast path for non-existent topics
-        if topic_name not in self._topics:
-            if self.logger:
+        if self._tracing:
+            caller_info = GenericUtils.caller_info(skip_one_more=True)
+            self.logger.event(f"EVENT Publish by '{caller_info}' and '{topic_name}'")
+
+        coalescer = self._coalescers.get(topic_name)
+        if coalescer is not None:
+            # Held-back events are delivered later by the coalescer's timer
+            released = coalescer.offer(args, kwargs)
+            if released is None:
+                return []
+            args, kwargs = released
+
+        return await self._dispatch(topic_name, args, kwargs, mode, deadline, priority)
+
+    async def _dispatch(
+        self,
+        topic_name: str,
+        args: Tuple,
+        kwargs: Dict,
+        mode: PublishMode,
+        deadline: Optional[float],
+        priority: Optional[bool]
+    ) -> List[Exception]:
+        """Deliver one event to every subscriber on the topic's route."""
+        started = time.perf_counter()
+        current_time = time.time()
+
+        # Fast path: the route for a concrete topic is cached after the first publish
+        route = self._routes.get(topic_name)
+        if route is None:
+            route = self._resolve(topic_name)
+        topic, subscribers = route
+
+        if not subscribers:
+            if self._tracing:
                 self.logger.warning(f"No subscribers for topic '{topic_name}'")
             return None
 
-        topic = self._topics[topic_name]
-
-        # Get subscribers with topic-specific lock
-        with topic._lock:
-            if not topic.subscribers:
-                return None
-            
-            # Update topic statistics
+        # Update topic statistics
+        if topic is not None:
             topic.last_published = current_time
-            self._topic_stats[topic_name]['publish_count'] += 1
-            self._topic_stats[topic_name]['last_publish'] = current_time
-            
-            # Create a snapshot of current subscribers
-            subscribers = [topic.subscribers[sub_id] for sub_id in topic.subscriber_order]
+        stats = self._topic_stats[topic_name]
+        stats['publish_count'] += 1
+        stats['last_publish'] = current_time
+
+        if priority is None:
+            priority = topic_name in self.PRIORITY_TOPICS
 
         # Process subscribers concurrently with optimized task creation
         tasks = []
+        acks = []
         for subscriber in subscribers:
             subscriber.last_called = current_time
             subscriber.call_count += 1
             
-            if subscriber.async_handler:
+            if subscriber.mailbox is not None:
+                ack = None if mode is PublishMode.FIRE_AND_FORGET else asyncio.get_running_loop().create_future()
+                envelope = Envelope(topic_name, args, kwargs, ack, time.perf_counter(), current_span())
+                await self._deliver(subscriber, envelope, priority)
+                if ack is not None:
+                    acks.append(ack)
+            elif subscriber.async_handler:
                 tasks.append(self._execute_async_handler(subscriber, topic_name, *args, **kwargs))
             else:
                 tasks.append(self._execute_sync_handler(subscriber, topic_name, *args, **kwargs))
 
-        # Optimized gathering of results
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if mode is PublishMode.FIRE_AND_FORGET:
+            for coro in tasks:
+                self._spawn(coro)
+            stats['latency'].record(time.perf_counter() - started)
+            return []
+
+        if mode is PublishMode.AWAIT_ALL and deadline is None and not acks:
+            # Optimized gathering of results; a lone subscriber doesn't need gather
+            if len(tasks) == 1:
+                results = [await tasks[0]]
+            else:
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+        else:
+            results = await self._wait_for_results(topic_name, tasks, acks, mode, deadline)
         
         # Efficient exception handling
         exceptions = [e for e in results if isinstance(e, Exception)]
+        stats['latency'].record(time.perf_counter() - started)
+        stats['error_count'] += len(exceptions)
         
         if exceptions and self.logger:
             self.logger.error(f"{len(exceptions)} errors occurred while publishing to '{topic_name}'")
@@ -153,48 +508,151 @@ class EventBus:
         
         return exceptions
 
+    async def _wait_for_results(self, topic_name: str, tasks: List, acks: List[asyncio.Future], mode: PublishMode, deadline: Optional[float]) -> List:
+        """Wait on direct handlers and mailbox acks according to the publish mode."""
+        pending = [asyncio.ensure_future(coro) for coro in tasks] + acks
+        return_when = asyncio.FIRST_COMPLETED if mode is PublishMode.FIRST_ACK else asyncio.ALL_COMPLETED
+        done, not_done = await asyncio.wait(pending, timeout=deadline, return_when=return_when)
+
+        results = [future.result() for future in done if not future.cancelled()]
+        for future in not_done:
+            # Leave stragglers running; only keep a reference so they aren't collected
+            if isinstance(future, asyncio.Task):
+                self._track(future)
+        if not_done and mode is PublishMode.AWAIT_ALL:
+            self.logger.warning(f"{len(not_done)} subscribers of '{topic_name}' missed the {deadline}s deadline")
+            results.extend(asyncio.TimeoutError(f"Subscriber of '{topic_name}' missed the deadline") for _ in not_done)
+        return results
+
+    async def _deliver(self, subscriber: Subscriber, envelope: Envelope, priority: bool) -> None:
+        """Queue an envelope in a subscriber's mailbox, (re)starting its worker if none is running."""
+        mailbox = subscriber.mailbox
+        if not mailbox.closed and (mailbox.worker is None or mailbox.worker.done()):
+            mailbox.worker = asyncio.create_task(self._drain_mailbox(subscriber))
+        if not await mailbox.put(envelope, priority) and self._tracing:
+            self.logger.warning(f"Mailbox full, dropped event for '{envelope.topic_name}'")
+
+    async def _drain_mailbox(self, subscriber: Subscriber) -> None:
+        """Worker loop that runs a mailbox subscriber one envelope at a time."""
+        mailbox = subscriber.mailbox
+        while True:
+            envelope = mailbox.in_flight = await mailbox.get()
+            subscriber.queue_wait.record(time.perf_counter() - envelope.enqueued_at)
+            # The worker outlives any one publisher; run each handler under its publisher's trace
+            token = use_span(envelope.span)
+            try:
+                if subscriber.async_handler:
+                    result = await self._execute_async_handler(subscriber, envelope.topic_name, *envelope.args, **envelope.kwargs)
+                else:
+                    result = await self._execute_sync_handler(subscriber, envelope.topic_name, *envelope.args, **envelope.kwargs)
+            except BaseException:
+                # Cancelled or killed mid-handler: never leave the publisher waiting.
+                # The next delivery starts a new worker.
+                Mailbox._abandon(envelope)
+                raise
+            finally:
+                reset_span(token)
+                mailbox.in_flight = None
+            if envelope.ack is not None and not envelope.ack.done():
+                envelope.ack.set_result(result)
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _spawn(self, coro) -> None:
+        self._track(asyncio.ensure_future(coro))
+
     async def _execute_async_handler(self, subscriber: Subscriber, topic_name: str, *args, **kwargs):
+        started = time.perf_counter()
         try:
+            if subscriber.with_topic:
+                return await subscriber.callback(topic_name, *args, **kwargs)
             return await subscriber.callback(*args, **kwargs)
         except Exception as e:
+            subscriber.error_count += 1
             if self.logger:
                 self.logger.error(f"Error in async subscriber for topic '{topic_name}': {str(e)}")
             return e
+        finally:
+            subscriber.execution.record(time.perf_counter() - started)
 
     async def _execute_sync_handler(self, subscriber: Subscriber, topic_name: str, *args, **kwargs):
+        submitted = time.perf_counter()
+        started = submitted
+        if subscriber.with_topic:
+            args = (topic_name, *args)
         try:
-            loop = asyncio.get_running_loop()
-            return await loop.run_in_executor(
-                None, lambda: subscriber.callback(*args, **kwargs)
-            )
+            if subscriber.executor == self.INLINE_EXECUTOR:
+                return subscriber.callback(*args, **kwargs)
+            result, started = await self._executors[subscriber.executor].run(subscriber.callback, *args, **kwargs)
+            return result
         except Exception as e:
+            subscriber.error_count += 1
             if self.logger:
                 self.logger.error(f"Error in sync subscriber for topic '{topic_name}': {str(e)}")
             return e
+        finally:
+            if subscriber.mailbox is None:
+                subscriber.queue_wait.record(started - submitted)
+            subscriber.execution.record(time.perf_counter() - started)
+
+    def _snapshot_topic(self, topic_name: str) -> Dict:
+        stats = self._topic_stats.get(topic_name)
+        if stats is None:
+            return {}
+        _, subscribers = self._routes.get(topic_name) or self._resolve(topic_name)
+        coalescer = self._coalescers.get(topic_name)
+        return {
+            'coalescing': coalescer.get_stats() if coalescer is not None else None,
+            'publish_count': stats['publish_count'],
+            'last_publish': stats['last_publish'],
+            'error_count': stats['error_count'],
+            'latency': stats['latency'].summary(),
+            'subscribers': {subscriber.name: subscriber.get_stats() for subscriber in subscribers},
+        }
 
     def get_topic_stats(self, topic_name: Optional[str] = None) -> Dict:
-        """Get statistics for a specific topic or all topics."""
+        """
+        Get statistics for a specific topic or all topics.
+
+        Each topic reports publish and error counts, end-to-end publish latency
+        and, per subscriber, queue wait and handler execution percentiles.
+        """
         if topic_name:
-            return self._topic_stats.get(topic_name, {})
-        return dict(self._topic_stats)
+            return self._snapshot_topic(topic_name)
+        return {name: self._snapshot_topic(name) for name in list(self._topic_stats)}
     
 if __name__ == "__main__":
+    import logging
 
-    async def you_are_not():
+    async def _noop(*args, **kwargs):
         pass
 
-    eb = EventBus()
-
-    sub = Subscriber(callback=you_are_not, async_handler=True)
-    print("== Subscriber ==")
-    print(sub)
-    sub_id = id(you_are_not)
-
-    gg = Topic(name="you_are_not", subscribers={sub_id: sub}, subscriber_order=[sub_id])
-    print("\n== Topic ==")
-    print(gg)
-    gg.subscriber_order.append(str(sub_id) + " This is added")
-    print("\n== Topic ==")
-    print(gg)
-    states= eb.get_topic_stats()
-    print(f"\n== States ==\n{states}")
\ No newline at end of file
+    async def _bench(eb: EventBus, iterations: int) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await eb.publish("bench.topic", 1, key="value")
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    async def main():
+        eb = EventBus()
+        eb.subscribe("bench.topic", _noop, async_handler=True)
+
+        # Silence the console so the tracing run measures formatting, not the terminal
+        for handler in eb.logger.handlers:
+            if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+                handler.setLevel(logging.CRITICAL)
+
+        results = {}
+        for tracing, iterations in ((False, 50_000), (True, 2_000)):
+            eb.set_tracing(tracing)
+            await _bench(eb, 100)  # warm up
+            results["tracing" if tracing else "fast"] = await _bench(eb, iterations)
+
+        print("== EventBus.publish cost per event ==")
+        for mode, cost in results.items():
+            print(f"{mode:>8}: {cost:8.2f} us/event")
+        print(f"\n== Stats ==\n{eb.get_topic_stats('bench.topic')}")
+
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+# core/executors.py
+import os
+import time
+import asyncio
+import contextvars
+from functools import partial
+from threading import Lock
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+class ExecutorPool:
+    """
+    Named thread pool for synchronous event handlers that tracks its own backlog.
+
+    queue_depth is the number of submitted calls that no worker thread has
+    picked up yet, which is the number to watch when a pool is undersized.
+    """
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"eventbus-{name}")
+        self._lock = Lock()
+        self._submitted = 0
+        self._started = 0
+        self._completed = 0
+        self._cancelled = 0  # Calls cancelled before a worker picked them up
+
+    @property
+    def queue_depth(self) -> int:
+        return self._submitted - self._started - self._cancelled
+
+    @property
+    def active(self) -> int:
+        return self._started - self._completed
+
+    def _invoke(self, fn: Callable, args: Tuple, kwargs: Dict) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        with self._lock:
+            self._started += 1
+        try:
+            return fn(*args, **kwargs), started
+        finally:
+            with self._lock:
+                self._completed += 1
+
+    def _on_done(self, future: Future) -> None:
+        # A future can only be cancelled while it is still queued
+        if future.cancelled():
+            with self._lock:
+                self._cancelled += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+        """
+        Run fn on the pool. Returns the result and the perf_counter() it started at.
+        fn runs in a copy of the caller's context, so trace spans carry over.
+        """
+        context = contextvars.copy_context()
+        with self._lock:
+            self._submitted += 1
+        try:
+            future = self._executor.submit(partial(context.run, self._invoke, fn, args, kwargs))
+        except RuntimeError:
+            # The pool is shut down; nothing was queued
+            with self._lock:
+                self._submitted -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        # Cancelling the awaiting task cancels the call too if it hasn't started
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'max_workers': self.max_workers,
+            'queue_depth': self.queue_depth,
+            'active': self.active,
+            'completed': self._completed,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def default_pools() -> Dict[str, ExecutorPool]:
+    """The bus's built-in pools: 'io' for blocking calls, 'cpu' sized to the cores."""
+    cpu_count = os.cpu_count() or 1
+    return {
+        "io": ExecutorPool("io", max_workers=min(32, cpu_count + 4)),
+        "cpu": ExecutorPool("cpu", max_workers=cpu_count),
+    }
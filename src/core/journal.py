@@ -0,0 +1,185 @@
+# core/journal.py
+import time
+import struct
+import pickle
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from src.core.event_bus import EventBus
+from src.core.mailbox import PublishMode
+from src.core.error import EventBusError
+from src.utils.logger import setup_logging
+
+JOURNAL_MAGIC = b"ARLOJRN1"
+# Record header: monotonic timestamp (f64), topic length (u16), pickle length (u32), raw buffer count (u16)
+RECORD_HEADER = struct.Struct("!dHIH")
+BUFFER_HEADER = struct.Struct("!Q")
+
+class JournalRecord(NamedTuple):
+    timestamp: float
+    topic_name: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+
+class EventJournal:
+    """
+    Append-only binary recorder for everything published on an EventBus.
+
+    Each record holds the monotonic publish time, the topic and the pickled
+    (args, kwargs). Pickling uses protocol 5 with out-of-band buffers, so numpy
+    arrays such as recorded utterances are written as raw bytes after the
+    pickle rather than copied into it.
+    """
+    def __init__(self, event_bus: EventBus, path: str | Path, flush_every: int = 64):
+        self.event_bus = event_bus
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.logger = setup_logging(module_name="Event_Journal")
+        self.recorded = 0
+        self.skipped = 0
+        self._file = None
+        self._unflushed = 0
+        self._record_handler = self._record
+
+    @property
+    def is_recording(self) -> bool:
+        return self._file is not None
+
+    def start(self) -> None:
+        """Open the journal and record every topic from now on."""
+        if self._file is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "ab")
+        if is_new:
+            self._file.write(JOURNAL_MAGIC)
+        # Inline sync handler: appending to a buffered file is cheaper than a thread hop
+        self.event_bus.subscribe(
+            EventBus.MULTI_WILDCARD,
+            self._record_handler,
+            executor=EventBus.INLINE_EXECUTOR,
+            with_topic=True
+        )
+        self.logger.info(f"Recording events to {self.path}")
+
+    def stop(self) -> None:
+        if self._file is None:
+            return
+        self.event_bus.unsubscribe(EventBus.MULTI_WILDCARD, self._record_handler)
+        self._file.close()
+        self._file = None
+        self.logger.info(f"Stopped journal after {self.recorded} events ({self.skipped} skipped)")
+
+    def _record(self, topic_name: str, *args, **kwargs) -> None:
+        timestamp = time.monotonic()
+        buffers: List[pickle.PickleBuffer] = []
+        try:
+            payload = pickle.dumps((args, kwargs), protocol=5, buffer_callback=buffers.append)
+        except Exception as e:
+            self.skipped += 1
+            self.logger.warning(f"Skipping unpicklable event on '{topic_name}': {e}")
+            return
+
+        topic = topic_name.encode("utf-8")
+        write = self._file.write
+        write(RECORD_HEADER.pack(timestamp, len(topic), len(payload), len(buffers)))
+        write(topic)
+        write(payload)
+        for buffer in buffers:
+            raw = buffer.raw()
+            write(BUFFER_HEADER.pack(raw.nbytes))
+            write(raw)
+
+        self.recorded += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self._file.flush()
+            self._unflushed = 0
+
+def read_journal(path: str | Path) -> Iterator[JournalRecord]:
+    """Yield every complete record in a journal, ignoring a truncated tail."""
+    with open(path, "rb") as journal:
+        if journal.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise EventBusError(f"{path} is not an event journal")
+        while True:
+            header = journal.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, topic_length, payload_length, buffer_count = RECORD_HEADER.unpack(header)
+            topic = journal.read(topic_length)
+            payload = journal.read(payload_length)
+            if len(topic) < topic_length or len(payload) < payload_length:
+                return
+            buffers = []
+            for _ in range(buffer_count):
+                size_bytes = journal.read(BUFFER_HEADER.size)
+                if len(size_bytes) < BUFFER_HEADER.size:
+                    return
+                (size,) = BUFFER_HEADER.unpack(size_bytes)
+                raw = bytearray(size)
+                if journal.readinto(raw) < size:
+                    return
+                buffers.append(raw)
+            args, kwargs = pickle.loads(payload, buffers=buffers)
+            yield JournalRecord(timestamp, topic.decode("utf-8"), args, kwargs)
+
+async def replay_journal(
+    path: str | Path,
+    event_bus: EventBus,
+    speed: Optional[float] = 1.0,
+    topics: Optional[Iterable[str]] = None,
+    mode: PublishMode = PublishMode.AWAIT_ALL
+) -> int:
+    """
+    Re-publish a journal into a bus in the original order.
+
+    Args:
+        path: Journal file written by EventJournal
+        event_bus: Bus to publish into, usually a fresh one
+        speed: 1.0 keeps the original pacing, 2.0 runs twice as fast, None runs
+            as fast as possible
+        topics: Only replay topics matching these patterns. Use this to feed the
+            entry events of a component and let it publish its own follow-ups.
+        mode: Publish mode for each replayed event
+
+    Returns:
+        int: Number of events replayed
+    """
+    patterns = list(topics) if topics is not None else None
+    loop = asyncio.get_running_loop()
+    first_timestamp = None
+    started = loop.time()
+    replayed = 0
+
+    for record in read_journal(path):
+        if patterns is not None and not any(EventBus.topic_matches(p, record.topic_name) for p in patterns):
+            continue
+        if first_timestamp is None:
+            first_timestamp = record.timestamp
+        if speed:
+            delay = started + (record.timestamp - first_timestamp) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await event_bus.publish(record.topic_name, *record.args, mode=mode, **record.kwargs)
+        replayed += 1
+    return replayed
+
+if __name__ == "__main__":
+    import sys
+    from collections import Counter
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.core.journal <journal file>")
+        sys.exit(1)
+
+    counts = Counter()
+    first = last = None
+    for record in read_journal(sys.argv[1]):
+        counts[record.topic_name] += 1
+        first = record.timestamp if first is None else first
+        last = record.timestamp
+
+    print(f"== {sum(counts.values())} events over {(last - first) if first is not None else 0:.2f}s ==")
+    for topic_name, count in counts.most_common():
+        print(f"{count:>8}  {topic_name}")
@@ -0,0 +1,119 @@
+# core/mailbox.py
+import asyncio
+from enum import Enum
+from collections import deque
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+class OverflowPolicy(Enum):
+    BLOCK = "block"              # Publisher waits for space
+    DROP_OLDEST = "drop_oldest"  # Oldest queued event is discarded
+    DROP_NEWEST = "drop_newest"  # Incoming event is discarded
+
+class PublishMode(Enum):
+    FIRE_AND_FORGET = "fire_and_forget"  # Return once every subscriber has the event queued
+    FIRST_ACK = "first_ack"              # Return when the first subscriber finishes
+    AWAIT_ALL = "await_all"              # Return when all subscribers finish (or the deadline passes)
+
+class Envelope(NamedTuple):
+    topic_name: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    ack: Optional[asyncio.Future]
+    enqueued_at: float = 0.0  # perf_counter() when the publisher queued it
+    span: Any = None  # Publisher's current trace span, restored while the handler runs
+
+class Mailbox:
+    """
+    Bounded per-subscriber queue with a separate priority lane.
+
+    Priority envelopes (stop/pause style control events) are always accepted
+    and always drained first. Normal envelopes are bounded by maxsize and
+    handled according to the overflow policy when the mailbox is full.
+
+    The worker draining the mailbox keeps the envelope it is handling in
+    `in_flight`, so close() can release its publisher too. A closed mailbox
+    refuses new envelopes.
+    """
+    def __init__(self, maxsize: int = 32, overflow: OverflowPolicy = OverflowPolicy.BLOCK):
+        if maxsize < 1:
+            raise ValueError("Mailbox maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.worker: Optional[asyncio.Task] = None
+        self.in_flight: Optional[Envelope] = None
+        self.closed = False
+        self._normal: deque = deque()
+        self._priority: deque = deque()
+        self._has_items = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+
+    def __len__(self) -> int:
+        return len(self._normal) + len(self._priority)
+
+    @staticmethod
+    def _settle(envelope: Envelope) -> None:
+        """Release anyone awaiting a dropped envelope."""
+        if envelope.ack is not None and not envelope.ack.done():
+            envelope.ack.set_result(None)
+
+    @staticmethod
+    def _abandon(envelope: Envelope) -> None:
+        """Release anyone awaiting an envelope that will never be handled."""
+        if envelope.ack is not None and not envelope.ack.done():
+            envelope.ack.cancel()
+
+    async def put(self, envelope: Envelope, priority: bool = False) -> bool:
+        """Queue an envelope. Returns False if it was dropped or the mailbox is closed."""
+        if self.closed:
+            self._abandon(envelope)
+            return False
+        if priority:
+            self._priority.append(envelope)
+            self._has_items.set()
+            return True
+
+        while len(self._normal) >= self.maxsize:
+            if self.overflow is OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                self._settle(envelope)
+                return False
+            if self.overflow is OverflowPolicy.DROP_OLDEST:
+                self.dropped += 1
+                self._settle(self._normal.popleft())
+                break
+            self._has_space.clear()
+            await self._has_space.wait()
+            if self.closed:
+                self._abandon(envelope)
+                return False
+
+        self._normal.append(envelope)
+        self._has_items.set()
+        return True
+
+    async def get(self) -> Envelope:
+        """Wait for the next envelope, priority lane first."""
+        while not (self._priority or self._normal):
+            self._has_items.clear()
+            await self._has_items.wait()
+        if self._priority:
+            return self._priority.popleft()
+        envelope = self._normal.popleft()
+        self._has_space.set()
+        return envelope
+
+    def close(self) -> None:
+        """Stop the worker and release every pending envelope, including the one being handled."""
+        self.closed = True
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        if self.in_flight is not None:
+            self._abandon(self.in_flight)
+            self.in_flight = None
+        for lane in (self._priority, self._normal):
+            while lane:
+                self._abandon(lane.popleft())
+        self._has_space.set()
@@ -0,0 +1,82 @@
+# core/metrics.py
+from array import array
+from typing import Dict, Optional
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with HDR-style log-linear buckets.
+
+    Values are recorded in seconds and stored as microseconds. Each power of
+    two is split into 32 linear sub-buckets, which keeps the relative error
+    of any reported percentile around 3% from 1 us up to max_seconds.
+    Recording is O(1) and memory never grows after construction.
+    """
+    SUB_BUCKET_BITS = 5
+    SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+    def __init__(self, max_seconds: float = 120.0):
+        self._max_value = max(int(max_seconds * 1_000_000), 2 * self.SUB_BUCKET_COUNT)
+        self._counts = array('Q', bytes(8 * (self._index(self._max_value) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min: Optional[float] = None
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        shift = max(0, value.bit_length() - cls.SUB_BUCKET_BITS - 1)
+        return cls.SUB_BUCKET_COUNT * shift + (value >> shift)
+
+    @classmethod
+    def _bucket_midpoint(cls, index: int) -> float:
+        """Representative value (in microseconds) for a bucket index."""
+        if index < 2 * cls.SUB_BUCKET_COUNT:
+            return float(index)
+        shift = index // cls.SUB_BUCKET_COUNT - 1
+        lower = (index - cls.SUB_BUCKET_COUNT * shift) << shift
+        return lower + ((1 << shift) - 1) / 2
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample in seconds."""
+        if seconds < 0:
+            seconds = 0.0
+        value = min(int(seconds * 1_000_000), self._max_value)
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+
+    def percentile(self, quantile: float) -> float:
+        """Return the value at the given quantile (0-1) in seconds."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(quantile * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= target:
+                # Never report beyond what was actually observed
+                return min(self._bucket_midpoint(index) / 1_000_000, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        for index in range(len(self._counts)):
+            self._counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = None
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean/p50/p95/p99/max in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
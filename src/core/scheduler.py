@@ -0,0 +1,175 @@
+# core/scheduler.py
+import time
+import asyncio
+import contextvars
+import concurrent.futures
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Union
+from src.core.metrics import LatencyHistogram
+
+@dataclass
+class _Job:
+    call: Callable[[], Union[Awaitable[Any], concurrent.futures.Future]]
+    future: asyncio.Future
+    context: contextvars.Context
+    queued_at: float = field(default_factory=time.perf_counter)
+
+class FairScheduler:
+    """
+    Round-robin admission to a shared resource such as a loaded model.
+
+    Every caller names the session it works for. Jobs queue per session and
+    free slots are handed out one session at a time, so a session that
+    submits twenty sentences of TTS cannot push another session's single
+    transcription to the back of a twenty-deep FIFO. Within a session jobs
+    run in submission order.
+
+    Work that runs on a thread should be submitted as the executor's
+    concurrent.futures.Future rather than wrapped in asyncio.to_thread():
+    a thread cannot be interrupted, so if its caller gives up the job keeps
+    its slot until the thread returns, and the jobs really running never
+    exceed `concurrency`.
+
+    Example:
+        whisper = FairScheduler("stt", concurrency=1)
+        text = await whisper.submit(session_id, lambda: pool.submit(model.transcribe, audio))
+    """
+    def __init__(self, name: str, concurrency: int = 1):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.name = name
+        self.concurrency = concurrency
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+        self._ready: Deque[Hashable] = deque()  # Sessions with queued jobs, in turn order
+        self._running = 0
+        self._completed: Dict[Hashable, int] = {}
+        self.wait_time = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def active(self) -> int:
+        return self._running
+
+    async def submit(self, session: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call() once it is this session's turn and a slot is free.
+
+        The job runs in a copy of the caller's context, so trace spans carry
+        over. Cancelling the caller drops a queued job or cancels a running one;
+        a job already running on a thread is left to finish.
+
+        Args:
+            session: Key of the session the work is for
+            call: Zero-argument callable returning an awaitable or a concurrent.futures.Future
+
+        Returns:
+            Whatever the awaitable returns
+        """
+        loop = asyncio.get_running_loop()
+        job = _Job(call, loop.create_future(), contextvars.copy_context())
+        queue = self._queues.get(session)
+        if queue is None:
+            queue = self._queues[session] = deque()
+            self._ready.append(session)
+        queue.append(job)
+        self._dispatch()
+        # The job only ever settles the future; the caller owns cancellation
+        return await job.future
+
+    def _dispatch(self) -> None:
+        while self._running < self.concurrency and self._ready:
+            session = self._ready.popleft()
+            queue = self._queues[session]
+            job = queue.popleft()
+            if queue:
+                self._ready.append(session)  # Back of the line until everyone else had a turn
+            else:
+                del self._queues[session]
+            if job.future.done():
+                continue  # Cancelled while queued
+            self._running += 1
+            self.wait_time.record(time.perf_counter() - job.queued_at)
+            task = asyncio.get_running_loop().create_task(self._run(session, job), context=job.context)
+            job.future.add_done_callback(lambda future, task=task: task.cancel() if future.cancelled() else None)
+
+    async def _run(self, session: Hashable, job: _Job) -> None:
+        started = time.perf_counter()
+        try:
+            work = job.call()
+            if isinstance(work, concurrent.futures.Future):
+                result = await self._wait_thread(work)
+            else:
+                result = await work
+            if not job.future.done():
+                job.future.set_result(result)
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.cancel()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self.run_time.record(time.perf_counter() - started)
+            self._completed[session] = self._completed.get(session, 0) + 1
+            self._running -= 1
+            self._dispatch()
+
+    @staticmethod
+    async def _wait_thread(work: concurrent.futures.Future) -> Any:
+        """Wait for thread work, holding on through cancellation until the thread is done."""
+        waiter = asyncio.wrap_future(work)
+        cancelled = False
+        while True:
+            try:
+                result = await asyncio.shield(waiter)
+                break
+            except asyncio.CancelledError:
+                if waiter.done():
+                    raise  # The job never started, or the thread is finished
+                cancelled = True
+                work.cancel()  # Only succeeds if the job has not started yet
+        if cancelled:
+            raise asyncio.CancelledError()
+        return result
+
+    def forget(self, session: Hashable) -> None:
+        """Cancel a closed session's queued jobs and drop its counters."""
+        for job in self._queues.pop(session, ()):
+            job.future.cancel()
+        if session in self._ready:
+            self._ready.remove(session)
+        self._completed.pop(session, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'concurrency': self.concurrency,
+            'active': self._running,
+            'queue_depth': self.queue_depth,
+            'queued': {str(session): len(queue) for session, queue in self._queues.items()},
+            'completed': {str(session): count for session, count in self._completed.items()},
+            'wait': self.wait_time.summary(),
+            'run': self.run_time.summary(),
+        }
+
+if __name__ == "__main__":
+    async def main():
+        scheduler = FairScheduler("demo", concurrency=1)
+        order = []
+
+        async def job(session: str, index: int):
+            await asyncio.sleep(0.01)
+            order.append(f"{session}{index}")
+
+        # "a" floods the queue first, "b" and "c" still get every other slot
+        calls = [scheduler.submit("a", lambda i=i: job("a", i)) for i in range(6)]
+        calls += [scheduler.submit(s, lambda s=s, i=i: job(s, i)) for s in "bc" for i in range(2)]
+        await asyncio.gather(*calls)
+        print(" ".join(order))
+        print(scheduler.get_stats())
+
+    asyncio.run(main())
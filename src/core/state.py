@@ -1,8 +1,13 @@
 from enum import Enum
+import sys
+import time
 import asyncio
-from typing import Protocol, List
+from collections import Counter, deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Protocol, Tuple, Union
+from src.core.metrics import LatencyHistogram
 from src.utils.logger import setup_logging
 from src.utils.helpers import GenericUtils
+from src.utils.config import EVENT_TRACING
 
 
 class AssistantState(Enum):
@@ -18,21 +23,44 @@ class StateObserver(Protocol):
         """Called when the state changes"""
         ...
 
+Transition = Tuple[AssistantState, AssistantState]
+StateCondition = Union[AssistantState, Callable[[AssistantState], bool]]
+
 class StateManager:
     # Define valid state transitions as a class variable since it's constant
     _valid_transitions = {
         AssistantState.IDLE: [AssistantState.LISTENING, AssistantState.PAUSED],
         AssistantState.LISTENING: [AssistantState.PROCESSING, AssistantState.IDLE, AssistantState.PAUSED],
-        AssistantState.PROCESSING: [AssistantState.SPEAKING, AssistantState.IDLE, AssistantState.PAUSED],
+        # PROCESSING -> LISTENING is a new "Hey Arlo" barging in on a turn
+        AssistantState.PROCESSING: [AssistantState.SPEAKING, AssistantState.IDLE, AssistantState.PAUSED, AssistantState.LISTENING],
         AssistantState.SPEAKING: [AssistantState.IDLE, AssistantState.LISTENING, AssistantState.PAUSED],
         AssistantState.PAUSED: [AssistantState.IDLE, AssistantState.LISTENING, AssistantState.PROCESSING, AssistantState.SPEAKING]
     }
 
-    def __init__(self):
+    def __init__(self, history_size: int = 100):
         self.current_state = AssistantState.IDLE
         self._lock = asyncio.Lock()
         self.logger = setup_logging()
         self._observers: List[StateObserver] = []
+        self._waiters: List[Tuple[Callable[[AssistantState], bool], asyncio.Future]] = []
+        self._transition_queues: List[asyncio.Queue] = []
+        self._tracing = EVENT_TRACING
+        # Telemetry: time spent in each state, rejected transitions by caller, recent history
+        self._entered_at = time.monotonic()
+        self._dwell: Dict[AssistantState, LatencyHistogram] = {
+            state: LatencyHistogram(max_seconds=3600) for state in AssistantState
+        }
+        self._rejected: Dict[str, Counter] = {'same_state': Counter(), 'invalid': Counter()}
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+
+    @property
+    def tracing(self) -> bool:
+        """Whether state changes record the calling site."""
+        return self._tracing
+
+    def set_tracing(self, enabled: bool) -> None:
+        """Switch call-site capture for state changes on or off at runtime."""
+        self._tracing = bool(enabled)
     
     def add_observer(self, observer: StateObserver) -> None:
         """Add an observer to be notified of state changes"""
@@ -46,13 +74,151 @@ class StateManager:
             self._observers.remove(observer)
             self.logger.debug(f"Removed state observer: {observer.__class__.__name__}")
 
+    async def _notify_one(self, observer: StateObserver, old_state: AssistantState, new_state: AssistantState) -> None:
+        try:
+            await observer.on_state_change(old_state, new_state)
+        except Exception as e:
+            self.logger.error(f"Error notifying observer {observer.__class__.__name__}: {e}")
+
     async def _notify_observers(self, old_state: AssistantState, new_state: AssistantState) -> None:
-        """Notify all observers of a state change"""
-        for observer in self._observers:
-            try:
-                await observer.on_state_change(old_state, new_state)
-            except Exception as e:
-                self.logger.error(f"Error notifying observer {observer.__class__.__name__}: {e}")
+        """Notify all observers of a state change concurrently"""
+        observers = list(self._observers)
+        if len(observers) == 1:
+            await self._notify_one(observers[0], old_state, new_state)
+        elif observers:
+            await asyncio.gather(*(self._notify_one(observer, old_state, new_state) for observer in observers))
+
+    def _wake_waiters(self, old_state: AssistantState, new_state: AssistantState) -> None:
+        """Resolve wait_for() callers and feed transitions() iterators. Called under the lock."""
+        if self._waiters:
+            remaining = []
+            for condition, future in self._waiters:
+                if future.done():
+                    continue
+                if condition(new_state):
+                    future.set_result(new_state)
+                else:
+                    remaining.append((condition, future))
+            self._waiters = remaining
+        for queue in self._transition_queues:
+            queue.put_nowait((old_state, new_state))
+
+    @staticmethod
+    def _as_condition(condition: StateCondition) -> Callable[[AssistantState], bool]:
+        if isinstance(condition, AssistantState):
+            return lambda state: state == condition
+        return condition
+
+    async def wait_for(self, condition: StateCondition, timeout: Optional[float] = None) -> Optional[AssistantState]:
+        """
+        Wait until the state matches a target state or predicate.
+
+        Returns immediately if the current state already matches.
+
+        Args:
+            condition: An AssistantState or a callable taking the state and returning bool
+            timeout (float): Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            The matching state, or None if the timeout expired first
+        """
+        check = self._as_condition(condition)
+        if check(self.current_state):
+            return self.current_state
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((check, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if not future.done():
+                future.cancel()
+
+    async def transitions(self) -> AsyncIterator[Transition]:
+        """
+        Iterate over (old_state, new_state) for every transition from now on.
+
+        Example:
+            async for old_state, new_state in state_manager.transitions():
+                ...
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._transition_queues.append(queue)
+        try:
+            while True:
+                transition = await queue.get()
+                if transition is None:
+                    return
+                yield transition
+        finally:
+            self._transition_queues.remove(queue)
+
+    async def shutdown(self) -> None:
+        """Release everyone waiting on a transition."""
+        for _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+        for queue in self._transition_queues:
+            queue.put_nowait(None)
+
+    @staticmethod
+    def _caller_source() -> str:
+        """
+        file:line of whoever awaited set_state().
+
+        Reads the frame chain directly, which is cheap enough to run on every
+        call, unlike GenericUtils.caller_info() which builds the whole stack.
+        """
+        try:
+            frame = sys._getframe(2)
+        except ValueError:  # Called from a shallower stack than set_state()
+            return "Unknown caller"
+        return f"{GenericUtils.shorten_path(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+    def _record_transition(self, old_state: AssistantState, new_state: AssistantState, source: str) -> None:
+        now = time.monotonic()
+        dwell = now - self._entered_at
+        self._entered_at = now
+        self._dwell[old_state].record(dwell)
+        self._history.append({
+            'timestamp': time.time(),
+            'from': old_state.value,
+            'to': new_state.value,
+            'dwell_ms': dwell * 1000,
+            'source': source,
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return time-in-state telemetry.
+
+        Returns:
+            dict: The current state and how long it has been held, a dwell-time
+            summary per state (count, mean/p50/p95/p99/max in ms and total seconds),
+            rejected transition counts per caller and the most recent transitions
+        """
+        dwell = {}
+        for state, histogram in self._dwell.items():
+            dwell[state.value] = {**histogram.summary(), 'total_s': histogram.total}
+        return {
+            'state': self.current_state.value,
+            'time_in_state_ms': (time.monotonic() - self._entered_at) * 1000,
+            'dwell': dwell,
+            'rejected': {reason: dict(counts.most_common()) for reason, counts in self._rejected.items()},
+            'recent': list(self._history),
+        }
+
+    def reset_stats(self) -> None:
+        """Clear the telemetry without touching the current state."""
+        for histogram in self._dwell.values():
+            histogram.reset()
+        for counts in self._rejected.values():
+            counts.clear()
+        self._history.clear()
+        self._entered_at = time.monotonic()
 
     async def get_state(self) -> AssistantState:
         """Return the current state"""
@@ -62,22 +228,30 @@ class StateManager:
         """
         Change the current state if the transition is valid
         Returns True if state was changed, False otherwise
+
+        Observers are notified concurrently after the lock is released, so a
+        slow observer never delays the next transition.
         """
-        caller_info = GenericUtils.caller_info(skip_one_more=True)
+        source = self._caller_source()
+        caller_info = GenericUtils.caller_info(skip_one_more=True) if self._tracing else source
         async with self._lock:
             
             if self.current_state == new_state:
+                self._rejected['same_state'][source] += 1
                 self.logger.warning(f"Attempted same state transition to {new_state} from {caller_info}")
                 return False
                 
             if new_state not in self._valid_transitions[self.current_state]:
+                self._rejected['invalid'][source] += 1
                 self.logger.warning(f"Invalid state transition from {self.current_state} to {new_state} requested by {caller_info}")
                 return False
             
             old_state = self.current_state    
             self.current_state = new_state
+            self._record_transition(old_state, new_state, source)
             self.logger.state(f"State changed to {self.current_state} by {caller_info}")
-            
-            # Notify observers of the state change
-            await self._notify_observers(old_state, new_state)
-            return True
\ No newline at end of file
+            self._wake_waiters(old_state, new_state)
+
+        # Notify observers of the state change
+        await self._notify_observers(old_state, new_state)
+        return True
\ No newline at end of file
@@ -0,0 +1,310 @@
+# core/tracing.py
+import os
+import json
+import time
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Deque, Dict, Iterator, List, Optional, TypeVar
+from src.core.metrics import LatencyHistogram
+from src.utils.logger import setup_logging
+
+# The span that new child spans attach to. asyncio tasks copy it when they are
+# created; the EventBus carries it through mailboxes and executor threads.
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+def use_span(span: Optional["Span"]) -> contextvars.Token:
+    """Make span current in this context. Pass the token to reset_span() to undo."""
+    return _current_span.set(span)
+
+def reset_span(token: contextvars.Token) -> None:
+    _current_span.reset(token)
+
+T = TypeVar("T")
+
+class Span:
+    """One timed stage of a trace. Times are time.perf_counter() values."""
+    __slots__ = ('name', 'trace', 'span_id', 'parent_id', 'start', 'end', 'attributes')
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[int], start: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = trace.next_span_id()
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        root_start = self.trace.root.start
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'offset_ms': (self.start - root_start) * 1000,
+            'duration_ms': None if self.end is None else (self.end - self.start) * 1000,
+            'attributes': self.attributes,
+        }
+
+class _NullSpan:
+    """Stand-in yielded by Tracer.span() outside a trace, so callers never check for None."""
+    __slots__ = ()
+    name = None
+    trace_id = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Trace:
+    def __init__(self, trace_id: str, name: str, start: float, attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.wall_start = time.time() - (time.perf_counter() - start)
+        self.spans: List[Span] = []
+        self.open_spans = 0
+        self.finished = False
+        self._span_seq = 0
+        self.root = Span(name, self, None, start, attributes)
+        self.spans.append(self.root)
+        self.open_spans += 1
+
+    def next_span_id(self) -> int:
+        self._span_seq += 1
+        return self._span_seq
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.root.name,
+            'start': self.wall_start,
+            'duration_ms': None if self.root.end is None else (self.root.end - self.root.start) * 1000,
+            'attributes': self.root.attributes,
+            'spans': [span.to_dict() for span in self.spans[1:]],
+        }
+
+class Tracer:
+    """
+    Lightweight per-turn tracing.
+
+    start_trace() opens a root span and makes it current; span() and
+    record_span() add child stages under whatever span is current. A trace
+    completes once its root is finished and every span in it has ended. Then
+    it goes into a ring buffer of the last `capacity` traces, its stage
+    durations feed per-stage histograms, and one JSON line is appended to
+    export_path (if set).
+
+    Outside a trace every call is a cheap no-op.
+    """
+    def __init__(self, capacity: int = 1000, export_path: Optional[str | Path] = None, max_open: int = 32):
+        self.logger = setup_logging(module_name="Tracer")
+        self.export_path = Path(export_path) if export_path else None
+        self.max_open = max_open
+        self._traces: Deque[Trace] = deque(maxlen=capacity)
+        self._open: Dict[str, Trace] = {}
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._export_file = None
+        self._pid = os.getpid()
+        self._seq = 0
+        self.dropped = 0
+
+    def _new_trace_id(self) -> str:
+        self._seq += 1
+        return f"{self._pid:x}-{int(time.time() * 1000):x}-{self._seq:x}"
+
+    def start_trace(self, name: str, start: Optional[float] = None, **attributes) -> Span:
+        """
+        Open a new trace and make its root span current in this context.
+
+        Args:
+            name: Root span name, e.g. "turn"
+            start: perf_counter() the trace began at, if earlier than now
+        """
+        if len(self._open) >= self.max_open:
+            # A trace whose owner never finished it; don't let them pile up
+            stale_id = next(iter(self._open))
+            del self._open[stale_id]
+            self.dropped += 1
+            self.logger.warning(f"Dropping unfinished trace {stale_id}")
+
+        trace = Trace(self._new_trace_id(), name, time.perf_counter() if start is None else start, attributes)
+        self._open[trace.trace_id] = trace
+        _current_span.set(trace.root)
+        return trace.root
+
+    def _child(self, name: str, start: float, attributes: Dict[str, Any]) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None or parent.trace.finished:
+            return None
+        span = Span(name, parent.trace, parent.span_id, start, attributes)
+        parent.trace.spans.append(span)
+        parent.trace.open_spans += 1
+        return span
+
+    def start_span(self, name: str, **attributes) -> Optional[Span]:
+        """
+        Open a child of the current span without making it current.
+        Use for stages that end somewhere else; pass the span to end_span().
+        """
+        return self._child(name, time.perf_counter(), attributes)
+
+    def end_span(self, span: Optional[Span], **attributes) -> None:
+        if span is None or span.end is not None:
+            return
+        span.attributes.update(attributes)
+        self._close(span, time.perf_counter())
+
+    def _close(self, span: Span, end: float) -> None:
+        span.end = end
+        trace = span.trace
+        trace.open_spans -= 1
+        self._maybe_complete(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a block as a child of the current span; it is current inside the block."""
+        span = self._child(name, time.perf_counter(), attributes)
+        if span is None:
+            yield NULL_SPAN
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes['error'] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    async def wrap(self, name: str, awaitable: Awaitable[T], **attributes) -> T:
+        """Await something inside a span; handy for tasks started with asyncio.create_task()."""
+        with self.span(name, **attributes):
+            return await awaitable
+
+    def record_span(self, name: str, start: float, end: Optional[float] = None, **attributes) -> None:
+        """Add an already finished stage (perf_counter() times) under the current span."""
+        span = self._child(name, start, attributes)
+        if span is not None:
+            self._close(span, time.perf_counter() if end is None else end)
+
+    @contextmanager
+    def activate(self, span: Optional[Span]) -> Iterator[None]:
+        """Make span current for a block, e.g. to continue a trace in another task."""
+        token = _current_span.set(span)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+    def root_span(self) -> Optional[Span]:
+        """Root span of the current trace, if any."""
+        span = _current_span.get()
+        return None if span is None else span.trace.root
+
+    def detach(self) -> None:
+        """Leave the current trace in this context, e.g. when a loop moves to the next turn."""
+        _current_span.set(None)
+
+    def finish(self, span: Optional[Span] = None, **attributes) -> None:
+        """
+        Finish a trace's root span (the current trace if span is None).
+        The trace completes once any stages still running have ended too.
+        """
+        span = span if span is not None else _current_span.get()
+        if span is None:
+            return
+        self.end_span(span.trace.root, **attributes)
+
+    def _maybe_complete(self, trace: Trace) -> None:
+        if trace.finished or trace.root.end is None or trace.open_spans > 0:
+            return
+        trace.finished = True
+        if self._open.pop(trace.trace_id, None) is None:
+            return  # Dropped as stale
+        self._traces.append(trace)
+        for span in trace.spans:
+            histogram = self._stages.get(span.name)
+            if histogram is None:
+                histogram = self._stages[span.name] = LatencyHistogram(max_seconds=600)
+            histogram.record(span.end - span.start)
+        if self.export_path is not None:
+            self._export_line(trace)
+
+    def _export_line(self, trace: Trace) -> None:
+        try:
+            if self._export_file is None:
+                self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                self._export_file = open(self.export_path, "a", buffering=1)
+            self._export_file.write(json.dumps(trace.to_dict(), default=str) + "\n")
+        except OSError as e:
+            self.logger.error(f"Could not export trace to {self.export_path}: {e}")
+            self.export_path = None
+
+    def get_traces(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Completed traces, oldest first."""
+        traces = list(self._traces)
+        if limit is not None:
+            traces = traces[-limit:]
+        return [trace.to_dict() for trace in traces]
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency summary per stage name across every completed trace."""
+        return {name: histogram.summary() for name, histogram in self._stages.items()}
+
+    def export(self, path: str | Path) -> int:
+        """Write the ring buffer to a JSONL file. Returns the number of traces written."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        traces = list(self._traces)
+        with open(path, "w") as f:
+            for trace in traces:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+        return len(traces)
+
+    def close(self) -> None:
+        if self._export_file is not None:
+            self._export_file.close()
+            self._export_file = None
+
+def stage_percentiles(path: str | Path) -> Dict[str, Dict[str, float]]:
+    """Per-stage latency summaries from an exported JSONL file."""
+    stages: Dict[str, LatencyHistogram] = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            trace = json.loads(line)
+            durations = [(trace['name'], trace['duration_ms'])]
+            durations += [(span['name'], span['duration_ms']) for span in trace['spans']]
+            for name, duration_ms in durations:
+                if duration_ms is None:
+                    continue
+                stages.setdefault(name, LatencyHistogram(max_seconds=600)).record(duration_ms / 1000)
+    return {name: histogram.summary() for name, histogram in stages.items()}
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.core.tracing <traces.jsonl>")
+        sys.exit(1)
+
+    print(f"{'stage':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, summary in stage_percentiles(sys.argv[1]).items():
+        print(f"{name:<24}{summary['count']:>8}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}{summary['max_ms']:>10.1f}")
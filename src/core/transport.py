@@ -0,0 +1,312 @@
+# core/transport.py
+import io
+import os
+import sys
+import struct
+import pickle
+import asyncio
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from src.core.event_bus import EventBus
+from src.core.mailbox import PublishMode
+from src.core.error import EventBusError
+from src.utils.logger import setup_logging
+from src.utils.config import EVENT_BRIDGE_SOCKET
+
+# Frame header: kind (u8), topic length (u16), payload length (u32), network byte order
+FRAME_HEADER = struct.Struct("!BHI")
+FRAME_EVENT = 1
+MAX_PAYLOAD_SIZE = 64 * 1024 * 1024
+# The only globals a frame may load: plain containers and scalars pickle without any,
+# numpy arrays, dtypes and scalars need these (numpy 2 moved numpy.core to numpy._core)
+SAFE_GLOBALS = frozenset({
+    ("builtins", "bytearray"), ("builtins", "complex"), ("builtins", "frozenset"),
+    ("builtins", "range"), ("builtins", "set"), ("builtins", "slice"),
+    ("numpy", "dtype"), ("numpy", "ndarray"),
+    ("numpy.core.multiarray", "_reconstruct"), ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy.core.multiarray", "scalar"), ("numpy._core.multiarray", "scalar"),
+    ("numpy.core.numeric", "_frombuffer"), ("numpy._core.numeric", "_frombuffer"),
+})
+# Received events still waiting for their echo to be skipped; older ones are forgotten
+MAX_PENDING_ECHOES = 256
+
+class _FramePickler(pickle.Pickler):
+    """Pickler that moves large numpy arrays into shared memory instead of the byte stream."""
+    def __init__(self, file, shm_threshold: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shm_threshold = shm_threshold
+        # Names of the segments created for this frame; the sender owns them until the receiver has them
+        self.segments: List[str] = []
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple]:
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes < self._shm_threshold:
+            return None
+        shm = SharedMemory(create=True, size=obj.nbytes)
+        view = np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)
+        view[...] = obj
+        del view
+        name = shm.name
+        shm.close()
+        self.segments.append(name)
+        return ("shm", name, obj.shape, obj.dtype.str)
+
+class _FrameUnpickler(pickle.Unpickler):
+    """Unpickler limited to SAFE_GLOBALS, so a frame can't run code in the receiving process."""
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in SAFE_GLOBALS:
+            raise pickle.UnpicklingError(f"Event payloads may not contain '{module}.{name}'")
+        return super().find_class(module, name)
+
+    def persistent_load(self, pid: Tuple) -> np.ndarray:
+        kind, name, shape, dtype = pid
+        if kind != "shm":
+            raise pickle.UnpicklingError(f"Unknown persistent id '{kind}'")
+        shm = SharedMemory(name=name)
+        try:
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+            array = view.copy()
+            del view
+        finally:
+            shm.close()
+            shm.unlink()
+        return array
+
+def _segment_exists(name: str) -> bool:
+    try:
+        shm = SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    # Attaching registers the segment with this process's tracker; only a check, so undo it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return True
+
+def unlink_segments(names: Iterable[str]) -> None:
+    """Destroy shared memory segments of frames that will never be read. Missing ones are skipped."""
+    for name in names:
+        try:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            # The receiver got there first
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+def encode_event(topic_name: str, args: Tuple, kwargs: Dict, shm_threshold: int = 64 * 1024) -> Tuple[bytes, List[str]]:
+    """
+    Encode one event as a binary frame.
+
+    Returns the frame and the names of the shared memory segments it refers
+    to. They stay registered with this process's resource tracker; once the
+    frame is handed to the receiver, unregister them (the receiver unlinks
+    them after reading), otherwise pass them to unlink_segments().
+
+    Raises:
+        EventBusError: If the payload is too large; its segments are unlinked first
+    """
+    topic = topic_name.encode("utf-8")
+    buffer = io.BytesIO()
+    pickler = _FramePickler(buffer, shm_threshold)
+    try:
+        pickler.dump((args, kwargs))
+        payload = buffer.getvalue()
+        if len(payload) > MAX_PAYLOAD_SIZE:
+            raise EventBusError(f"Event payload for '{topic_name}' is too large ({len(payload)} bytes)")
+    except BaseException:
+        unlink_segments(pickler.segments)
+        raise
+    return FRAME_HEADER.pack(FRAME_EVENT, len(topic), len(payload)) + topic + payload, pickler.segments
+
+async def read_event(reader: asyncio.StreamReader) -> Tuple[str, Tuple, Dict]:
+    """Read and decode one frame. Raises asyncio.IncompleteReadError when the peer closes."""
+    kind, topic_length, payload_length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if kind != FRAME_EVENT or payload_length > MAX_PAYLOAD_SIZE:
+        raise EventBusError(f"Malformed frame (kind={kind}, payload={payload_length} bytes)")
+    topic_name = (await reader.readexactly(topic_length)).decode("utf-8")
+    args, kwargs = _FrameUnpickler(io.BytesIO(await reader.readexactly(payload_length))).load()
+    return topic_name, args, kwargs
+
+class EventBridge:
+    """
+    Bridges EventBus topics between processes over a Unix domain socket.
+
+    Each side exports the topic patterns it wants to send; everything a side
+    receives is re-published on its local bus. One process calls serve() and
+    the others connect() to the same socket path. Numpy arrays above
+    shm_threshold bytes travel through shared memory, not the socket.
+
+    The socket is only accessible to the serving user, and payloads may hold
+    builtin values and numpy arrays only (see SAFE_GLOBALS).
+    """
+    def __init__(
+        self,
+        event_bus: EventBus,
+        socket_path: str | Path = EVENT_BRIDGE_SOCKET,
+        export_topics: Iterable[str] = (),
+        shm_threshold: int = 64 * 1024
+    ):
+        if sys.platform == "win32":
+            raise EventBusError("EventBridge needs Unix domain sockets, which are not available on Windows")
+        self.event_bus = event_bus
+        self.socket_path = Path(socket_path)
+        self.shm_threshold = shm_threshold
+        self.logger = setup_logging(module_name="Event_Bridge")
+        self._exported: List[str] = []
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._reader_tasks: Set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Events received from peers whose re-publish must not be forwarded back
+        self._echoes: Deque[Tuple[str, Tuple, Dict]] = deque(maxlen=MAX_PENDING_ECHOES)
+        # Shared memory segments sent to each peer that it may not have read yet, oldest first
+        self._in_flight: Dict[asyncio.StreamWriter, Deque[str]] = {}
+        self._stats = {'sent': 0, 'received': 0, 'shm_arrays': 0, 'bytes_sent': 0, 'errors': 0}
+        # Keep one bound method so unsubscribe finds the same callback id
+        self._forward_handler = self._forward
+        for pattern in export_topics:
+            self.export(pattern)
+
+    def export(self, pattern: str) -> None:
+        """Forward local events matching a topic pattern to every connected peer."""
+        if pattern in self._exported:
+            return
+        self._exported.append(pattern)
+        self.event_bus.subscribe(pattern, self._forward_handler, async_handler=True, with_topic=True)
+
+    async def serve(self) -> None:
+        """Listen on the socket path for peer processes."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self._server = await asyncio.start_unix_server(self._on_peer, path=str(self.socket_path))
+        # Only processes of the same user may connect
+        os.chmod(self.socket_path, 0o600)
+        self.logger.info(f"Event bridge listening on {self.socket_path}")
+
+    async def connect(self, retries: int = 50, delay: float = 0.1) -> None:
+        """Connect to a serving process, retrying while it starts up."""
+        for attempt in range(retries):
+            try:
+                reader, writer = await asyncio.open_unix_connection(path=str(self.socket_path))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if attempt == retries - 1:
+                    raise EventBusError(f"Could not connect to event bridge at {self.socket_path}")
+                await asyncio.sleep(delay)
+        self.logger.info(f"Event bridge connected to {self.socket_path}")
+        await self._on_peer(reader, writer, wait=False)
+
+    async def _on_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, wait: bool = True) -> None:
+        self._peers.add(writer)
+        self._in_flight[writer] = deque()
+        task = asyncio.create_task(self._read_loop(reader, writer))
+        self._reader_tasks.add(task)
+        task.add_done_callback(self._reader_tasks.discard)
+        if wait:
+            await task
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                topic_name, args, kwargs = await read_event(reader)
+                self._stats['received'] += 1
+                if any(EventBus.topic_matches(pattern, topic_name) for pattern in self._exported):
+                    self._echoes.append((topic_name, args, kwargs))
+                await self.event_bus.publish(topic_name, *args, mode=PublishMode.FIRE_AND_FORGET, **kwargs)
+        except asyncio.IncompleteReadError:
+            self.logger.info("Event bridge peer disconnected")
+        except Exception as e:
+            self._stats['errors'] += 1
+            self.logger.error(f"Event bridge read error: {e}")
+        finally:
+            self._drop_peer(writer)
+
+    def _drop_peer(self, writer: asyncio.StreamWriter) -> None:
+        """Forget a peer and destroy the shared memory of frames it will never read."""
+        self._peers.discard(writer)
+        writer.close()
+        unlink_segments(self._in_flight.pop(writer, ()))
+
+    def _handed_off(self, writer: asyncio.StreamWriter, segments: List[str]) -> None:
+        """Record segments written to a peer and stop tracking the ones it has read and unlinked."""
+        in_flight = self._in_flight.get(writer)
+        if in_flight is None:
+            unlink_segments(segments)
+            return
+        for name in segments:
+            # The receiver unlinks the segment; this process's tracker must not destroy it on exit
+            resource_tracker.unregister(f"/{name}", "shared_memory")
+            in_flight.append(name)
+        # Peers read frames in order, so consumed segments are at the front
+        while in_flight and not _segment_exists(in_flight[0]):
+            in_flight.popleft()
+
+    def _is_echo(self, topic_name: str, args: Tuple, kwargs: Dict) -> bool:
+        """
+        Consume the mark of a received event if this is its re-publish.
+
+        Only that exact event is skipped, matched by topic and payload object
+        identity; anything its handlers publish in turn is forwarded as usual.
+        """
+        for echo in self._echoes:
+            echo_topic, echo_args, echo_kwargs = echo
+            if (
+                echo_topic == topic_name
+                and len(echo_args) == len(args)
+                and all(a is b for a, b in zip(echo_args, args))
+                and echo_kwargs.keys() == kwargs.keys()
+                and all(echo_kwargs[key] is kwargs[key] for key in kwargs)
+            ):
+                self._echoes.remove(echo)
+                return True
+        return False
+
+    async def _forward(self, topic_name: str, *args, **kwargs) -> None:
+        if self._is_echo(topic_name, args, kwargs) or not self._peers:
+            return
+        for writer in list(self._peers):
+            # Encode per peer: each receiver takes ownership of its own shared memory segments
+            frame, segments = encode_event(topic_name, args, kwargs, self.shm_threshold)
+            handed_off = False
+            try:
+                writer.write(frame)
+                # Queued on the transport: the peer reads it unless the connection goes away
+                self._handed_off(writer, segments)
+                handed_off = True
+                await writer.drain()
+            except (ConnectionError, RuntimeError) as e:
+                self._stats['errors'] += 1
+                self.logger.warning(f"Dropping event bridge peer: {e}")
+                self._drop_peer(writer)
+                continue
+            finally:
+                if not handed_off:
+                    unlink_segments(segments)
+            self._stats['sent'] += 1
+            self._stats['bytes_sent'] += len(frame)
+            self._stats['shm_arrays'] += len(segments)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, 'peers': len(self._peers)}
+
+    async def close(self) -> None:
+        for pattern in self._exported:
+            self.event_bus.unsubscribe(pattern, self._forward_handler)
+        self._exported.clear()
+        self._echoes.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+        for writer in list(self._peers):
+            self._drop_peer(writer)
+        for task in list(self._reader_tasks):
+            task.cancel()
@@ -1,13 +1,14 @@
 # model.py
 import os, json
-from typing import Optional
-from groq import Groq, InternalServerError, APIConnectionError
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from groq import AsyncGroq, InternalServerError, APIConnectionError
 from src.utils.config import HISTORY_PATH , MAIN_LLM_MODEL
 from src.utils.logger import setup_logging
 from src.utils.helpers import GenericUtils
 
 groq_api = os.getenv("GROQ_API")
-groq_client = Groq(api_key=groq_api)
+groq_client = AsyncGroq(api_key=groq_api)
 logger = setup_logging()
 
 sys_msg = (
@@ -33,32 +34,80 @@ Always aim for brief, engaging responses that showcase your personality. Be natu
 Important: Vary your response structure. Don't always end with a question. Mix statements, observations, and occasional questions to maintain a natural conversation flow.'''
     )
 
+class ConversationHistory:
+    """The last `max_messages` chat messages of one conversation, kept in a JSON file."""
+    def __init__(self, path: str | Path = HISTORY_PATH, max_messages: int = 20):
+        self.path = Path(path)
+        self.max_messages = max_messages
+
+    def load(self) -> list:
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        return []
+
+    def save(self, history: list) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(history[-self.max_messages:], f, indent=4)
+
+# The single-user history; sessions pass their own ConversationHistory
+DEFAULT_HISTORY = ConversationHistory()
+
 def load_history():
-    if os.path.exists(HISTORY_PATH):
-        with open(HISTORY_PATH, 'r') as f:
-            return json.load(f)
-    return []
+    return DEFAULT_HISTORY.load()
 
 def save_history(history):
-    with open(HISTORY_PATH, 'w') as f:
-        json.dump(history, f, indent=4)
+    DEFAULT_HISTORY.save(history)
+
+API_ERROR_RESPONSE = "I encountered an error while processing your request. Please try again or contact support if the problem persists."
+UNEXPECTED_ERROR_RESPONSE = "An unexpected error occurred. Please try again or contact support if the problem persists."
+UNAVAILABLE_RESPONSE = "I'm sorry, but I'm having persistent issues connecting to my language model. Please try again later or contact support."
+ERROR_RESPONSES = frozenset({API_ERROR_RESPONSE, UNEXPECTED_ERROR_RESPONSE, UNAVAILABLE_RESPONSE})
+
+def remember_exchange(prompt: str, response: str, history: Optional[ConversationHistory] = None) -> None:
+    """Append a user/assistant exchange to the saved history, keeping the last 20 messages."""
+    if response in ERROR_RESPONSES:
+        return
+    history = history or DEFAULT_HISTORY
+    convo = history.load()
+    convo.append({"role": "user", "content": prompt})
+    convo.append({"role": "assistant", "content": response})
+    history.save(convo)
 
-@GenericUtils.retry
-async def groq_prompt(prompt, img_context: Optional[str], function_execution: Optional[str]) -> str:
+def _build_convo(prompt: str, img_context: Optional[str], function_execution: Optional[str], history: ConversationHistory) -> list:
+    convo = history.load()
 
-    convo = load_history()  
-    
     if img_context is not None:
         prompt = f'USER PROMPT: {prompt}\nIMAGE CONTEXT: {img_context}'
-        
+
     if function_execution is not None:
         prompt = f'USER PROMPT: {prompt}\n FUNCTION_EXECUTION: {function_execution}'
 
     convo.append({"role": "user", "content": prompt})
+    return convo
+
+@GenericUtils.retry
+async def groq_prompt(
+    prompt,
+    img_context: Optional[str],
+    function_execution: Optional[str],
+    remember: bool = True,
+    history: Optional[ConversationHistory] = None
+) -> str:
+    """
+    Ask the main LLM for a reply.
+
+    With remember=False the exchange is not written to the history, so the call
+    can run speculatively and be cancelled or discarded. Call remember_exchange()
+    if the reply ends up being used. history defaults to the single-user history.
+    """
+    history = history or DEFAULT_HISTORY
+    convo = _build_convo(prompt, img_context, function_execution, history)
     convo2 = [{"role": "system", "content": sys_msg}] + convo
 
     try:
-            chat_completion = groq_client.chat.completions.create(
+            chat_completion = await groq_client.chat.completions.create(
                 model=MAIN_LLM_MODEL, 
                 messages=convo2, 
                 max_tokens=1500, 
@@ -68,11 +117,9 @@ async def groq_prompt(prompt, img_context: Optional[str], function_execution: Op
 
             response = chat_completion.choices[0].message.content
             response_text = response
-            convo.append({"role": "assistant", "content": response_text})
-
-            if len(convo) > 20:  
-                convo = convo[-20:]
-            save_history(convo)
+            if remember:
+                convo.append({"role": "assistant", "content": response_text})
+                history.save(convo)
             return response_text
 
     except InternalServerError as e:
@@ -80,10 +127,66 @@ async def groq_prompt(prompt, img_context: Optional[str], function_execution: Op
 
     except APIConnectionError as e:
             logger.error(f"API Exception: {str(e)}")
-            return "I encountered an error while processing your request. Please try again or contact support if the problem persists."
+            return API_ERROR_RESPONSE
 
     except Exception as e:
             logger.error(f"Unexpected error in groq_prompt: {str(e)}")
-            return "An unexpected error occurred. Please try again or contact support if the problem persists."
+            return UNEXPECTED_ERROR_RESPONSE
+
+    return UNAVAILABLE_RESPONSE
+
+async def groq_stream(
+    prompt,
+    img_context: Optional[str],
+    function_execution: Optional[str],
+    remember: bool = True,
+    history: Optional[ConversationHistory] = None
+) -> AsyncIterator[str]:
+    """
+    Like groq_prompt, but yield the reply in chunks as the model generates it.
+
+    The history is saved once the stream completes (unless remember=False). If
+    the request fails before anything was generated, the usual error reply is
+    yielded instead so the caller always has something to say.
+    """
+    history = history or DEFAULT_HISTORY
+    convo = _build_convo(prompt, img_context, function_execution, history)
+    convo2 = [{"role": "system", "content": sys_msg}] + convo
+    parts = []
 
-    return "I'm sorry, but I'm having persistent issues connecting to my language model. Please try again later or contact support."
+    try:
+        stream = await groq_client.chat.completions.create(
+            model=MAIN_LLM_MODEL,
+            messages=convo2,
+            max_tokens=1500,
+            temperature=1,
+            top_p=1,
+            stream=True,
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    except InternalServerError as e:
+        logger.error(f"Internal Server Error): {str(e)}")
+        if not parts:
+            yield UNAVAILABLE_RESPONSE
+        return
+
+    except APIConnectionError as e:
+        logger.error(f"API Exception: {str(e)}")
+        if not parts:
+            yield API_ERROR_RESPONSE
+        return
+
+    except Exception as e:
+        logger.error(f"Unexpected error in groq_stream: {str(e)}")
+        if not parts:
+            yield UNEXPECTED_ERROR_RESPONSE
+        return
+
+    if remember and parts:
+        convo.append({"role": "assistant", "content": "".join(parts)})
+        history.save(convo)
@@ -1,26 +1,30 @@
 from faster_whisper import WhisperModel
 import time 
-from typing import Union
+from typing import Hashable, Union
 from pathlib import Path
 import numpy as np
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import gc
+from src.core.scheduler import FairScheduler
 from src.utils.config import FASTER_WHISPER_MODELS_DIR
 from src.utils.logger import setup_logging
 
 class WhisperEngine:
-    def __init__(self, model_path: str | Path = FASTER_WHISPER_MODELS_DIR):
+    def __init__(self, model_path: str | Path = FASTER_WHISPER_MODELS_DIR, concurrency: int = 1):
         """
         Initialize WhisperEngine with a Whisper model.
         
         Args:
             model_path: Directory path where models will be stored
+            concurrency: Transcriptions allowed to run at once. One engine can
+                serve several sessions; they take turns through a FairScheduler.
         """
         self.model_path = Path(model_path)
         self.model = None
         self.logger = None
-        self._thread_pool = ThreadPoolExecutor(max_workers=1)
+        self._thread_pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.scheduler = FairScheduler("stt", concurrency=concurrency)
 
     
     async def initialize(self):
@@ -54,24 +58,44 @@ class WhisperEngine:
         Handles both int16 and float32 input formats.
         """
         if audio_data.dtype == np.int16:
-            return audio_data.astype(np.float32) / 32768.0
+            # Scale in place so the conversion allocates one float32 array, not two
+            audio = audio_data.astype(np.float32)
+            audio *= 1 / 32768.0
+            return audio
         elif audio_data.dtype == np.float32:
             return np.clip(audio_data, -1, 1)
         else:
             self.logger.error(f"Unsupported audio dtype: {audio_data.dtype}")
             raise ValueError(f"Unsupported audio dtype: {audio_data.dtype}")
 
+    def _transcribe(self, audio: np.ndarray | str) -> str:
+        """Run the model and decode every segment. Blocking; runs on the thread pool."""
+        segments, _ = self.model.transcribe(
+            audio,
+            beam_size=1,        # Reduce beam size for faster inference
+            best_of=1,          # Only return best result
+            language="en"       # Specify language for better accuracy
+        )
+        # Segments are generated lazily, so joining them is where decoding happens
+        return " ".join(segment.text for segment in segments).strip()
+
+    async def _schedule(self, audio: np.ndarray | str, session: Hashable) -> str:
+        # Submitted as the thread pool's future, so a cancelled turn keeps its slot until the model is free
+        return await self.scheduler.submit(
+            session, lambda: self._thread_pool.submit(self._transcribe, audio)
+        )
+
     async def transcribe_audio(
         self,
-        audio_data: np.ndarray
+        audio_data: np.ndarray,
+        session: Hashable = "default"
     ) -> str:
         """
         Transcribe audio data directly without saving to disk.
         
         Args:
             audio_data: Audio samples as numpy array (int16 or float32)
-            sample_rate: Sampling rate of the audio (default: 16000)
-            model_name: Model to use for transcription (default: "small")
+            session: Session the audio belongs to, for fair scheduling
             
         Returns:
             str: Transcribed text
@@ -81,44 +105,21 @@ class WhisperEngine:
             # Normalize audio to float32 in range [-1, 1]
             audio_normalized = self.normalize_audio(audio_data)
             
-            # Get the selected model
-            model = self.model
-            
             # Run transcription in thread pool to avoid blocking
-            segments, _ = await asyncio.get_event_loop().run_in_executor(
-                self._thread_pool,
-                lambda: model.transcribe(
-                    audio_normalized,
-                    beam_size=1,        # Reduce beam size for faster inference
-                    best_of=1,          # Only return best result
-                    language="en"       # Specify language for better accuracy
-                )
-            )
-            # Join all segments and clean up the text
-            return " ".join(segment.text for segment in segments).strip()
+            return await self._schedule(audio_normalized, session)
             
         except Exception as e:
             self.logger.error(f"Error in transcription: {e}")
             return ""
-    async def transcribe_file(self, audio_path: Union[str, Path]) -> str:
+    async def transcribe_file(self, audio_path: Union[str, Path], session: Hashable = "default") -> str:
         """
         Transcribe audio from a file path (kept for backward compatibility).
         
         Args:
             audio_path: Path to the audio file
-            model_name: Model to use for transcription
+            session: Session the audio belongs to, for fair scheduling
             
         Returns:
             str: Transcribed text
         """
-        model = self.model
-        segments, _ = await asyncio.get_event_loop().run_in_executor(
-            self._thread_pool,
-            lambda: model.transcribe(
-                str(audio_path),
-                beam_size=1,
-                best_of=1,
-                language="en"
-            )
-        )
-        return " ".join(segment.text for segment in segments).strip()
\ No newline at end of file
+        return await self._schedule(str(audio_path), session)
\ No newline at end of file
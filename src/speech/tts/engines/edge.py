@@ -51,6 +51,10 @@ class EdgeTTS(TTSEngine):
                 await process.wait()
                 logger.error("EdgeTTS command timed out.")
                 return None
+            except asyncio.CancelledError:
+                # Barge-in: don't leave edge-tts synthesizing a sentence nobody will hear
+                process.kill()
+                raise
         except Exception as e:
             logger.error(f"EdgeTTS encountered an error: {e}")
             return None
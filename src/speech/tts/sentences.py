@@ -0,0 +1,37 @@
+# src/speech/tts/sentences.py
+import re
+from typing import List
+from blingfire import text_to_sentences
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences."""
+    return [s.strip() for s in text_to_sentences(text).split('\n') if s.strip()]
+
+class SentenceBuffer:
+    """
+    Cuts streamed text into sentences as soon as they are complete.
+
+    feed() takes chunks as they arrive and returns the sentences they completed;
+    text after the last sentence boundary is held back until more arrives or
+    flush() is called at the end of the stream.
+    """
+    # Sentence-ending punctuation (plus closing quotes/brackets) followed by whitespace, or a newline
+    BOUNDARY = re.compile(r'[.!?…]+["\'”’)\]]*\s+|\n+')
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._pending += text
+        end = None
+        for match in self.BOUNDARY.finditer(self._pending):
+            end = match.end()
+        if end is None:
+            return []
+        complete, self._pending = self._pending[:end], self._pending[end:]
+        return split_sentences(complete)
+
+    def flush(self) -> List[str]:
+        sentences = split_sentences(self._pending)
+        self._pending = ""
+        return sentences
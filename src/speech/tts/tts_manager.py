@@ -1,22 +1,63 @@
 import io
-from asyncio import Queue, Semaphore, Lock, Event, create_task, gather, to_thread
-from typing import List, Tuple, Dict
+import time
+from asyncio import Queue, Semaphore, Lock, Event, Task, create_task, gather, to_thread
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Tuple, Dict
 import sounddevice as sd
 import soundfile as sf
+from src.core.cancellation import TurnScopes
 from src.core.event_bus import EventBus
+from src.core.mailbox import PublishMode
+from src.core.metrics import LatencyHistogram
+from src.core.scheduler import FairScheduler
 from src.core.state import StateManager, AssistantState
+from src.utils.shared_resources import TRACER
 from src.speech.tts.engines import edge, speechify
-from blingfire import text_to_sentences
+from src.speech.tts.engines.base_tts import TTSEngine
+from src.speech.tts.sentences import split_sentences
 from src.speech.tts.voices import VOICES
 from src.utils.logger import setup_logging
 import numpy as np
 
+AudioOutput = Callable[[np.ndarray, int], Awaitable[None]]
+
+def create_engines() -> Dict[str, TTSEngine]:
+    return {
+        "EdgeTTS": edge.EdgeTTS(),
+        "SpeechifyTTS": speechify.SpeechifyTTS()
+    }
+
 class TTSManager:
-    def __init__(self, event_bus: EventBus, state_manager: StateManager, max_concurrent_tasks: int = 20, audio_queue_maxsize: int = 100) -> None:
-        self.engines = {
-            "EdgeTTS": edge.EdgeTTS(),
-            "SpeechifyTTS": speechify.SpeechifyTTS()
-        }
+    def __init__(
+        self,
+        event_bus: EventBus,
+        state_manager: StateManager,
+        max_concurrent_tasks: int = 20,
+        audio_queue_maxsize: int = 100,
+        engines: Optional[Dict[str, TTSEngine]] = None,
+        scheduler: Optional[FairScheduler] = None,
+        session_id: Hashable = "default",
+        output: Optional[AudioOutput] = None,
+        turns: Optional[TurnScopes] = None
+    ) -> None:
+        """
+        Args:
+            event_bus (EventBus): Bus to take playback requests from
+            state_manager (StateManager): State machine to move to SPEAKING
+            max_concurrent_tasks (int): Sentences synthesized at once for this manager
+            audio_queue_maxsize (int): Decoded sentences waiting for playback
+            engines (dict): TTS engines by name, shared between sessions; created if omitted
+            scheduler (FairScheduler): Admission to the engines across sessions; a private one if omitted
+            session_id: This manager's key in the scheduler
+            output: Coroutine taking (audio, samplerate) to play through instead of the local speakers
+            turns (TurnScopes): The pipeline's turn scopes; synthesis and playback
+                run as turn work so barge-in tears them down
+        """
+        self.engines = engines if engines is not None else create_engines()
+        self.scheduler = scheduler or FairScheduler("tts", concurrency=max_concurrent_tasks)
+        self.session_id = session_id
+        self.output = output
+        self.turns = turns or TurnScopes()
+        self.turns.add_cleanup(self._on_turn_cancelled)
 
         self.logger = setup_logging(module_name="TTSManager")
 
@@ -27,26 +68,117 @@ class TTSManager:
         self.semaphore = Semaphore(max_concurrent_tasks)
         self.next_index_to_play = 0
         self.playback_lock = Lock()  # Ensure one playback at a time
-        self.buffer: Dict[int, Tuple[np.ndarray, int]] = {}  # Buffer to store preloaded audio (data, samplerate)
+        # Buffer to store preloaded audio (data, samplerate); None marks a sentence that failed to generate
+        self.buffer: Dict[int, Optional[Tuple[np.ndarray, int]]] = {}
         self.playback_event = Event()  # Event to signal playback task
+        self.production_done = False
+        self.session_lock = Lock()  # One response plays at a time
+
+        # Time from the start of the turn to the first sentence playing
+        self.first_audio_latency = LatencyHistogram()
+        self._started_at: Optional[float] = None
+        self._session_started_at = 0.0
+        self._playback_span = None
+        self._stream_sentences: Optional[Queue] = None
+        self._stream_tasks: set[Task] = set()
+        # Text of the sentences in the current response, and what "Arlo continue" should say
+        self._sentences: Dict[int, str] = {}
+        self._voice_name = "Ava_Edge"
+        self.resume_text: Optional[str] = None
 
         self.event_bus.subscribe(
             "generate.and.play.audio",
             self._handle_generate_and_play_audio,
             async_handler=True
         )
+        self.event_bus.subscribe("tts.stream.start", self._handle_stream_start, async_handler=True)
+        self.event_bus.subscribe("tts.stream.sentence", self._handle_stream_sentence, async_handler=True)
+        self.event_bus.subscribe("tts.stream.end", self._handle_stream_end, async_handler=True)
+        self.event_bus.subscribe("tts.resume", self._handle_resume, async_handler=True)
 
-    async def _handle_generate_and_play_audio(self, text: str, voice_name: str) -> None:
+    async def _handle_generate_and_play_audio(self, text: str, voice_name: str, started_at: Optional[float] = None) -> None:
         try:
             await self.state_manager.set_state(AssistantState.SPEAKING)
             self.logger.info("Received generate.and.play.audio event")
-            await self.generate_and_play_audio(text, voice_name)
+            await self.turns.run(self.generate_and_play_audio(text, voice_name, started_at))
 
         except Exception as e:
             self.logger.error(f"Failed to generate and play audio: {e}", exc_info=True)
 
+    ###############################################################################
+    #######                     Streaming playback                          #######
+    ###############################################################################
+
+    async def _handle_stream_start(self, voice_name: str = "Ava_Edge", started_at: Optional[float] = None) -> None:
+        """
+        Begin speaking a response whose sentences arrive one by one on
+        'tts.stream.sentence', until 'tts.stream.end'.
+        """
+        self.logger.info("Received tts.stream.start event")
+        sentences: Queue = Queue()
+        self._stream_sentences = sentences
+        task = self.turns.spawn(self._play_stream(sentences, voice_name, started_at), name="tts_stream")
+        self._stream_tasks.add(task)
+        task.add_done_callback(self._stream_tasks.discard)
+
+    async def _handle_stream_sentence(self, sentence: str) -> None:
+        if self._stream_sentences is None:
+            self.logger.warning("Dropping streamed sentence received outside a stream")
+            return
+        self._stream_sentences.put_nowait(sentence)
+
+    async def _handle_stream_end(self) -> None:
+        if self._stream_sentences is not None:
+            self._stream_sentences.put_nowait(None)
+            self._stream_sentences = None
+
+    ###############################################################################
+    #######                     Barge-in                                    #######
+    ###############################################################################
+
+    def _on_turn_cancelled(self, reason: str) -> None:
+        """
+        Cleanup for a cancelled turn. The synthesis and playback tasks are
+        cancelled by the scope; the sound device needs stopping directly
+        because sd.wait() blocks a worker thread, not a task.
+        """
+        self._stream_sentences = None
+        # "Arlo continue" picks up from the sentence that was cut off
+        remaining = [sentence for index, sentence in sorted(self._sentences.items()) if index >= self.next_index_to_play]
+        self.resume_text = " ".join(remaining) if reason == "pause" and remaining else None
+        self._sentences.clear()
+        if self.output is None:
+            sd.stop()
+
+    async def _handle_resume(self) -> None:
+        """Speak what a pause interrupted, or finish straight away if nothing was."""
+        text, self.resume_text = self.resume_text, None
+        if not text:
+            await self.event_bus.publish("tts.completed")
+            return
+        self.logger.info("Resuming paused speech")
+        try:
+            await self.turns.run(self.generate_and_play_audio(text, self._voice_name))
+        except Exception as e:
+            self.logger.error(f"Failed to resume audio: {e}", exc_info=True)
+
+    @staticmethod
+    async def _drain(sentences: Queue) -> AsyncIterator[str]:
+        while (sentence := await sentences.get()) is not None:
+            yield sentence
+
+    async def _play_stream(self, sentences: Queue, voice_name: str, started_at: Optional[float]) -> None:
+        try:
+            await self.state_manager.set_state(AssistantState.SPEAKING)
+            await self.generate_and_play_audio(self._drain(sentences), voice_name, started_at)
+        except Exception as e:
+            self.logger.error(f"Failed to play streamed audio: {e}", exc_info=True)
+
     async def play_audio_async(self, audio_data: np.ndarray, samplerate: int) -> None:
         try:
+            if self.output is not None:
+                await self.output(audio_data, samplerate)
+                return
             # Play audio in a separate thread to avoid blocking the event loop
             await to_thread(sd.play, audio_data, samplerate)
             # Wait for playback to finish in a separate thread
@@ -55,47 +187,70 @@ class TTSManager:
             self.logger.error(f"Failed to play audio data: {e}", exc_info=True)
 
     def split_sentences(self, response: str) -> List[Tuple[int, str]]:
-        sentences = text_to_sentences(response)
-        split_sentences = [s.strip() for s in sentences.split('\n') if s.strip()]
-        return list(enumerate(split_sentences))
+        return list(enumerate(split_sentences(response)))
+
+    async def _numbered(self, response: str | AsyncIterable[str]) -> AsyncIterator[Tuple[int, str]]:
+        if isinstance(response, str):
+            for item in self.split_sentences(response):
+                yield item
+            return
+        index = 0
+        async for sentence in response:
+            yield index, sentence
+            index += 1
 
     async def generate_audio(self, index: int, sentence: str, voice: str, engine: object) -> None:
         async with self.semaphore:
             try:
-                audio_bytes = await engine.generate_audio(sentence, voice)
+                audio_bytes = await self.scheduler.submit(
+                    self.session_id, lambda: engine.generate_audio(sentence, voice)
+                )
                 if audio_bytes:
                     # Pre-decode audio data here
                     with io.BytesIO(audio_bytes) as audio_file:
                         data, samplerate = await to_thread(sf.read, audio_file, dtype='float32')
                     await self.audio_queue.put((index, (data, samplerate)))
                     self.logger.info(f"Enqueued audio for sentence {index}")
-                else:
-                    self.logger.warning(f"No audio data returned for sentence {index}")
+                    return
+                self.logger.warning(f"No audio data returned for sentence {index}")
             except Exception as e:
                 self.logger.error(f"Exception generating audio for sentence {index}: {e}", exc_info=True)
+        # Let playback skip this sentence instead of waiting for it forever
+        await self.audio_queue.put((index, None))
+
+    async def producer(self, response: str | AsyncIterable[str], voice_name: str) -> None:
+        """
+        Start synthesis for each sentence as soon as it is available.
 
-    async def producer(self, response: str, voice_name: str) -> None:
+        response is either the full text or an async iterable of sentences,
+        such as a reply that is still being generated.
+        """
         VOICE = VOICES.get(voice_name, VOICES["Ava_Edge"])
         self.logger.info(f"Using voice '{VOICE.name}' and engine '{VOICE.engine}'")
         engine_instance = self.engines.get(VOICE.engine, self.engines["EdgeTTS"])
 
-        tasks = [
-            create_task(self.generate_audio(index, sentence, VOICE.name, engine_instance))
-            for index, sentence in self.split_sentences(response)
-        ]
-        await gather(*tasks)
-        await self.audio_queue.put(None)  # Sentinel to indicate completion
+        tasks = []
+        try:
+            async for index, sentence in self._numbered(response):
+                self._sentences[index] = sentence
+                tasks.append(create_task(self.generate_audio(index, sentence, VOICE.name, engine_instance)))
+            await gather(*tasks)
+        finally:
+            await self.audio_queue.put(None)  # Sentinel to indicate completion
 
     async def consumer(self) -> None:
         while True:
             item = await self.audio_queue.get()
             if item is None:
                 self.logger.info("Consumer received sentinel None. Exiting.")
+                self.production_done = True
                 self.playback_event.set()  # Signal playback to check remaining buffer
                 break
 
-            index, (audio_data, samplerate) = item
-            self.buffer[index] = (audio_data, samplerate)
+            index, audio = item
+            if index == 0 and audio is not None:
+                TRACER.record_span("tts_first_sentence", self._session_started_at)
+            self.buffer[index] = audio
             self.logger.debug(f"Consumer received audio for sentence {index}")
 
             self.audio_queue.task_done()
@@ -109,28 +264,74 @@ class TTSManager:
             await self.playback_event.wait()
             async with self.playback_lock:
                 while self.next_index_to_play in self.buffer:
-                    audio_data, samplerate = self.buffer.pop(self.next_index_to_play)
-                    self.logger.info(f"Playing audio for sentence {self.next_index_to_play}")
-                    await self.play_audio_async(audio_data, samplerate)
-                    self.logger.info(f"Played audio for sentence {self.next_index_to_play}")
+                    audio = self.buffer.pop(self.next_index_to_play)
+                    if audio is not None:
+                        audio_data, samplerate = audio
+                        await self._report_first_audio()
+                        if self._playback_span is None:
+                            self._playback_span = TRACER.start_span("playback")
+                        self.logger.info(f"Playing audio for sentence {self.next_index_to_play}")
+                        await self.play_audio_async(audio_data, samplerate)
+                        self.logger.info(f"Played audio for sentence {self.next_index_to_play}")
                     self.next_index_to_play += 1
             self.playback_event.clear()
 
-            # Exit condition: no more items and buffer is empty
-            if self.audio_queue.empty() and not self.buffer:
+            # Exit condition: every sentence has been produced and played.
+            # Checking only the queue would end a streamed reply while the LLM is still writing it.
+            if self.production_done and not self.buffer:
+                TRACER.end_span(self._playback_span, sentences=self.next_index_to_play)
+                self._playback_span = None
                 await self.event_bus.publish("tts.completed")
                 break
 
-    async def generate_and_play_audio(self, response: str, voice_name: str) -> None:
-        self.next_index_to_play = 0
-        consumer_task = create_task(self.consumer())
-        producer_task = create_task(self.producer(response, voice_name))
-        playback_task = create_task(self.playback_task())
+    async def _report_first_audio(self) -> None:
+        if self._started_at is None:
+            return
+        latency = time.perf_counter() - self._started_at
+        self._started_at = None
+        self.first_audio_latency.record(latency)
+        turn = TRACER.root_span()
+        if turn is not None:
+            turn.set('time_to_first_audio_ms', latency * 1000)
+        self.logger.info(f"Time to first audio: {latency * 1000:.0f} ms")
+        await self.event_bus.publish("tts.first_audio", latency=latency, mode=PublishMode.FIRE_AND_FORGET)
 
-        try:
-            await gather(producer_task, consumer_task, playback_task,return_exceptions=True)
-        except Exception as e:
-            self.logger.error(f"Error occurred during generate and play: {e}", exc_info=True)
-            producer_task.cancel()
-            consumer_task.cancel()
-            playback_task.cancel()
\ No newline at end of file
+    async def generate_and_play_audio(self, response: str | AsyncIterable[str], voice_name: str, started_at: Optional[float] = None) -> None:
+        """
+        Synthesize and play a response in sentence order.
+
+        Args:
+            response: Full text, or an async iterable of sentences still being produced
+            voice_name: Key into VOICES
+            started_at: time.perf_counter() at the start of the turn, used to
+                report time to first audio
+        """
+        async with self.session_lock:
+            self.next_index_to_play = 0
+            self.buffer.clear()
+            while not self.audio_queue.empty():
+                self.audio_queue.get_nowait()  # Left behind by a cancelled response
+            self._sentences.clear()
+            self._voice_name = voice_name
+            self.production_done = False
+            self.playback_event.clear()
+            self._started_at = started_at
+            self._session_started_at = time.perf_counter()
+            self._playback_span = None
+
+            consumer_task = create_task(self.consumer())
+            producer_task = create_task(self.producer(response, voice_name))
+            playback_task = create_task(self.playback_task())
+
+            try:
+                await gather(producer_task, consumer_task, playback_task,return_exceptions=True)
+            except Exception as e:
+                self.logger.error(f"Error occurred during generate and play: {e}", exc_info=True)
+                producer_task.cancel()
+                consumer_task.cancel()
+                playback_task.cancel()
+            finally:
+                # Playback is the last stage of a turn
+                TRACER.end_span(self._playback_span)
+                self._playback_span = None
+                TRACER.finish()
\ No newline at end of file
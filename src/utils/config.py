@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Define the project root directory
@@ -19,8 +20,15 @@ FASTER_WHISPER_MODELS_DIR = MODELS_DIR / 'faster_whisper'
 URL_PATH = CACHE_DIR / 'urls.json'
 QUERY_PATH = CACHE_DIR / 'queries.json'
 HISTORY_PATH = CACHE_DIR / 'history.json'
+SESSIONS_DIR = CACHE_DIR / 'sessions'
 PROMPT_CLASSIFER_PATH = CACHE_DIR /'prompt_classification_cache.json'
 CHROMADB_PATH = DATA_DIR / 'db/prompt_embeddings'
+BENCHMARKS_DIR = DATA_DIR / 'benchmarks'
+TRACES_DIR = DATA_DIR / 'traces'
+DICTATION_DIR = AUDIO_DIR / 'dictation'
+
+# Define IPC paths
+EVENT_BRIDGE_SOCKET = DATA_DIR / 'run' / 'eventbus.sock'
 
 # Define model paths
 VAD_WIN_DIR = VAD_DIR / 'libpv_cobra.dll'
@@ -34,6 +42,25 @@ URL_LLM_MODEL = "llama-3.3-70b-specdec"
 LLM_PROMPT_CLASSIFIER_MODEL = "mistral-saba-24b"
 CLASSIFIER_MODEL = CLASSIFIER_DIR / 'allmini/all-MiniLM-L6-v2'
 
+# Define runtime switches
+# Call-site capture and per-publish logging on the event bus and state manager
+EVENT_TRACING = os.getenv("ARLO_EVENT_TRACING", "0").lower() in ("1", "true", "yes")
+# Append every published event to this binary journal for later replay (unset disables it)
+EVENT_JOURNAL_PATH = os.getenv("ARLO_EVENT_JOURNAL") or None
+# Append every completed turn trace to this JSONL file, e.g. data/traces/turns.jsonl (unset disables it)
+TRACE_EXPORT_PATH = os.getenv("ARLO_TRACE_FILE") or None
+# Microphone input: unset for the default device, "device:<index>", a WAV/FLAC path or "-" for PCM on stdin
+AUDIO_SOURCE = os.getenv("ARLO_AUDIO_SOURCE") or None
+# Noise suppression and automatic gain control on recorded audio, ahead of VAD and Whisper
+AUDIO_PREPROCESS = os.getenv("ARLO_AUDIO_PREPROCESS", "0").lower() in ("1", "true", "yes")
+# Concurrent client sessions served next to the local assistant, and how many
+# transcriptions / TTS sentences the shared models run at once across them
+MAX_SESSIONS = int(os.getenv("ARLO_MAX_SESSIONS", "32"))
+STT_CONCURRENCY = int(os.getenv("ARLO_STT_CONCURRENCY", "1"))
+TTS_CONCURRENCY = int(os.getenv("ARLO_TTS_CONCURRENCY", "8"))
+# Stream LLM replies into TTS sentence by sentence instead of waiting for the full text
+LLM_STREAMING = os.getenv("ARLO_LLM_STREAMING", "0").lower() in ("1", "true", "yes")
+
 # Ensure directories exist
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -1,5 +1,8 @@
 from src.core.event_bus import EventBus
 from src.core.state import StateManager
+from src.core.tracing import Tracer
+from src.utils.config import TRACE_EXPORT_PATH
 
 EVENT_BUS = EventBus()
-STATE_MANAGER = StateManager()
\ No newline at end of file
+STATE_MANAGER = StateManager()
+TRACER = Tracer(export_path=TRACE_EXPORT_PATH)
\ No newline at end of file
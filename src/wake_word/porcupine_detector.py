@@ -1,14 +1,14 @@
 import pvporcupine
-import sounddevice as sd
 import numpy as np
 import os
 import time
 import platform
 import asyncio
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from threading import Lock
 from src.core.event_bus import EventBus
 from src.core.state import StateManager, AssistantState
+from src.audio.sources import AudioSource, DeviceSource, EndOfAudio
 from src.utils.logger import setup_logging
 from src.wake_word.wake_manager import WakeWordCommand
 from src.utils.config import WAKE_WORD_DIR
@@ -19,7 +19,8 @@ class WakeWordDetector:
                  sensitivity: float = 0.5, 
                  buffer_size: int = 1024,
                  event_bus: Optional[EventBus] = None,
-                 state_manager: Optional[StateManager] = None):
+                 state_manager: Optional[StateManager] = None,
+                 audio_source: Optional[AudioSource] = None):
         """
         Initialize wake word detector with Porcupine
         
@@ -28,14 +29,17 @@ class WakeWordDetector:
             buffer_size (int): Audio buffer size for processing
             even_bus (EventBus): Event bus for system-wide communication
             state_manager (StateManager): State manager for tracking assistant state
+            audio_source (AudioSource): Where to read audio from; defaults to the input device
         """
         self.sensitivity = sensitivity
         self.buffer_size = buffer_size
         self.keyword_paths = self.load_model()
         
         self.porcupine = None
-        self.audio_stream = None
+        self.audio_source = audio_source
         self.is_running = True
+        self.is_detecting = False  # True while a detection loop owns the input stream
+        self.overflows = 0  # Reads the source flagged as having lost audio
         self.detection_lock = Lock()
         
         # Pre-allocate numpy arrays for better performance
@@ -111,7 +115,7 @@ class WakeWordDetector:
     
     async def wake_word_detected(self, command: str):
         """Handle wake word detection by publishing to event bus"""
-        await self.eventbus.publish("wakeword.detected.manager", command)
+        await self.eventbus.publish("wakeword.detected.manager", command, detected_at=time.perf_counter())
         return command
 
     async def process_audio_chunk(self, chunk) -> bool:
@@ -130,13 +134,13 @@ class WakeWordDetector:
                             self.wake_word_detected(command.value)
                     
                     c_state = await self.state_manager.get_state()
-                        # Only stop detection for WAKE command
-                    if (command == WakeWordCommand.WAKE and c_state == AssistantState.IDLE) or \
-                    (command == WakeWordCommand.STOP and c_state in [AssistantState.SPEAKING, AssistantState.PAUSED]):
+                    # Only stop detection once "Hey Arlo" has started a turn; stop/pause/continue
+                    # keep detection running so the next wake word is still heard
+                    if command == WakeWordCommand.WAKE and c_state == AssistantState.LISTENING:
 
                         self.is_running = False
-                        if self.audio_stream:
-                            self.audio_stream.stop()
+                        if self.audio_source:
+                            self.audio_source.stop()
                         return True
                     return True
         return False
@@ -144,7 +148,8 @@ class WakeWordDetector:
     async def audio_callback(self, indata, frames, time, status):
         """Process audio frame and detect wake words with optimized buffering"""
         if status:
-            return
+            # The block is still good audio; only what came before it was lost
+            self.overflows += 1
         
         np.copyto(self.audio_buffer[:frames], indata.flatten())
         
@@ -163,29 +168,40 @@ class WakeWordDetector:
             self.logger.error(f"Error starting wake word detection: {e}")
 
     async def start_detection(self):
-        """Start real-time audio detection asynchronously"""
+        """Start real-time audio detection asynchronously. Does nothing if detection is already running."""
+        if self.is_detecting:
+            return
+        self.is_detecting = True
         try:
             # Ensure Porcupine is initialized
             if self.porcupine is None:
-                self._initialize_porcupine()
+                await self._initialize_porcupine()
                 
             self.is_running = True
-            self.audio_stream = sd.InputStream(
-                channels=1,
-                samplerate=self.porcupine.sample_rate,
-                dtype=np.int16,
-                blocksize=self.buffer_size,
-                latency='low'
-            )
+            if self.audio_source is None:
+                self.audio_source = DeviceSource(
+                    sample_rate=self.porcupine.sample_rate,
+                    blocksize=self.buffer_size,
+                    latency='low'
+                )
+            source = self.audio_source
             
-            with self.audio_stream:
+            with source:
                 while self.is_running:
-                    indata, _ = self.audio_stream.read(self.buffer_size)
-                    await self.audio_callback(indata, self.buffer_size, None, None)
-                    await asyncio.sleep(0.01)
+                    indata, overflowed = await source.read_async(self.buffer_size)
+                    if overflowed:
+                        self.logger.warning("Input overflowed during wake word detection; audio was lost")
+                    await self.audio_callback(indata, self.buffer_size, None, overflowed)
+                    # Device reads await the capture callback; recorded audio is read as fast as Porcupine can process it
+                    await asyncio.sleep(0)
+        except EndOfAudio:
+            self.logger.info("Audio source exhausted, wake word detection finished")
+            await self.eventbus.publish("audio.source.exhausted")
         except Exception as e:
             self.logger.error(f"Error in wake word detection: {str(e)}")
             await self.cleanup()
+        finally:
+            self.is_detecting = False
 
 
     async def _stop_detection(self):
@@ -195,14 +211,14 @@ class WakeWordDetector:
     async def restart_detection(self):
         """Restart the detection process"""
         self.is_running = False
-        self.audio_stream = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'detecting': self.is_detecting, 'overflows': self.overflows}
 
     async def cleanup(self):
         """Clean up resources asynchronously"""
-        if self.audio_stream is not None:
-            self.audio_stream.stop()
-            self.audio_stream.close()
-            self.audio_stream = None
+        if self.audio_source is not None:
+            self.audio_source.stop()
         if hasattr(self, 'porcupine') and self.porcupine is not None:
             self.porcupine.delete()
             self.porcupine = None
\ No newline at end of file
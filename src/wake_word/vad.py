@@ -1,13 +1,58 @@
 # vad.py
-import pvcobra
 import platform
 import os
 import time
 import numpy as np
 import asyncio
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 from src.utils.config import VAD_LINUX_DIR, VAD_WIN_DIR
 
+SPEECH_STARTED = 1
+SPEECH_ENDED = 2
+
+# (frame index in the block, SPEECH_STARTED or SPEECH_ENDED, speech seconds, trailing silence seconds)
+VADEvent = Tuple[int, int, float, float]
+
+class _EndpointState:
+    """Endpointing state carried from block to block."""
+    __slots__ = ('speech_detected', 'speech_start_time', 'last_speech_time', 'is_final_silence', 'samples_seen')
+
+    def __init__(self):
+        self.samples_seen = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.speech_detected = False
+        self.speech_start_time = 0.0
+        self.last_speech_time = 0.0
+        self.is_final_silence = False
+
+class VADBatch:
+    """
+    Result of VADManager.process_block(). The object and its arrays are
+    reused by the next call, so copy anything that must outlive it.
+
+    `probabilities` holds one Cobra confidence per frame of the block.
+    `events` lists speech starts and ends in frame order; a start is
+    reported on the first speech frame and an end on the frame at which
+    the silence timeout ran out.
+    """
+    __slots__ = ('probabilities', 'events', '_storage')
+
+    def __init__(self, capacity: int = 8):
+        self._storage = np.zeros(capacity, dtype=np.float32)
+        self.probabilities = self._storage[:0]
+        self.events: List[VADEvent] = []
+
+    def _prepare(self, frames: int) -> np.ndarray:
+        if frames != len(self.probabilities):
+            if frames > len(self._storage):
+                self._storage = np.zeros(max(frames, 2 * len(self._storage)), dtype=np.float32)
+            self.probabilities = self._storage[:frames]
+        if self.events:
+            self.events.clear()
+        return self.probabilities
+
 class VADManager:
     """Voice Activity Detection manager using Picovoice Cobra."""
     def __init__(
@@ -15,73 +60,129 @@ class VADManager:
         speech_timeout: float = 1.2,
         min_speech_length: float = 0.1,
         vad_threshold: float = 0.64,
-        pre_roll_duration: float = 0.5
+        pre_roll_duration: float = 0.5,
+        sample_clock: bool = False,
+        sample_rate: int = 16000,
+        cobra: Optional[Any] = None
     ):
-        """Initialize VAD manager."""
-        if platform.system() == 'Linux': 
-            library_path = VAD_LINUX_DIR
-        elif platform.system() == 'Windows': 
-            library_path = VAD_WIN_DIR
-        else: 
-            raise OSError("Unsupported operating system")
-        
-        access_key = os.getenv("PICOV_ACCESS_KEY")
-        self.cobra = pvcobra.Cobra(access_key=access_key, library_path=library_path)
-                
+        """
+        Initialize VAD manager.
+
+        With sample_clock=True, speech and silence durations are measured by
+        counting the samples processed instead of reading the wall clock, so
+        endpointing gives the same result when recorded audio is fed faster
+        than real time.
+
+        Args:
+            cobra: An engine with process(frame) -> float and frame_length, used
+                instead of creating a Cobra instance (e.g. for benchmarks)
+        """
+        if cobra is None:
+            import pvcobra
+            if platform.system() == 'Linux':
+                library_path = VAD_LINUX_DIR
+            elif platform.system() == 'Windows':
+                library_path = VAD_WIN_DIR
+            else:
+                raise OSError("Unsupported operating system")
+
+            access_key = os.getenv("PICOV_ACCESS_KEY")
+            cobra = pvcobra.Cobra(access_key=access_key, library_path=library_path)
+        self.cobra = cobra
+        self.frame_length = cobra.frame_length
+
         self.speech_timeout = speech_timeout
         self.min_speech_length = min_speech_length
         self.vad_threshold = vad_threshold
         self.pre_roll_duration = pre_roll_duration
-        
-        self.speech_detected = False
-        self.speech_start_time = None
-        self.last_speech_time = None
-        self.is_final_silence = False
+        self.sample_clock = sample_clock
+        self.sample_rate = sample_rate
+        self._frame_s = self.frame_length / sample_rate
+        self._state = _EndpointState()
+        self._batch = VADBatch()
         self._lock = asyncio.Lock()
 
+    @property
+    def speech_detected(self) -> bool:
+        return self._state.speech_detected
+
+    def process_block(self, block: np.ndarray) -> VADBatch:
+        """
+        Run Cobra over every whole frame of a block and endpoint the result.
+
+        Synchronous and lock-free: the caller feeds blocks in order from one
+        task. Samples after the last whole frame are ignored.
+
+        Args:
+            block (np.ndarray): 1-D int16 samples
+
+        Returns:
+            VADBatch: Per-frame probabilities and speech start/end events, valid until the next call
+        """
+        frame_length = self.frame_length
+        frames = len(block) // frame_length
+        probabilities = self._batch._prepare(frames)
+        process = self.cobra.process
+        state = self._state
+        events = self._batch.events
+        if self.sample_clock:
+            first_end = (state.samples_seen + frame_length) / self.sample_rate
+        else:
+            # One clock read per block; frames are spaced by their duration before it
+            first_end = time.time() - (frames - 1) * self._frame_s
+        state.samples_seen += frames * frame_length
+
+        for index in range(frames):
+            probability = process(block[index * frame_length:(index + 1) * frame_length])
+            probabilities[index] = probability
+            current_time = first_end + index * self._frame_s
+            if probability >= self.vad_threshold:
+                if not state.speech_detected:
+                    state.speech_detected = True
+                    state.speech_start_time = current_time
+                    events.append((index, SPEECH_STARTED, 0.0, 0.0))
+                state.last_speech_time = current_time
+                state.is_final_silence = False
+
+            elif state.speech_detected:  # Detect silence after speech
+                silence_duration = current_time - state.last_speech_time
+                if silence_duration >= self.speech_timeout and not state.is_final_silence:
+                    state.is_final_silence = True
+                    speech_duration = current_time - state.speech_start_time
+                    if speech_duration >= self.min_speech_length:
+                        events.append((index, SPEECH_ENDED, speech_duration, silence_duration))
+                        state.speech_detected = False
+        return self._batch
+
     async def process_audio(self, audio_frame: np.ndarray) -> Dict[str, Any]:
         """Process audio frame and detect voice activity asynchronously."""
         async with self._lock:
-            current_time = time.time()
-            vad_confidence = self.cobra.process(audio_frame)
-            
+            batch = self.process_block(audio_frame)
+            # Shorter than one frame: nothing was processed and the state is unchanged
+            vad_confidence = float(batch.probabilities[0]) if len(batch.probabilities) else 0.0
             vad_state = {
                 'is_speech': vad_confidence >= self.vad_threshold,
                 'speech_started': False,
                 'speech_ended': False,
                 'vad_confidence': vad_confidence,
-                'speech_duration': 0.0
+                'speech_duration': 0.0,
+                'silence_duration': 0.0
             }
-            
-            if vad_state['is_speech']:  # Speech detected
-                if not self.speech_detected:
-                    self.speech_detected = True
-                    self.speech_start_time = current_time
+            for _, kind, speech_duration, silence_duration in batch.events:
+                if kind == SPEECH_STARTED:
                     vad_state['speech_started'] = True
-                self.last_speech_time = current_time
-                self.is_final_silence = False
-                
-            elif self.speech_detected:  # Detect silence after speech
-                silence_duration = current_time - self.last_speech_time
-                if silence_duration >= self.speech_timeout and not self.is_final_silence:
-                    self.is_final_silence = True
-                    speech_duration = current_time - self.speech_start_time
-                    if speech_duration >= self.min_speech_length:
-                        vad_state['speech_ended'] = True
-                        vad_state['speech_duration'] = speech_duration
-                        self.speech_detected = False
-            
+                else:
+                    vad_state['speech_ended'] = True
+                    vad_state['speech_duration'] = speech_duration
+                    vad_state['silence_duration'] = silence_duration
             return vad_state
 
     async def reset(self):
         """Reset VAD state asynchronously."""
         async with self._lock:
-            self.speech_detected = False
-            self.speech_start_time = None
-            self.last_speech_time = None
-            self.is_final_silence = False
+            self._state.reset()
 
     async def cleanup(self):
         """Cleanup resources asynchronously."""
         if hasattr(self, 'cobra'):
-            self.cobra.delete()
\ No newline at end of file
+            self.cobra.delete()
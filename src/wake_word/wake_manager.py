@@ -1,6 +1,9 @@
 from enum import Enum
-from typing import Dict, Callable
+from typing import Dict, Callable, Optional
 from src.core.event_bus import EventBus
+from src.core.cancellation import TurnScopes
+from src.core.coalesce import CoalescePolicy
+from src.core.mailbox import PublishMode
 from src.core.state import StateManager, AssistantState
 from src.utils.logger import setup_logging
 
@@ -11,11 +14,20 @@ class WakeWordCommand(Enum):
     CONTINUE = "arlo_continue"
 
 class WakeWordManager():
-    def __init__(self, event_bus: EventBus, state_manager: StateManager):
+    # What each command interrupting a turn counts as, for cancellation stats
+    BARGE_IN_REASONS = {
+        WakeWordCommand.WAKE: "wake",
+        WakeWordCommand.STOP: "stop",
+        WakeWordCommand.PAUSE: "pause",
+    }
+
+    def __init__(self, event_bus: EventBus, state_manager: StateManager, turns: Optional[TurnScopes] = None):
         self.event_bus = event_bus
         self.state_manager = state_manager
+        self.turns = turns or TurnScopes()
         self.logger = setup_logging()
         self.command = None
+        self.wake_detected_at = None  # perf_counter() of the frame that last started a turn
         
         # Map wake word commands to their handler methods
         self.command_handlers: Dict[WakeWordCommand, Callable] = {
@@ -31,6 +43,15 @@ class WakeWordManager():
             self._on_wake_word_detected,
             async_handler=True
         )
+        # Porcupine can fire on consecutive frames of one utterance. The first
+        # detection of each command goes straight through and its repeats within
+        # the window are dropped; different commands never absorb each other.
+        self.event_bus.set_coalescing(
+            "wakeword.detected.manager",
+            CoalescePolicy.FIRST,
+            window=0.5,
+            key=lambda args, kwargs: args[0] if args else kwargs.get("command")
+        )
 
         # Subscribe to TTS completion events to update state
         self.event_bus.subscribe(
@@ -43,12 +64,12 @@ class WakeWordManager():
         """Check if a wake word command is valid for the current state"""
         # State-specific command validation
         if command == WakeWordCommand.WAKE:
-            # Hey Arlo is only valid when IDLE or PAUSED
-            return state == AssistantState.IDLE
+            # Hey Arlo starts a turn, or abandons the current one and starts another
+            return state in [AssistantState.IDLE, AssistantState.PAUSED, AssistantState.PROCESSING, AssistantState.SPEAKING]
         
         elif command == WakeWordCommand.STOP:
             # Stop is valid in any active state
-            return state in [AssistantState.SPEAKING, AssistantState.PAUSED]
+            return state in [AssistantState.PROCESSING, AssistantState.SPEAKING, AssistantState.PAUSED]
         
         elif command == WakeWordCommand.PAUSE:
             # Pause is only valid when actively speaking
@@ -60,7 +81,7 @@ class WakeWordManager():
 
         return False
 
-    async def _on_wake_word_detected(self, command: str) -> None:
+    async def _on_wake_word_detected(self, command: str, detected_at: Optional[float] = None) -> None:
         """Handle wake word detection events"""
         try:
             # Find the matching command enum
@@ -78,10 +99,16 @@ class WakeWordManager():
             if self._is_command_valid_for_state(wake_command, current_state):
 
                 handler = self.command_handlers.get(wake_command)
-                if (wake_command == WakeWordCommand.WAKE and current_state == AssistantState.IDLE) or \
-                (wake_command == WakeWordCommand.STOP and current_state in [AssistantState.SPEAKING, AssistantState.PAUSED]):
+                # Only a new turn needs the microphone for recording; after "Stop Arlo"
+                # detection keeps running so "Hey Arlo" is heard without a restart
+                if wake_command == WakeWordCommand.WAKE:
+                    self.wake_detected_at = detected_at
                     await self.event_bus.publish("wakeword.stop_detection")
                     self.logger.debug("WAKE WORD Detection is stopped....")
+                reason = self.BARGE_IN_REASONS.get(wake_command)
+                # Stop or wake while paused also discards the speech a pause kept for later
+                if reason is not None and current_state in [AssistantState.PROCESSING, AssistantState.SPEAKING, AssistantState.PAUSED]:
+                    await self._cancel_turn(reason, detected_at)
                 await handler()
             else:
                 self.logger.info(f"Ignoring '{command}' command, not applicable in current state: {current_state}")
@@ -89,20 +116,27 @@ class WakeWordManager():
         except Exception as e:
             self.logger.error(f"WAKE WORD Manager error: {e}")
     
+    async def _cancel_turn(self, reason: str, detected_at: Optional[float]) -> None:
+        """Tear down the LLM, tool, synthesis and playback work of the turn being interrupted."""
+        latency = await self.turns.cancel(reason, requested_at=detected_at)
+        await self.event_bus.publish(
+            "turn.cancelled", reason=reason, latency=latency, mode=PublishMode.FIRE_AND_FORGET
+        )
+
     def get_wake_command(self):
         return self.command
     
     async def _handle_wake(self) -> None:
         """Handle 'Hey Arlo' command"""
         current_state = await self.state_manager.get_state()
-        if current_state in [AssistantState.IDLE, AssistantState.PAUSED]:
+        if current_state in [AssistantState.IDLE, AssistantState.PAUSED, AssistantState.PROCESSING, AssistantState.SPEAKING]:
             await self.state_manager.set_state(AssistantState.LISTENING)
             self.logger.info("Activated assistant with 'Hey Arlo'")
 
     async def _handle_stop(self) -> None:
         """Handle 'Stop Arlo' command"""
         current_state = await self.state_manager.get_state()
-        if current_state in [AssistantState.SPEAKING, AssistantState.PAUSED]:
+        if current_state in [AssistantState.PROCESSING, AssistantState.SPEAKING, AssistantState.PAUSED]:
             await self.state_manager.set_state(AssistantState.IDLE)
             self.logger.info("Speaking stopped and back to IDLE state with 'Stop Arlo'")
 
@@ -119,6 +153,8 @@ class WakeWordManager():
         current_state = await self.state_manager.get_state()
         if current_state == AssistantState.PAUSED:
             await self.state_manager.set_state(AssistantState.SPEAKING)
+            # Playback was torn down on pause; TTS speaks what was left, if anything
+            await self.event_bus.publish("tts.resume", mode=PublishMode.FIRE_AND_FORGET)
             self.logger.info("Speaking continued with 'Arlo Continue'")
     
     async def _on_tts_completed(self) -> None:
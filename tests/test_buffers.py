@@ -0,0 +1,82 @@
+import wave
+import numpy as np
+import pytest
+from src.audio.buffers import RingBuffer, UtteranceBuffer, WavSpill
+
+def test_ring_keeps_the_newest_samples_across_the_wrap():
+    ring = RingBuffer(8)
+    ring.write(np.arange(5, dtype=np.int16))
+    ring.write(np.arange(5, 11, dtype=np.int16))
+    first, second = ring.segments()
+    assert len(ring) == 8 and ring.oldest == 3 and ring.written == 11
+    # The contents wrap around the end of the storage, so they come back as two views
+    assert len(second) > 0
+    np.testing.assert_array_equal(np.concatenate((first, second)), np.arange(3, 11))
+    np.testing.assert_array_equal(ring.read(), np.arange(3, 11))
+
+def test_ring_write_larger_than_capacity_keeps_the_tail():
+    ring = RingBuffer(4)
+    ring.write(np.arange(10, dtype=np.int16))
+    assert ring.oldest == 6 and ring.written == 10
+    np.testing.assert_array_equal(ring.read(), [6, 7, 8, 9])
+
+def test_ring_segments_at_indexes_by_sample_clock():
+    ring = RingBuffer(6)
+    ring.write(np.arange(9, dtype=np.int16))
+    first, second = ring.segments_at(4, 4)
+    np.testing.assert_array_equal(np.concatenate((first, second)), [4, 5, 6, 7])
+    with pytest.raises(IndexError):
+        ring.segments_at(2, 2)  # Overwritten
+    with pytest.raises(IndexError):
+        ring.segments_at(7, 3)  # Not written yet
+
+def test_ring_clear_and_invalid_capacity():
+    ring = RingBuffer(4)
+    ring.write(np.ones(3, dtype=np.int16))
+    ring.clear()
+    assert len(ring) == 0 and ring.read().size == 0
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+def test_utterance_buffer_grows_and_take_hands_over_its_storage():
+    buffer = UtteranceBuffer(4)
+    buffer.extend(np.arange(3, dtype=np.int16))
+    buffer.extend(np.arange(3, 6, dtype=np.int16), np.arange(6, 11, dtype=np.int16))
+    assert len(buffer) == 11
+    np.testing.assert_array_equal(buffer.view(), np.arange(11))
+
+    utterance = buffer.take()
+    assert len(buffer) == 0
+    buffer.extend(np.full(11, -1, dtype=np.int16))
+    # The next utterance is written to fresh storage, not over the one taken
+    np.testing.assert_array_equal(utterance, np.arange(11))
+
+def test_utterance_buffer_clear_reuses_storage():
+    buffer = UtteranceBuffer(8)
+    buffer.extend(np.ones(5, dtype=np.int16))
+    buffer.clear()
+    buffer.extend(np.arange(2, dtype=np.int16))
+    np.testing.assert_array_equal(buffer.view(), [0, 1])
+
+def test_wav_spill_grows_and_closes_to_a_valid_wav(tmp_path):
+    path = tmp_path / "spill" / "dictation.wav"
+    spill = WavSpill(path, sample_rate=100, grow_duration=0.5)
+    spill.append(np.arange(30, dtype=np.int16))
+    early = spill.segment(10, 20)
+    spill.append(np.arange(30, 130, dtype=np.int16))  # Grows the file past the first 50 frames
+    assert len(spill) == 130
+    # Views handed out before a grow stay valid
+    np.testing.assert_array_equal(early, np.arange(10, 20))
+    np.testing.assert_array_equal(spill.segment(120, 200), np.arange(120, 130))
+    # Crosses from the first 50-frame chunk into the second
+    np.testing.assert_array_equal(spill.segment(40, 60), np.arange(40, 60))
+    assert spill.segment(130, 140).size == 0
+    spill.close()
+    spill.close()
+
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnchannels() == 1 and wav.getsampwidth() == 2 and wav.getframerate() == 100
+        assert wav.getnframes() == 130
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+    np.testing.assert_array_equal(samples, np.arange(130))
+    assert path.stat().st_size == WavSpill.HEADER_BYTES + 2 * 130
@@ -0,0 +1,67 @@
+import asyncio
+import numpy as np
+from src.audio.capture import CaptureService
+from src.audio.sources import ArraySource, PushSource
+
+def _pcm(values) -> bytes:
+    return np.asarray(values, dtype='<i2').tobytes()
+
+def test_recorder_resumes_where_wake_word_stopped():
+    async def main():
+        capture = CaptureService(ArraySource(np.arange(4096, dtype=np.int16), tail_silence=0), block_frames=256)
+        wake, record = capture.tap("wake"), capture.tap("record")
+        wake.start()
+        await wake.read_async(512)
+        wake.stop()
+        record.start()
+        data, overflowed = await record.read_async(512)
+        capture.close()
+        return data.reshape(-1), overflowed
+
+    data, overflowed = asyncio.run(main())
+    assert not overflowed
+    assert data[0] == 512 and data[-1] == 1023
+
+def test_source_overrun_reaches_every_tap_reading_that_block():
+    async def main():
+        source = PushSource(max_buffered=512 / 16000)
+        capture = CaptureService(source, block_frames=256)
+        wake, record = capture.tap("wake"), capture.tap("record")
+        wake.start()
+        record.start()
+        source.feed(_pcm(range(256)))
+        first = [await tap.read_async(256) for tap in (wake, record)]
+        # More than the source buffers: the oldest audio is dropped and flagged
+        source.feed(_pcm(range(1024)))
+        second = [await tap.read_async(256) for tap in (wake, record)]
+        third = [await tap.read_async(256) for tap in (wake, record)]
+        capture.close()
+        return first, second, third, capture.get_stats()
+
+    first, second, third, stats = asyncio.run(main())
+    assert [overflowed for _, overflowed in first] == [False, False]
+    assert [overflowed for _, overflowed in second] == [True, True]
+    assert [overflowed for _, overflowed in third] == [False, False]
+    assert stats['overflows'] == 1
+    assert stats['source']['dropped_frames'] == 512
+    # The taps kept up with the ring, so they skipped nothing themselves
+    assert stats['dropped_frames'] == 0
+    assert stats['taps']['wake']['overflows'] == 1
+    assert stats['taps']['wake']['dropped_frames'] == 0
+
+def test_tap_that_falls_out_of_the_ring_skips_ahead():
+    async def main():
+        source = ArraySource(np.arange(16000, dtype=np.int16), tail_silence=0)
+        capture = CaptureService(source, buffer_duration=1024 / 16000, block_frames=256)
+        slow, fast = capture.tap("slow"), capture.tap("fast")
+        slow.start()
+        fast.start()
+        await fast.read_async(2048)
+        data, overflowed = await slow.read_async(256)
+        capture.close()
+        return data.reshape(-1), overflowed, slow.get_stats()
+
+    data, overflowed, stats = asyncio.run(main())
+    assert overflowed
+    assert data[0] == 1024
+    assert stats['dropped_frames'] == 1024
@@ -0,0 +1,78 @@
+import asyncio
+from src.core.coalesce import CoalescePolicy, Coalescer
+from src.core.event_bus import EventBus
+
+def _run_burst(policy, events, window=0.05, max_deliveries=1, key=None, settle=0.1):
+    """Offer `events` back to back; returns (immediate, flushed) argument lists."""
+    async def main():
+        flushed = []
+        coalescer = Coalescer(
+            "topic", policy, window, max_deliveries,
+            lambda topic, args, kwargs: flushed.append(args[0]), key
+        )
+        immediate = []
+        for event in events:
+            released = coalescer.offer((event,), {})
+            if released is not None:
+                immediate.append(released[0][0])
+        await asyncio.sleep(settle)
+        coalescer.cancel()
+        return immediate, flushed
+
+    return asyncio.run(main())
+
+def test_latest_passes_first_and_flushes_last():
+    assert _run_burst(CoalescePolicy.LATEST, [1, 2, 3], max_deliveries=2) == ([1], [3])
+
+def test_debounce_delivers_only_the_last():
+    assert _run_burst(CoalescePolicy.DEBOUNCE, [1, 2, 3]) == ([], [3])
+
+def test_batch_delivers_the_window_as_one_list():
+    immediate, flushed = _run_burst(CoalescePolicy.BATCH, [1, 2, 3])
+    assert immediate == []
+    assert [[args[0] for args, _ in batch] for batch in flushed] == [[1, 2, 3]]
+
+def test_first_never_delivers_late():
+    assert _run_burst(CoalescePolicy.FIRST, [1, 1, 1]) == ([1], [])
+
+def test_keys_are_coalesced_separately():
+    burst = ["hey_arlo", "hey_arlo", "stop_arlo", "hey_arlo"]
+    immediate, flushed = _run_burst(CoalescePolicy.FIRST, burst, key=lambda args, kwargs: args[0])
+    assert immediate == ["hey_arlo", "stop_arlo"]
+    assert flushed == []
+
+def test_unkeyed_latest_lets_commands_overwrite_each_other():
+    # Why the wake word topic is keyed: one window for every command loses stop_arlo
+    burst = ["hey_arlo", "hey_arlo", "stop_arlo", "hey_arlo"]
+    immediate, flushed = _run_burst(CoalescePolicy.LATEST, burst, max_deliveries=2)
+    assert "stop_arlo" not in immediate + flushed
+
+def test_window_reopens_after_it_ends():
+    async def main():
+        coalescer = Coalescer("topic", CoalescePolicy.FIRST, 0.02, 1, lambda *_: None)
+        first = coalescer.offer((1,), {})
+        await asyncio.sleep(0.03)
+        return first, coalescer.offer((2,), {})
+
+    assert asyncio.run(main()) == (((1,), {}), ((2,), {}))
+
+def test_bus_delivers_each_wake_command_once():
+    async def main():
+        bus = EventBus()
+        heard = []
+
+        async def handler(command, detected_at=None):
+            heard.append(command)
+
+        bus.subscribe("wakeword.detected.manager", handler, async_handler=True)
+        bus.set_coalescing(
+            "wakeword.detected.manager", CoalescePolicy.FIRST, window=0.05,
+            key=lambda args, kwargs: args[0]
+        )
+        for command in ["hey_arlo", "hey_arlo", "stop_arlo", "hey_arlo"]:
+            await bus.publish("wakeword.detected.manager", command, detected_at=0.0)
+        await asyncio.sleep(0.1)
+        await bus.shutdown()
+        return heard
+
+    assert asyncio.run(main()) == ["hey_arlo", "stop_arlo"]
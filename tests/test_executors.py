@@ -0,0 +1,40 @@
+import asyncio
+import threading
+from src.core.executors import ExecutorPool
+
+def test_call_cancelled_while_queued_leaves_no_backlog():
+    async def main():
+        pool = ExecutorPool("test", max_workers=1)
+        release = threading.Event()
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(lambda: "never"))
+        while pool.get_stats()['active'] == 0:
+            await asyncio.sleep(0.01)
+        busy = pool.get_stats()
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        release.set()
+        await running
+        pool.shutdown()
+        return busy, pool.get_stats()
+
+    busy, done = asyncio.run(main())
+    assert busy['queue_depth'] == 1 and busy['active'] == 1
+    assert done['queue_depth'] == 0 and done['active'] == 0 and done['completed'] == 1
+
+def test_calls_dropped_by_shutdown_leave_no_backlog():
+    async def main():
+        pool = ExecutorPool("test", max_workers=1)
+        release = threading.Event()
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = [asyncio.create_task(pool.run(lambda: None)) for _ in range(3)]
+        while pool.get_stats()['active'] == 0:
+            await asyncio.sleep(0.01)
+        pool.shutdown()
+        release.set()
+        await running
+        await asyncio.gather(*queued, return_exceptions=True)
+        return pool.get_stats()
+
+    stats = asyncio.run(main())
+    assert stats['queue_depth'] == 0 and stats['active'] == 0
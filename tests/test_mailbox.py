@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from src.core.event_bus import EventBus
+from src.core.mailbox import Envelope, Mailbox, OverflowPolicy, PublishMode
+
+def _envelope(value, ack=None) -> Envelope:
+    return Envelope("topic", (value,), {}, ack)
+
+async def _drain(mailbox: Mailbox):
+    return [(await mailbox.get()).args[0] for _ in range(len(mailbox))]
+
+def test_priority_lane_drains_first():
+    async def main():
+        mailbox = Mailbox(maxsize=4)
+        await mailbox.put(_envelope("a"))
+        await mailbox.put(_envelope("stop"), priority=True)
+        await mailbox.put(_envelope("b"))
+        return await _drain(mailbox)
+
+    assert asyncio.run(main()) == ["stop", "a", "b"]
+
+@pytest.mark.parametrize("policy, kept", [
+    (OverflowPolicy.DROP_OLDEST, ["b", "c"]),
+    (OverflowPolicy.DROP_NEWEST, ["a", "b"]),
+])
+def test_drop_policies_settle_the_dropped_ack(policy, kept):
+    async def main():
+        loop = asyncio.get_running_loop()
+        mailbox = Mailbox(maxsize=2, overflow=policy)
+        acks = [loop.create_future() for _ in range(3)]
+        accepted = [await mailbox.put(_envelope(value, ack)) for value, ack in zip("abc", acks)]
+        dropped = [ack.done() for ack in acks]
+        return accepted, dropped, mailbox.dropped, await _drain(mailbox)
+
+    accepted, dropped, count, drained = asyncio.run(main())
+    assert count == 1
+    assert drained == kept
+    if policy is OverflowPolicy.DROP_NEWEST:
+        assert accepted == [True, True, False] and dropped == [False, False, True]
+    else:
+        assert accepted == [True, True, True] and dropped == [True, False, False]
+
+def test_block_policy_waits_for_space():
+    async def main():
+        mailbox = Mailbox(maxsize=1)
+        await mailbox.put(_envelope("a"))
+        blocked = asyncio.create_task(mailbox.put(_envelope("b")))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        await mailbox.get()
+        assert await blocked
+        return await _drain(mailbox)
+
+    assert asyncio.run(main()) == ["b"]
+
+def test_closed_mailbox_refuses_envelopes():
+    async def main():
+        mailbox = Mailbox(maxsize=1)
+        ack = asyncio.get_running_loop().create_future()
+        mailbox.close()
+        return await mailbox.put(_envelope("a", ack)), ack.cancelled()
+
+    assert asyncio.run(main()) == (False, True)
+
+def test_unsubscribe_mid_handler_releases_the_publisher():
+    async def main():
+        bus = EventBus()
+        started = asyncio.Event()
+
+        async def handler():
+            started.set()
+            await asyncio.sleep(10)
+
+        bus.subscribe("slow", handler, async_handler=True, mailbox_size=2)
+        publish = asyncio.create_task(bus.publish("slow"))
+        await started.wait()
+        bus.unsubscribe("slow", handler)
+        await asyncio.wait_for(publish, 1.0)
+        await bus.shutdown()
+
+    asyncio.run(main())
+
+def test_worker_restarts_after_a_handler_kills_it():
+    async def main():
+        bus = EventBus()
+        seen = []
+
+        async def handler(value):
+            seen.append(value)
+            if value == "die":
+                raise asyncio.CancelledError()
+
+        bus.subscribe("topic", handler, async_handler=True, mailbox_size=4)
+        await asyncio.wait_for(bus.publish("topic", "die"), 1.0)
+        await asyncio.wait_for(bus.publish("topic", "after"), 1.0)
+        await asyncio.wait_for(bus.publish("topic", "fire", mode=PublishMode.FIRE_AND_FORGET), 1.0)
+        await asyncio.sleep(0.01)
+        await bus.shutdown()
+        return seen
+
+    assert asyncio.run(main()) == ["die", "after", "fire"]
@@ -0,0 +1,68 @@
+import asyncio
+import time
+import concurrent.futures
+from src.core.scheduler import FairScheduler
+
+def test_sessions_take_turns():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        order = []
+
+        async def job(name):
+            await asyncio.sleep(0)
+            order.append(name)
+
+        # a0 starts at once and a1 is first in line; b0 then goes ahead of a2
+        calls = [scheduler.submit("a", lambda i=i: job(f"a{i}")) for i in range(3)]
+        calls += [scheduler.submit("b", lambda: job("b0"))]
+        await asyncio.gather(*calls)
+        return order
+
+    assert asyncio.run(main()) == ["a0", "a1", "b0", "a2"]
+
+def test_cancelled_thread_job_keeps_its_slot():
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    running, peak = [0], [0]
+
+    def work(seconds):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        time.sleep(seconds)
+        running[0] -= 1
+        return seconds
+
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        first = asyncio.create_task(scheduler.submit("a", lambda: pool.submit(work, 0.2)))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0)
+        # The thread is still busy, so the slot must still be taken
+        assert scheduler.active == 1
+        assert await scheduler.submit("b", lambda: pool.submit(work, 0.01)) == 0.01
+        assert scheduler.active == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert peak[0] == 1
+
+def test_cancelled_queued_job_never_runs():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        ran = []
+
+        async def job(name, seconds):
+            await asyncio.sleep(seconds)
+            ran.append(name)
+
+        first = asyncio.create_task(scheduler.submit("a", lambda: job("first", 0.05)))
+        queued = asyncio.create_task(scheduler.submit("a", lambda: job("queued", 0)))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await first
+        await asyncio.sleep(0.01)
+        return ran
+
+    assert asyncio.run(main()) == ["first"]
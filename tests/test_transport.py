@@ -0,0 +1,158 @@
+import asyncio
+import os
+import pickle
+import stat
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+from src.core.event_bus import EventBus
+from src.core import transport
+from src.core.error import EventBusError
+from src.core.transport import FRAME_EVENT, FRAME_HEADER, EventBridge, _segment_exists, encode_event, read_event
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="EventBridge needs Unix domain sockets")
+
+async def _decode(frame: bytes):
+    reader = asyncio.StreamReader()
+    reader.feed_data(frame)
+    reader.feed_eof()
+    return await read_event(reader)
+
+def test_frame_round_trip_moves_large_arrays_through_shared_memory():
+    async def main():
+        audio = np.arange(32 * 1024, dtype=np.float32)
+        small = np.ones(4, dtype=np.int16)
+        frame, segments = encode_event("utterance_ready", (audio,), {"small": small, "id": 7}, shm_threshold=1024)
+        topic_name, args, kwargs = await _decode(frame)
+        return frame, segments, topic_name, args, kwargs, audio, small
+
+    frame, segments, topic_name, args, kwargs, audio, small = asyncio.run(main())
+    assert len(segments) == 1
+    # The receiver unlinks each segment once it has copied the array out
+    assert not _segment_exists(segments[0])
+    # Only the small array is pickled into the frame itself
+    assert len(frame) < audio.nbytes
+    assert topic_name == "utterance_ready"
+    np.testing.assert_array_equal(args[0], audio)
+    np.testing.assert_array_equal(kwargs["small"], small)
+    assert kwargs["id"] == 7
+
+def test_payloads_cannot_load_arbitrary_globals():
+    payload = pickle.dumps(((os.getcwd,), {}))
+    frame = FRAME_HEADER.pack(FRAME_EVENT, 3, len(payload)) + b"run" + payload
+    with pytest.raises(pickle.UnpicklingError):
+        asyncio.run(_decode(frame))
+
+def test_socket_is_private_to_the_serving_user(tmp_path):
+    async def main():
+        bridge = EventBridge(EventBus(), tmp_path / "bridge.sock")
+        await bridge.serve()
+        try:
+            return stat.S_IMODE(os.stat(bridge.socket_path).st_mode)
+        finally:
+            await bridge.close()
+
+    assert asyncio.run(main()) == 0o600
+
+async def _bridged_pair(tmp_path, front_exports, infer_exports):
+    socket_path = tmp_path / "bridge.sock"
+    front_bus, infer_bus = EventBus(), EventBus()
+    front = EventBridge(front_bus, socket_path, export_topics=front_exports)
+    infer = EventBridge(infer_bus, socket_path, export_topics=infer_exports)
+    await front.serve()
+    await infer.connect()
+    # Wait until the server side has accepted the peer
+    while not front.get_stats()['peers']:
+        await asyncio.sleep(0.01)
+    return front_bus, infer_bus, front, infer
+
+def test_events_caused_by_a_remote_event_are_forwarded_back(tmp_path):
+    async def main():
+        front_bus, infer_bus, front, infer = await _bridged_pair(tmp_path, ["utterance_ready"], ["get.result"])
+        results = asyncio.Queue()
+
+        async def on_utterance(text):
+            await infer_bus.publish("get.result", text.upper())
+
+        async def on_result(text):
+            await results.put(text)
+
+        infer_bus.subscribe("utterance_ready", on_utterance, async_handler=True)
+        front_bus.subscribe("get.result", on_result, async_handler=True)
+        try:
+            await front_bus.publish("utterance_ready", "what time is it")
+            return await asyncio.wait_for(results.get(), timeout=5), front.get_stats(), infer.get_stats()
+        finally:
+            await infer.close()
+            await front.close()
+
+    result, front_stats, infer_stats = asyncio.run(main())
+    assert result == "WHAT TIME IS IT"
+    assert front_stats['sent'] == 1 and front_stats['received'] == 1
+    assert infer_stats['sent'] == 1 and infer_stats['received'] == 1
+
+def test_received_event_is_not_echoed_back(tmp_path):
+    async def main():
+        front_bus, infer_bus, front, infer = await _bridged_pair(tmp_path, ["state.*"], ["state.*"])
+        seen = {"front": [], "infer": []}
+        received = asyncio.Event()
+
+        async def on_front(state):
+            seen["front"].append(state)
+
+        async def on_infer(state):
+            seen["infer"].append(state)
+            received.set()
+
+        front_bus.subscribe("state.changed", on_front, async_handler=True)
+        infer_bus.subscribe("state.changed", on_infer, async_handler=True)
+        try:
+            await front_bus.publish("state.changed", "listening")
+            await asyncio.wait_for(received.wait(), timeout=5)
+            # Give an echo time to arrive if one were sent
+            await asyncio.sleep(0.2)
+            return seen, infer.get_stats()
+        finally:
+            await infer.close()
+            await front.close()
+
+    seen, infer_stats = asyncio.run(main())
+    assert seen == {"front": ["listening"], "infer": ["listening"]}
+    assert infer_stats['sent'] == 0
+
+def _shm_segments():
+    return {path.name for path in Path("/dev/shm").iterdir()}
+
+@pytest.mark.skipif(not Path("/dev/shm").is_dir(), reason="Lists POSIX shared memory through /dev/shm")
+def test_oversized_payload_unlinks_its_segments(monkeypatch):
+    monkeypatch.setattr(transport, "MAX_PAYLOAD_SIZE", 1024)
+    before = _shm_segments()
+    with pytest.raises(EventBusError):
+        encode_event("utterance_ready", (np.zeros(4096, dtype=np.float32), b"x" * 2048), {}, shm_threshold=1024)
+    assert _shm_segments() == before
+
+@pytest.mark.skipif(not Path("/dev/shm").is_dir(), reason="Lists POSIX shared memory through /dev/shm")
+def test_frames_a_disconnected_peer_never_read_are_unlinked(tmp_path):
+    async def main():
+        bus = EventBus()
+        bridge = EventBridge(bus, tmp_path / "bridge.sock", export_topics=["utterance_ready"], shm_threshold=1024)
+        await bridge.serve()
+        # A peer that never reads what it is sent
+        reader, writer = await asyncio.open_unix_connection(path=str(bridge.socket_path))
+        while not bridge.get_stats()['peers']:
+            await asyncio.sleep(0.01)
+        before = _shm_segments()
+        await bus.publish("utterance_ready", np.zeros(4096, dtype=np.float32))
+        sent = _shm_segments() - before
+        writer.close()
+        while bridge.get_stats()['peers']:
+            await asyncio.sleep(0.01)
+        try:
+            return sent, _shm_segments() & sent
+        finally:
+            await bridge.close()
+
+    sent, left = asyncio.run(main())
+    assert len(sent) == 1
+    assert left == set()
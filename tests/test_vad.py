@@ -0,0 +1,32 @@
+import asyncio
+import numpy as np
+from src.wake_word.vad import SPEECH_ENDED, SPEECH_STARTED, VADManager
+
+class _FakeCobra:
+    """Reports speech for frames whose first sample is non-zero."""
+    frame_length = 512
+
+    def process(self, frame: np.ndarray) -> float:
+        return 1.0 if frame[0] else 0.0
+
+def _vad() -> VADManager:
+    return VADManager(speech_timeout=0.1, min_speech_length=0.05, sample_clock=True, cobra=_FakeCobra())
+
+def test_block_endpointing_reports_start_and_end():
+    vad = _vad()
+    speech = np.ones(512 * 4, dtype=np.int16)
+    silence = np.zeros(512 * 6, dtype=np.int16)
+    started = [kind for _, kind, _, _ in vad.process_block(speech).events]
+    assert started == [SPEECH_STARTED] and vad.speech_detected
+    ended = [(index, kind) for index, kind, _, _ in vad.process_block(silence).events]
+    assert ended == [(3, SPEECH_ENDED)] and not vad.speech_detected
+
+def test_process_audio_shorter_than_a_frame_returns_the_idle_state():
+    async def main():
+        vad = _vad()
+        return await vad.process_audio(np.ones(100, dtype=np.int16)), vad.speech_detected
+
+    state, speech_detected = asyncio.run(main())
+    assert not speech_detected
+    assert state['vad_confidence'] == 0.0
+    assert not state['is_speech'] and not state['speech_started'] and not state['speech_ended']